@@ -0,0 +1,40 @@
+"""add keyset pagination indexes
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns) backing each (sort_key, id) cursor
+INDEXES = [
+    ('ix_category_name_id', 'category', ['name', 'id']),
+    ('ix_product_name_id', 'product', ['name', 'id']),
+    ('ix_product_created_at_id', 'product', ['created_at', 'id']),
+    ('ix_stockmovement_product_id_id', 'stockmovement', ['product_id', 'id']),
+    ('ix_stockmovement_product_id_created_at_id', 'stockmovement', ['product_id', 'created_at', 'id']),
+    ('ix_customer_name_id', 'customer', ['name', 'id']),
+    ('ix_order_order_date_id', 'order', ['order_date', 'id']),
+    ('ix_order_created_at_id', 'order', ['created_at', 'id']),
+    ('ix_payment_invoice_id_id', 'payment', ['invoice_id', 'id']),
+    ('ix_payment_invoice_id_payment_date_id', 'payment', ['invoice_id', 'payment_date', 'id']),
+    ('ix_supplier_name_id', 'supplier', ['name', 'id']),
+    ('ix_purchaseorder_order_date_id', 'purchaseorder', ['order_date', 'id']),
+    ('ix_purchaseorder_expected_date_id', 'purchaseorder', ['expected_date', 'id']),
+]
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,42 @@
+"""unique stock row per product and location
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Fold duplicate (product_id, location) rows into the oldest one
+    op.execute(
+        """
+        UPDATE stock SET quantity = (
+            SELECT SUM(s2.quantity) FROM stock s2
+            WHERE s2.product_id = stock.product_id AND s2.location = stock.location
+        )
+        WHERE id IN (
+            SELECT MIN(id) FROM stock GROUP BY product_id, location HAVING COUNT(*) > 1
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM stock WHERE id NOT IN (
+            SELECT MIN(id) FROM stock GROUP BY product_id, location
+        )
+        """
+    )
+    op.create_index(
+        'ix_stock_product_id_location', 'stock', ['product_id', 'location'], unique=True
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_stock_product_id_location', table_name='stock')
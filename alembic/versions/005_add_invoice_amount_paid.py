@@ -0,0 +1,43 @@
+"""add running amount_paid to invoice
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 10000
+
+def upgrade() -> None:
+    op.add_column(
+        'invoice',
+        sa.Column('amount_paid', sa.Float(), nullable=False, server_default='0'),
+    )
+
+    # Backfill from the payment ledger in id ranges to keep transactions short
+    connection = op.get_bind()
+    max_id = connection.execute(sa.text("SELECT MAX(id) FROM invoice")).scalar() or 0
+    for lower in range(1, max_id + 1, BACKFILL_BATCH_SIZE):
+        connection.execute(
+            sa.text(
+                """
+                UPDATE invoice SET amount_paid = COALESCE(
+                    (SELECT SUM(payment.amount) FROM payment
+                     WHERE payment.invoice_id = invoice.id), 0
+                )
+                WHERE invoice.id >= :lower AND invoice.id < :upper
+                """
+            ),
+            {"lower": lower, "upper": lower + BACKFILL_BATCH_SIZE},
+        )
+
+def downgrade() -> None:
+    op.drop_column('invoice', 'amount_paid')
@@ -0,0 +1,41 @@
+"""create daily sales rollup tables
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+# (table, key column, referenced table)
+ROLLUPS = [
+    ('salesdailyproduct', 'product_id', 'product'),
+    ('salesdailycustomer', 'customer_id', 'customer'),
+    ('salesdailycategory', 'category_id', 'category'),
+]
+
+def upgrade() -> None:
+    for table, key, referenced in ROLLUPS:
+        op.create_table(
+            table,
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column(key, sa.Integer(), nullable=False),
+            sa.Column('revenue', sa.Float(), nullable=False),
+            sa.Column('quantity', sa.Integer(), nullable=False),
+            sa.Column('discount', sa.Float(), nullable=False),
+            sa.Column('orders', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint([key], [f'{referenced}.id'], ),
+            sa.PrimaryKeyConstraint('day', key)
+        )
+    # Populate with `python -m app.cli rebuild-rollups`
+
+def downgrade() -> None:
+    for table, _, _ in reversed(ROLLUPS):
+        op.drop_table(table)
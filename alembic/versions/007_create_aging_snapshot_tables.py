@@ -0,0 +1,57 @@
+"""create receivables aging snapshot tables
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        'agingsnapshot',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('as_of', sa.Date(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_agingsnapshot_id'), 'agingsnapshot', ['id'], unique=False)
+    op.create_index('ix_agingsnapshot_as_of_id', 'agingsnapshot', ['as_of', 'id'], unique=False)
+
+    op.create_table(
+        'agingsnapshotline',
+        sa.Column('snapshot_id', sa.Integer(), nullable=False),
+        sa.Column('customer_id', sa.Integer(), nullable=False),
+        sa.Column('current', sa.Float(), nullable=False),
+        sa.Column('days_1_30', sa.Float(), nullable=False),
+        sa.Column('days_31_60', sa.Float(), nullable=False),
+        sa.Column('days_61_90', sa.Float(), nullable=False),
+        sa.Column('days_over_90', sa.Float(), nullable=False),
+        sa.Column('total', sa.Float(), nullable=False),
+        sa.Column('invoices', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['snapshot_id'], ['agingsnapshot.id'], ),
+        sa.ForeignKeyConstraint(['customer_id'], ['customer.id'], ),
+        sa.PrimaryKeyConstraint('snapshot_id', 'customer_id')
+    )
+
+    # Serves the overdue sweep and the open-invoice scan of the aging query
+    op.create_index(
+        'ix_invoice_payment_status_due_date', 'invoice',
+        ['payment_status', 'due_date'], unique=False,
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_invoice_payment_status_due_date', table_name='invoice')
+    op.drop_table('agingsnapshotline')
+    op.drop_index('ix_agingsnapshot_as_of_id', table_name='agingsnapshot')
+    op.drop_index(op.f('ix_agingsnapshot_id'), table_name='agingsnapshot')
+    op.drop_table('agingsnapshot')
@@ -0,0 +1,55 @@
+"""add customer exposure and order credit hold
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 10000
+
+def upgrade() -> None:
+    op.add_column(
+        'customer',
+        sa.Column('exposure', sa.Float(), nullable=False, server_default='0'),
+    )
+    op.add_column(
+        'order',
+        sa.Column('credit_hold', sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+
+    # Open confirmed orders without an invoice plus unpaid invoice balances
+    connection = op.get_bind()
+    max_id = connection.execute(sa.text("SELECT MAX(id) FROM customer")).scalar() or 0
+    for lower in range(1, max_id + 1, BACKFILL_BATCH_SIZE):
+        connection.execute(
+            sa.text(
+                """
+                UPDATE customer SET exposure = COALESCE(
+                    (SELECT SUM(o.total_amount) FROM "order" o
+                     WHERE o.customer_id = customer.id
+                       AND o.status IN ('CONFIRMED', 'SHIPPED', 'DELIVERED')
+                       AND NOT EXISTS (SELECT 1 FROM invoice i WHERE i.order_id = o.id)), 0
+                ) + COALESCE(
+                    (SELECT SUM(i.total_amount - i.amount_paid) FROM invoice i
+                     JOIN "order" o ON o.id = i.order_id
+                     WHERE o.customer_id = customer.id
+                       AND i.total_amount > i.amount_paid), 0
+                )
+                WHERE customer.id >= :lower AND customer.id < :upper
+                """
+            ),
+            {"lower": lower, "upper": lower + BACKFILL_BATCH_SIZE},
+        )
+
+def downgrade() -> None:
+    op.drop_column('order', 'credit_hold')
+    op.drop_column('customer', 'exposure')
@@ -0,0 +1,49 @@
+"""add materialized path to category
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('category', sa.Column('path', sa.String(), nullable=True))
+
+    # Backfill one tree level per statement, roots first
+    connection = op.get_bind()
+    connection.execute(
+        sa.text(
+            "UPDATE category SET path = '/' || CAST(id AS VARCHAR) || '/' "
+            "WHERE parent_id IS NULL"
+        )
+    )
+    while connection.execute(
+        sa.text(
+            """
+            UPDATE category SET path = (
+                SELECT parent.path FROM category parent WHERE parent.id = category.parent_id
+            ) || CAST(id AS VARCHAR) || '/'
+            WHERE path IS NULL AND parent_id IN (
+                SELECT id FROM category WHERE path IS NOT NULL
+            )
+            """
+        )
+    ).rowcount:
+        pass
+
+    op.create_index(
+        'ix_category_path', 'category', ['path'], unique=False,
+        postgresql_ops={'path': 'varchar_pattern_ops'},
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_category_path', table_name='category')
+    op.drop_column('category', 'path')
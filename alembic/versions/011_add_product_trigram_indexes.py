@@ -0,0 +1,32 @@
+"""add trigram indexes for product search
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Other databases search through the in-process index instead
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute(
+        'CREATE INDEX ix_product_name_trgm ON product USING gin (lower(name) gin_trgm_ops)'
+    )
+    op.execute(
+        'CREATE INDEX ix_product_sku_trgm ON product USING gin (lower(sku) gin_trgm_ops)'
+    )
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('DROP INDEX IF EXISTS ix_product_sku_trgm')
+    op.execute('DROP INDEX IF EXISTS ix_product_name_trgm')
@@ -0,0 +1,36 @@
+"""create stock checkpoints and movement locations
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column(
+        'stockmovement',
+        sa.Column('location', sa.String(), nullable=False, server_default='default')
+    )
+    op.create_index('ix_stockmovement_created_at', 'stockmovement', ['created_at'])
+    op.create_table(
+        'stockcheckpoint',
+        sa.Column('as_of', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('location', sa.String(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['product.id'], ),
+        sa.PrimaryKeyConstraint('as_of', 'product_id', 'location')
+    )
+
+def downgrade() -> None:
+    op.drop_table('stockcheckpoint')
+    op.drop_index('ix_stockmovement_created_at', table_name='stockmovement')
+    op.drop_column('stockmovement', 'location')
@@ -0,0 +1,44 @@
+"""create stock alerts
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        'stockalert',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('location', sa.String(), nullable=False),
+        sa.Column('min_stock_level', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('raised_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('resolved_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('changed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['product.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_stockalert_id'), 'stockalert', ['id'], unique=False)
+    op.create_index(
+        'ix_stockalert_open_product_id_location', 'stockalert', ['product_id', 'location'],
+        unique=True,
+        postgresql_where=sa.text('resolved_at IS NULL'),
+        sqlite_where=sa.text('resolved_at IS NULL'),
+    )
+    op.create_index('ix_stockalert_changed_at', 'stockalert', ['changed_at'])
+
+def downgrade() -> None:
+    op.drop_index('ix_stockalert_changed_at', table_name='stockalert')
+    op.drop_index('ix_stockalert_open_product_id_location', table_name='stockalert')
+    op.drop_index(op.f('ix_stockalert_id'), table_name='stockalert')
+    op.drop_table('stockalert')
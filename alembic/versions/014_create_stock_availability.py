@@ -0,0 +1,34 @@
+"""create per-product stock availability
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        'stockavailability',
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['product_id'], ['product.id'], ),
+        sa.PrimaryKeyConstraint('product_id')
+    )
+    op.create_index('ix_stock_location_product_id', 'stock', ['location', 'product_id'])
+    op.execute(
+        "INSERT INTO stockavailability (product_id, quantity) "
+        "SELECT product_id, SUM(quantity) FROM stock GROUP BY product_id"
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_stock_location_product_id', table_name='stock')
+    op.drop_table('stockavailability')
@@ -0,0 +1,42 @@
+"""add received quantity to purchase order lines
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '015'
+down_revision = '014'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute(
+                "ALTER TYPE purchaseorderstatus ADD VALUE IF NOT EXISTS 'PARTIALLY_RECEIVED' "
+                "AFTER 'CONFIRMED'"
+            )
+    op.add_column(
+        'purchaseorderitem',
+        sa.Column('received_quantity', sa.Integer(), server_default='0', nullable=False)
+    )
+    op.add_column(
+        'purchasereceipt',
+        sa.Column('location', sa.String(), server_default='default', nullable=False)
+    )
+    op.execute(
+        "UPDATE purchaseorderitem SET received_quantity = COALESCE(("
+        "SELECT SUM(ri.quantity) FROM purchasereceiptitem ri "
+        "JOIN purchasereceipt r ON r.id = ri.receipt_id "
+        "WHERE ri.order_item_id = purchaseorderitem.id AND r.status = 'RECEIVED'"
+        "), 0)"
+    )
+
+def downgrade() -> None:
+    op.drop_column('purchasereceipt', 'location')
+    op.drop_column('purchaseorderitem', 'received_quantity')
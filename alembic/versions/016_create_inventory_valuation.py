@@ -0,0 +1,78 @@
+"""create inventory valuation tables
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '016'
+down_revision = '015'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('stockmovement', sa.Column('unit_cost', sa.Float(), nullable=True))
+    op.add_column(
+        'stockmovement',
+        sa.Column('is_transfer', sa.Boolean(), server_default=sa.false(), nullable=False)
+    )
+    op.create_table(
+        'productvaluation',
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('average_cost', sa.Float(), nullable=False),
+        sa.Column('average_value', sa.Float(), nullable=False),
+        sa.Column('fifo_value', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['product_id'], ['product.id'], ),
+        sa.PrimaryKeyConstraint('product_id')
+    )
+    op.create_table(
+        'costlayer',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('received_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('remaining', sa.Integer(), nullable=False),
+        sa.Column('unit_cost', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['product.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_costlayer_id'), 'costlayer', ['id'], unique=False)
+    op.create_index(
+        'ix_costlayer_open_product_id_id', 'costlayer', ['product_id', 'id'],
+        postgresql_where=sa.text('remaining > 0'),
+        sqlite_where=sa.text('remaining > 0'),
+    )
+    op.create_table(
+        'cogsentry',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('average_cost', sa.Float(), nullable=False),
+        sa.Column('fifo_cost', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['product.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_cogsentry_id'), 'cogsentry', ['id'], unique=False)
+    op.create_index('ix_cogsentry_created_at_product_id', 'cogsentry', ['created_at', 'product_id'])
+    op.create_index('ix_cogsentry_product_id', 'cogsentry', ['product_id'])
+    # Valuations start empty; `python -m app.cli rebuild-valuation` fills
+    # them from the existing ledger
+
+def downgrade() -> None:
+    op.drop_index('ix_cogsentry_product_id', table_name='cogsentry')
+    op.drop_index('ix_cogsentry_created_at_product_id', table_name='cogsentry')
+    op.drop_index(op.f('ix_cogsentry_id'), table_name='cogsentry')
+    op.drop_table('cogsentry')
+    op.drop_index('ix_costlayer_open_product_id_id', table_name='costlayer')
+    op.drop_index(op.f('ix_costlayer_id'), table_name='costlayer')
+    op.drop_table('costlayer')
+    op.drop_table('productvaluation')
+    op.drop_column('stockmovement', 'is_transfer')
+    op.drop_column('stockmovement', 'unit_cost')
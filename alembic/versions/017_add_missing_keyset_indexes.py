@@ -0,0 +1,37 @@
+"""add keyset indexes for the remaining sort fields
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '017'
+down_revision = '016'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns) backing each (sort_key, id) cursor not
+# covered by 003; stock pages are filtered by location first
+INDEXES = [
+    ('ix_product_sku_id', 'product', ['sku', 'id']),
+    ('ix_order_order_number_id', 'order', ['order_number', 'id']),
+    ('ix_purchaseorder_order_number_id', 'purchaseorder', ['order_number', 'id']),
+    ('ix_stock_location_id', 'stock', ['location', 'id']),
+    ('ix_stock_location_product_id_id', 'stock', ['location', 'product_id', 'id']),
+    ('ix_stockalert_raised_at_id', 'stockalert', ['raised_at', 'id']),
+]
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+    # Superseded by ix_stock_location_product_id_id
+    op.drop_index('ix_stock_location_product_id', table_name='stock')
+
+def downgrade() -> None:
+    op.create_index('ix_stock_location_product_id', 'stock', ['location', 'product_id'])
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -1,8 +1,19 @@
 from fastapi import APIRouter
-from app.api.api_v1.endpoints import users, inventory, sales, purchase
+from app.api.api_v1.endpoints import users, inventory, sales, purchase, monitoring, exports
+from app.core.config import settings
 
 api_router = APIRouter()
 api_router.include_router(users.router, tags=["users"])
+api_router.include_router(exports.router)
+if settings.DB_ASYNC_MODE:
+    from app.api.api_v1.endpoints import inventory_async, sales_async, purchase_async
+
+    # Registered first so they take precedence over the sync routes with the
+    # same path; sync-only endpoints below stay reachable
+    api_router.include_router(inventory_async.router, prefix="/inventory", tags=["inventory"])
+    api_router.include_router(sales_async.router, prefix="/sales", tags=["sales"])
+    api_router.include_router(purchase_async.router, prefix="/purchase", tags=["purchase"])
 api_router.include_router(inventory.router, prefix="/inventory", tags=["inventory"])
 api_router.include_router(sales.router, prefix="/sales", tags=["sales"])
-api_router.include_router(purchase.router, prefix="/purchase", tags=["purchase"]) 
\ No newline at end of file
+api_router.include_router(purchase.router, prefix="/purchase", tags=["purchase"])
+api_router.include_router(monitoring.router, prefix="/monitoring", tags=["monitoring"])
@@ -0,0 +1,94 @@
+from datetime import datetime
+from typing import Any, Optional
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from app import models
+from app.api import deps
+from app.services import export, inventory
+from app.services.export import ExportFormat
+
+# Mounted without a prefix and ahead of the domain routers, so that
+# "/sales/orders/export" is not captured by "/sales/orders/{order_id}"
+router = APIRouter()
+
+def _export_response(stmt: Any, format: ExportFormat, name: str) -> StreamingResponse:
+    return StreamingResponse(
+        export.stream_export(stmt, format),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{format.value}"'},
+    )
+
+@router.get("/sales/orders/export", tags=["sales"])
+def export_orders(
+    format: ExportFormat = ExportFormat.CSV,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    current_user: models.User = Depends(deps.get_current_active_user_for_stream),
+) -> Any:
+    """
+    Stream orders with their line items, one row per line.
+    """
+    return _export_response(export.orders_statement(date_from, date_to), format, "orders")
+
+@router.get("/sales/invoices/export", tags=["sales"])
+def export_invoices(
+    format: ExportFormat = ExportFormat.CSV,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    current_user: models.User = Depends(deps.get_current_active_user_for_stream),
+) -> Any:
+    """
+    Stream invoices.
+    """
+    return _export_response(export.invoices_statement(date_from, date_to), format, "invoices")
+
+@router.get("/purchase/orders/export", tags=["purchase"])
+def export_purchase_orders(
+    format: ExportFormat = ExportFormat.CSV,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    current_user: models.User = Depends(deps.get_current_active_user_for_stream),
+) -> Any:
+    """
+    Stream purchase orders with their line items, one row per line.
+    """
+    return _export_response(
+        export.purchase_orders_statement(date_from, date_to), format, "purchase_orders"
+    )
+
+@router.get("/inventory/products/export", tags=["inventory"])
+def export_products(
+    format: ExportFormat = ExportFormat.CSV,
+    current_user: models.User = Depends(deps.get_current_active_user_for_stream),
+) -> Any:
+    """
+    Stream the product catalog.
+    """
+    return _export_response(export.products_statement(), format, "products")
+
+@router.get("/inventory/stock-movements/export", tags=["inventory"])
+def export_stock_movements(
+    format: ExportFormat = ExportFormat.CSV,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    current_user: models.User = Depends(deps.get_current_active_user_for_stream),
+) -> Any:
+    """
+    Stream stock movements.
+    """
+    return _export_response(
+        export.stock_movements_statement(date_from, date_to), format, "stock_movements"
+    )
+
+@router.get("/inventory/stock-positions/export", tags=["inventory"])
+def export_stock_positions(
+    at: datetime,
+    format: ExportFormat = ExportFormat.CSV,
+    current_user: models.User = Depends(deps.get_current_active_user_for_stream),
+) -> Any:
+    """
+    Stream the on-hand quantity of every product and location at a point in time.
+    """
+    return _export_response(
+        inventory.stock_positions_statement(at), format, "stock_positions"
+    )
@@ -1,25 +1,38 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app import models, schemas
 from app.api import deps
-from app.services import inventory
+from app.core.config import settings
+from app.services import inventory, product_search, stock_alerts, valuation
 
 router = APIRouter()
 
 # Category endpoints
 @router.get("/categories", response_model=List[schemas.Category])
 def read_categories(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve categories.
     """
-    categories = inventory.get_categories(db, skip=skip, limit=limit)
-    return categories
+    try:
+        page = inventory.get_categories(
+            db, skip=skip, limit=limit, cursor=cursor, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return deps.page_items(response, page)
 
 @router.post("/categories", response_model=schemas.Category)
 def create_category(
@@ -31,7 +44,10 @@ def create_category(
     """
     Create new category.
     """
-    category = inventory.create_category(db, category_in)
+    try:
+        category = inventory.create_category(db, category_in)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return category
 
 @router.put("/categories/{category_id}", response_model=schemas.Category)
@@ -45,24 +61,86 @@ def update_category(
     """
     Update a category.
     """
-    category = inventory.update_category(db, category_id, category_in)
+    try:
+        category = inventory.update_category(db, category_id, category_in)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     return category
 
+@router.get("/categories/tree", response_model=List[schemas.CategoryNode])
+def read_category_tree(
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Retrieve the full category tree.
+    """
+    return Response(content=inventory.get_category_tree(db), media_type="application/json")
+
+@router.get("/categories/{category_id}/products", response_model=List[schemas.Product])
+def read_category_products(
+    response: Response,
+    category_id: int,
+    db: Session = Depends(deps.get_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Retrieve products in a category and all its subcategories.
+    """
+    try:
+        page = inventory.get_category_products(
+            db, category_id, skip=skip, limit=limit, cursor=cursor, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return deps.page_items(response, page)
+
 # Product endpoints
 @router.get("/products", response_model=List[schemas.Product])
 def read_products(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve products.
     """
-    products = inventory.get_products(db, skip=skip, limit=limit)
-    return products
+    try:
+        page = inventory.get_products(
+            db, skip=skip, limit=limit, cursor=cursor, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return deps.page_items(response, page)
+
+@router.get("/products/search", response_model=List[schemas.Product])
+def search_products(
+    q: str,
+    db: Session = Depends(deps.get_db),
+    limit: int = 20,
+    include_inactive: bool = False,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Search products by name or SKU, best matches first.
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search query is empty")
+    return product_search.search_products(
+        db, q, limit=min(limit, 100), include_inactive=include_inactive
+    )
 
 @router.post("/products", response_model=schemas.Product)
 def create_product(
@@ -99,16 +177,100 @@ def read_stock(
     *,
     db: Session = Depends(deps.get_db),
     product_id: int,
+    location: str = "default",
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Get stock information for a product.
+    Get stock information for a product at a location.
     """
-    stock = inventory.get_stock_by_product(db, product_id)
+    stock = inventory.get_stock_by_product(db, product_id, location)
     if not stock:
         raise HTTPException(status_code=404, detail="Stock not found")
     return stock
 
+@router.get("/stock/{product_id}/locations", response_model=List[schemas.Stock])
+def read_stock_locations(
+    *,
+    db: Session = Depends(deps.get_db),
+    product_id: int,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Get a product's stock at every location.
+    """
+    return inventory.get_stock_locations(db, product_id)
+
+@router.get("/locations/{location}/stock", response_model=List[schemas.Stock])
+def read_location_stock(
+    response: Response,
+    location: str,
+    db: Session = Depends(deps.get_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Retrieve the stock held at a location.
+    """
+    try:
+        page = inventory.get_location_stock(
+            db, location, skip=skip, limit=limit, cursor=cursor, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return deps.page_items(response, page)
+
+@router.get("/availability", response_model=List[schemas.StockAvailability])
+def read_availabilities(
+    response: Response,
+    db: Session = Depends(deps.get_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Retrieve total availability across locations for the catalog.
+    """
+    try:
+        page = inventory.get_availabilities(
+            db, skip=skip, limit=limit, cursor=cursor, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return deps.page_items(response, page)
+
+@router.get("/availability/{product_id}", response_model=schemas.StockAvailability)
+def read_availability(
+    *,
+    db: Session = Depends(deps.get_db),
+    product_id: int,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Get a product's total availability across locations.
+    """
+    availability = inventory.get_availability(db, product_id)
+    if not availability:
+        raise HTTPException(status_code=404, detail="No stock recorded for product")
+    return availability
+
+@router.get("/stock/{product_id}/as-of", response_model=List[schemas.StockPosition])
+def read_stock_as_of(
+    *,
+    db: Session = Depends(deps.get_db),
+    product_id: int,
+    at: datetime,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Get a product's on-hand quantity per location at a point in time.
+    """
+    return inventory.get_stock_as_of(db, product_id, at)
+
 @router.post("/stock", response_model=schemas.Stock)
 def create_stock(
     *,
@@ -119,8 +281,61 @@ def create_stock(
     """
     Create new stock entry.
     """
-    stock = inventory.create_stock(db, stock_in)
-    return stock
+    try:
+        stock = inventory.create_stock(db, stock_in)
+        return stock
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Stock alert endpoints
+@router.get("/stock-alerts", response_model=List[schemas.StockAlert])
+def read_stock_alerts(
+    response: Response,
+    db: Session = Depends(deps.get_db),
+    include_resolved: bool = False,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Retrieve open low-stock alerts.
+    """
+    try:
+        page = stock_alerts.get_stock_alerts(
+            db, include_resolved=include_resolved,
+            skip=skip, limit=limit, cursor=cursor, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return deps.page_items(response, page)
+
+async def _alert_events(request: Request) -> AsyncIterator[str]:
+    feed = stock_alerts.AlertFeed()
+    while not await request.is_disconnected():
+        alerts = await run_in_threadpool(stock_alerts.poll_feed, feed)
+        for alert in alerts:
+            event = "resolved" if alert.resolved_at else "raised"
+            data = schemas.StockAlert.model_validate(alert).model_dump_json()
+            yield f"id: {alert.id}\nevent: {event}\ndata: {data}\n\n"
+        if not alerts:
+            yield ": keep-alive\n\n"
+        await asyncio.sleep(settings.STOCK_ALERT_STREAM_POLL_SECONDS)
+
+@router.get("/stock-alerts/stream")
+async def stream_stock_alerts(
+    request: Request,
+    current_user: models.User = Depends(deps.get_current_active_user_for_stream),
+) -> Any:
+    """
+    Server-sent events for low-stock alerts raised or resolved from now on.
+    """
+    return StreamingResponse(
+        _alert_events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
 
 # Stock Movement endpoints
 @router.post("/stock-movements", response_model=schemas.StockMovement)
@@ -133,20 +348,125 @@ def create_stock_movement(
     """
     Create new stock movement.
     """
-    movement = inventory.create_stock_movement(db, movement_in, current_user.id)
-    return movement
+    try:
+        movement = inventory.create_stock_movement(db, movement_in, current_user.id)
+        return movement
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/stock-transfers", response_model=List[schemas.StockMovement])
+def transfer_stock(
+    *,
+    db: Session = Depends(deps.get_db),
+    transfer_in: schemas.StockTransferCreate,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Move stock between two locations.
+    """
+    try:
+        return inventory.transfer_stock(db, transfer_in, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/stock-movements/batch", response_model=schemas.StockMovementBatchResult)
+def create_stock_movements_batch(
+    *,
+    db: Session = Depends(deps.get_db),
+    batch_in: schemas.StockMovementBatchCreate,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Create many stock movements in one transaction.
+    """
+    result = inventory.create_stock_movements_batch(db, batch_in, current_user.id)
+    if result["rejected"] and batch_in.mode == schemas.StockMovementBatchMode.ALL_OR_NOTHING:
+        raise HTTPException(status_code=400, detail=result)
+    return result
 
 @router.get("/stock-movements/{product_id}", response_model=List[schemas.StockMovement])
 def read_stock_movements(
     *,
     db: Session = Depends(deps.get_db),
     product_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve stock movements for a product.
     """
-    movements = inventory.get_stock_movements(db, product_id, skip=skip, limit=limit)
-    return movements 
\ No newline at end of file
+    try:
+        page = inventory.get_stock_movements(
+            db, product_id, skip=skip, limit=limit, cursor=cursor, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return deps.page_items(response, page)
+
+# Valuation endpoints
+@router.get("/valuation", response_model=List[schemas.ProductValuation])
+def read_valuations(
+    response: Response,
+    db: Session = Depends(deps.get_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Retrieve current inventory valuation per product.
+    """
+    try:
+        page = valuation.get_valuations(
+            db, skip=skip, limit=limit, cursor=cursor, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return deps.page_items(response, page)
+
+@router.get("/valuation/summary", response_model=schemas.ValuationSummary)
+def read_valuation_summary(
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Total inventory value under the weighted-average and FIFO methods.
+    """
+    return valuation.get_valuation_summary(db)
+
+@router.get("/valuation/{product_id}", response_model=schemas.ProductValuation)
+def read_valuation(
+    *,
+    db: Session = Depends(deps.get_db),
+    product_id: int,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Get a product's current valuation.
+    """
+    product_valuation = valuation.get_valuation(db, product_id)
+    if not product_valuation:
+        raise HTTPException(status_code=404, detail="No valuation recorded for product")
+    return product_valuation
+
+@router.get("/cogs", response_model=schemas.CostOfGoodsSold)
+def read_cost_of_goods_sold(
+    *,
+    db: Session = Depends(deps.get_db),
+    date_from: datetime,
+    date_to: datetime,
+    product_id: Optional[List[int]] = Query(None),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Cost of goods issued from date_from up to (not including) date_to.
+    """
+    date_from, date_to = inventory.as_utc(date_from), inventory.as_utc(date_to)
+    if date_from >= date_to:
+        raise HTTPException(status_code=400, detail="date_from must be before date_to")
+    return valuation.get_cost_of_goods_sold(db, date_from, date_to, product_id)
\ No newline at end of file
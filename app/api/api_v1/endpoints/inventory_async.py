@@ -0,0 +1,189 @@
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models, schemas
+from app.api import deps
+from app.services import inventory_async as inventory
+
+router = APIRouter()
+
+# Category endpoints
+@router.get("/categories", response_model=List[schemas.Category])
+async def read_categories(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Retrieve categories.
+    """
+    try:
+        page = await inventory.get_categories(
+            db, skip=skip, limit=limit, cursor=cursor, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return deps.page_items(response, page)
+
+@router.post("/categories", response_model=schemas.Category)
+async def create_category(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    category_in: schemas.CategoryCreate,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Create new category.
+    """
+    try:
+        category = await inventory.create_category(db, category_in)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return category
+
+@router.put("/categories/{category_id}", response_model=schemas.Category)
+async def update_category(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    category_id: int,
+    category_in: schemas.CategoryUpdate,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Update a category.
+    """
+    try:
+        category = await inventory.update_category(db, category_id, category_in)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not category:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return category
+
+# Product endpoints
+@router.get("/products", response_model=List[schemas.Product])
+async def read_products(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Retrieve products.
+    """
+    try:
+        page = await inventory.get_products(
+            db, skip=skip, limit=limit, cursor=cursor, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return deps.page_items(response, page)
+
+@router.post("/products", response_model=schemas.Product)
+async def create_product(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    product_in: schemas.ProductCreate,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Create new product.
+    """
+    product = await inventory.create_product(db, product_in)
+    return product
+
+@router.put("/products/{product_id}", response_model=schemas.Product)
+async def update_product(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    product_id: int,
+    product_in: schemas.ProductUpdate,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Update a product.
+    """
+    product = await inventory.update_product(db, product_id, product_in)
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return product
+
+# Stock endpoints
+@router.get("/stock/{product_id}", response_model=schemas.Stock)
+async def read_stock(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    product_id: int,
+    location: str = "default",
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Get stock information for a product at a location.
+    """
+    stock = await inventory.get_stock_by_product(db, product_id, location)
+    if not stock:
+        raise HTTPException(status_code=404, detail="Stock not found")
+    return stock
+
+@router.post("/stock", response_model=schemas.Stock)
+async def create_stock(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    stock_in: schemas.StockCreate,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Create new stock entry.
+    """
+    try:
+        stock = await inventory.create_stock(db, stock_in)
+        return stock
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Stock Movement endpoints
+@router.post("/stock-movements", response_model=schemas.StockMovement)
+async def create_stock_movement(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    movement_in: schemas.StockMovementCreate,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Create new stock movement.
+    """
+    try:
+        movement = await inventory.create_stock_movement(db, movement_in, current_user.id)
+        return movement
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/stock-movements/{product_id}", response_model=List[schemas.StockMovement])
+async def read_stock_movements(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    product_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Retrieve stock movements for a product.
+    """
+    try:
+        page = await inventory.get_stock_movements(
+            db, product_id, skip=skip, limit=limit, cursor=cursor, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return deps.page_items(response, page)
@@ -0,0 +1,41 @@
+from typing import Any, Dict
+from fastapi import APIRouter, Depends
+from app import models
+from app.api import deps
+from app.core.config import settings
+from app.db.instrumentation import sql_report
+from app.services.inventory import category_cache, product_cache
+
+router = APIRouter()
+
+@router.get("/sql-report", response_model=Dict[str, Any])
+def read_sql_report(
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Get per-route SQL statistics of sampled requests, with N+1 suspects.
+    """
+    return {
+        "sample_rate": settings.SQL_INSTRUMENTATION_SAMPLE_RATE,
+        "n_plus_one_threshold": settings.SQL_N_PLUS_ONE_THRESHOLD,
+        "routes": sql_report.snapshot(),
+    }
+
+@router.delete("/sql-report", response_model=Dict[str, Any])
+def reset_sql_report(
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Clear the aggregated SQL statistics.
+    """
+    sql_report.reset()
+    return {"ok": True}
+
+@router.get("/catalog-cache", response_model=Dict[str, Any])
+def read_catalog_cache_stats(
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Get hit ratio and memory use of the product and category caches.
+    """
+    return {"products": product_cache.stats(), "categories": category_cache.stats()}
@@ -1,25 +1,33 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from app import models, schemas
 from app.api import deps
-from app.services import purchase
+from app.services import numbering, purchase, replenishment
 
 router = APIRouter()
 
 # Supplier endpoints
 @router.get("/suppliers", response_model=List[schemas.Supplier])
 def read_suppliers(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve suppliers.
     """
-    suppliers = purchase.get_suppliers(db, skip=skip, limit=limit)
-    return suppliers
+    try:
+        page = purchase.get_suppliers(
+            db, skip=skip, limit=limit, cursor=cursor, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return deps.page_items(response, page)
 
 @router.post("/suppliers", response_model=schemas.Supplier)
 def create_supplier(
@@ -53,16 +61,24 @@ def update_supplier(
 # Purchase Order endpoints
 @router.get("/orders", response_model=List[schemas.PurchaseOrder])
 def read_purchase_orders(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve purchase orders.
     """
-    orders = purchase.get_purchase_orders(db, skip=skip, limit=limit)
-    return orders
+    try:
+        page = purchase.get_purchase_orders(
+            db, skip=skip, limit=limit, cursor=cursor, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return deps.page_items(response, page)
 
 @router.post("/orders", response_model=schemas.PurchaseOrder)
 def create_purchase_order(
@@ -77,6 +93,8 @@ def create_purchase_order(
     try:
         order = purchase.create_purchase_order(db, order_in, current_user.id)
         return order
+    except numbering.DuplicateDocumentNumber as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -113,6 +131,8 @@ def create_purchase_receipt(
     try:
         receipt = purchase.create_purchase_receipt(db, receipt_in, current_user.id)
         return receipt
+    except numbering.DuplicateDocumentNumber as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -128,9 +148,39 @@ def update_purchase_receipt(
     Update a purchase receipt.
     """
     try:
-        receipt = purchase.update_purchase_receipt(db, receipt_id, receipt_in)
+        receipt = purchase.update_purchase_receipt(db, receipt_id, receipt_in, current_user.id)
         if not receipt:
             raise HTTPException(status_code=404, detail="Purchase receipt not found")
         return receipt
     except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Replenishment endpoints
+@router.get("/replenishment", response_model=List[schemas.ReplenishmentSuggestion])
+def read_replenishment(
+    db: Session = Depends(deps.get_db),
+    supplier_id: Optional[int] = None,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Suggested purchase quantities for products below their reorder point.
+    """
+    suggestions = replenishment.plan_replenishment(db)
+    if supplier_id is not None:
+        suggestions = [s for s in suggestions if s["supplier_id"] == supplier_id]
+    return suggestions
+
+@router.post("/replenishment/draft-orders", response_model=List[schemas.PurchaseOrder])
+def create_replenishment_orders(
+    *,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Draft one purchase order per supplier from the current suggestions.
+    """
+    try:
+        suggestions = replenishment.plan_replenishment(db)
+        return replenishment.create_draft_orders(db, suggestions, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,159 @@
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models, schemas
+from app.api import deps
+from app.services import numbering
+from app.services import purchase_async as purchase
+
+router = APIRouter()
+
+# Supplier endpoints
+@router.get("/suppliers", response_model=List[schemas.Supplier])
+async def read_suppliers(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Retrieve suppliers.
+    """
+    try:
+        page = await purchase.get_suppliers(
+            db, skip=skip, limit=limit, cursor=cursor, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return deps.page_items(response, page)
+
+@router.post("/suppliers", response_model=schemas.Supplier)
+async def create_supplier(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    supplier_in: schemas.SupplierCreate,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Create new supplier.
+    """
+    supplier = await purchase.create_supplier(db, supplier_in)
+    return supplier
+
+@router.put("/suppliers/{supplier_id}", response_model=schemas.Supplier)
+async def update_supplier(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    supplier_id: int,
+    supplier_in: schemas.SupplierUpdate,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Update a supplier.
+    """
+    supplier = await purchase.update_supplier(db, supplier_id, supplier_in)
+    if not supplier:
+        raise HTTPException(status_code=404, detail="Supplier not found")
+    return supplier
+
+# Purchase Order endpoints
+@router.get("/orders", response_model=List[schemas.PurchaseOrder])
+async def read_purchase_orders(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Retrieve purchase orders.
+    """
+    try:
+        page = await purchase.get_purchase_orders(
+            db, skip=skip, limit=limit, cursor=cursor, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return deps.page_items(response, page)
+
+@router.post("/orders", response_model=schemas.PurchaseOrder)
+async def create_purchase_order(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    order_in: schemas.PurchaseOrderCreate,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Create new purchase order.
+    """
+    try:
+        order = await purchase.create_purchase_order(db, order_in, current_user.id)
+        return order
+    except numbering.DuplicateDocumentNumber as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.put("/orders/{order_id}", response_model=schemas.PurchaseOrder)
+async def update_purchase_order(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    order_id: int,
+    order_in: schemas.PurchaseOrderUpdate,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Update a purchase order.
+    """
+    try:
+        order = await purchase.update_purchase_order(db, order_id, order_in, current_user.id)
+        if not order:
+            raise HTTPException(status_code=404, detail="Purchase order not found")
+        return order
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Purchase Receipt endpoints
+@router.post("/receipts", response_model=schemas.PurchaseReceipt)
+async def create_purchase_receipt(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    receipt_in: schemas.PurchaseReceiptCreate,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Create new purchase receipt.
+    """
+    try:
+        receipt = await purchase.create_purchase_receipt(db, receipt_in, current_user.id)
+        return receipt
+    except numbering.DuplicateDocumentNumber as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.put("/receipts/{receipt_id}", response_model=schemas.PurchaseReceipt)
+async def update_purchase_receipt(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    receipt_id: int,
+    receipt_in: schemas.PurchaseReceiptUpdate,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Update a purchase receipt.
+    """
+    try:
+        receipt = await purchase.update_purchase_receipt(
+            db, receipt_id, receipt_in, current_user.id
+        )
+        if not receipt:
+            raise HTTPException(status_code=404, detail="Purchase receipt not found")
+        return receipt
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
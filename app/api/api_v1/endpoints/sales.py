@@ -1,25 +1,34 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from app import models, schemas
 from app.api import deps
-from app.services import sales
+from app.services import numbering, receivables, reporting, sales
 
 router = APIRouter()
 
 # Customer endpoints
 @router.get("/customers", response_model=List[schemas.Customer])
 def read_customers(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve customers.
     """
-    customers = sales.get_customers(db, skip=skip, limit=limit)
-    return customers
+    try:
+        page = sales.get_customers(
+            db, skip=skip, limit=limit, cursor=cursor, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return deps.page_items(response, page)
 
 @router.post("/customers", response_model=schemas.Customer)
 def create_customer(
@@ -53,16 +62,24 @@ def update_customer(
 # Order endpoints
 @router.get("/orders", response_model=List[schemas.Order])
 def read_orders(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve orders.
     """
-    orders = sales.get_orders(db, skip=skip, limit=limit)
-    return orders
+    try:
+        page = sales.get_orders(
+            db, skip=skip, limit=limit, cursor=cursor, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return deps.page_items(response, page)
 
 @router.post("/orders", response_model=schemas.Order)
 def create_order(
@@ -77,6 +94,8 @@ def create_order(
     try:
         order = sales.create_order(db, order_in, current_user.id)
         return order
+    except numbering.DuplicateDocumentNumber as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -113,6 +132,8 @@ def create_invoice(
     try:
         invoice = sales.create_invoice(db, invoice_in, current_user.id)
         return invoice
+    except numbering.DuplicateDocumentNumber as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -127,10 +148,13 @@ def update_invoice(
     """
     Update an invoice.
     """
-    invoice = sales.update_invoice(db, invoice_id, invoice_in)
-    if not invoice:
-        raise HTTPException(status_code=404, detail="Invoice not found")
-    return invoice
+    try:
+        invoice = sales.update_invoice(db, invoice_id, invoice_in)
+        if not invoice:
+            raise HTTPException(status_code=404, detail="Invoice not found")
+        return invoice
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 # Payment endpoints
 @router.post("/payments", response_model=schemas.Payment)
@@ -154,12 +178,86 @@ def read_payments(
     *,
     db: Session = Depends(deps.get_db),
     invoice_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
     current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve payments for an invoice.
     """
-    payments = sales.get_payments(db, invoice_id, skip=skip, limit=limit)
-    return payments 
\ No newline at end of file
+    try:
+        page = sales.get_payments(
+            db, invoice_id, skip=skip, limit=limit, cursor=cursor, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return deps.page_items(response, page)
+
+# Report endpoints
+@router.get("/reports", response_model=List[schemas.SalesReportRow])
+def read_sales_report(
+    *,
+    db: Session = Depends(deps.get_db),
+    date_from: date,
+    date_to: date,
+    dimension: schemas.SalesReportDimension = schemas.SalesReportDimension.DAY,
+    limit: int = 100,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Revenue, quantity and discount totals for a date range, from the rollups.
+    """
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    return reporting.sales_report(db, dimension, date_from, date_to, limit=limit)
+
+# Receivables endpoints
+@router.get("/receivables/aging", response_model=List[schemas.AgingRow])
+def read_receivables_aging(
+    db: Session = Depends(deps.get_db),
+    as_of: Optional[date] = None,
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Compute outstanding balances per customer and aging bucket.
+    """
+    return receivables.get_aging(db, as_of or date.today())
+
+@router.get("/receivables/aging/snapshots/latest", response_model=schemas.AgingSnapshot)
+def read_latest_aging_snapshot(
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Get the most recent persisted aging snapshot.
+    """
+    snapshot = receivables.get_latest_aging_snapshot(db)
+    if not snapshot:
+        raise HTTPException(status_code=404, detail="No aging snapshot found")
+    return snapshot
+
+@router.post("/receivables/aging/snapshots", response_model=schemas.AgingSnapshot)
+def create_aging_snapshot(
+    db: Session = Depends(deps.get_db),
+    as_of: Optional[date] = None,
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Compute and persist an aging snapshot.
+    """
+    return receivables.create_aging_snapshot(db, as_of or date.today(), current_user.id)
+
+@router.post("/receivables/mark-overdue", response_model=schemas.OverdueUpdate)
+def mark_overdue_invoices(
+    db: Session = Depends(deps.get_db),
+    as_of: Optional[date] = None,
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Flag unpaid invoices past their due date as overdue.
+    """
+    as_of = as_of or date.today()
+    return {"as_of": as_of, "updated": receivables.mark_overdue_invoices(db, as_of)}
@@ -0,0 +1,197 @@
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models, schemas
+from app.api import deps
+from app.services import numbering
+from app.services import sales_async as sales
+
+router = APIRouter()
+
+# Customer endpoints
+@router.get("/customers", response_model=List[schemas.Customer])
+async def read_customers(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Retrieve customers.
+    """
+    try:
+        page = await sales.get_customers(
+            db, skip=skip, limit=limit, cursor=cursor, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return deps.page_items(response, page)
+
+@router.post("/customers", response_model=schemas.Customer)
+async def create_customer(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    customer_in: schemas.CustomerCreate,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Create new customer.
+    """
+    customer = await sales.create_customer(db, customer_in)
+    return customer
+
+@router.put("/customers/{customer_id}", response_model=schemas.Customer)
+async def update_customer(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    customer_id: int,
+    customer_in: schemas.CustomerUpdate,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Update a customer.
+    """
+    customer = await sales.update_customer(db, customer_id, customer_in)
+    if not customer:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return customer
+
+# Order endpoints
+@router.get("/orders", response_model=List[schemas.Order])
+async def read_orders(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Retrieve orders.
+    """
+    try:
+        page = await sales.get_orders(
+            db, skip=skip, limit=limit, cursor=cursor, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return deps.page_items(response, page)
+
+@router.post("/orders", response_model=schemas.Order)
+async def create_order(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    order_in: schemas.OrderCreate,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Create new order.
+    """
+    try:
+        order = await sales.create_order(db, order_in, current_user.id)
+        return order
+    except numbering.DuplicateDocumentNumber as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.put("/orders/{order_id}", response_model=schemas.Order)
+async def update_order(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    order_id: int,
+    order_in: schemas.OrderUpdate,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Update an order.
+    """
+    try:
+        order = await sales.update_order(db, order_id, order_in, current_user.id)
+        if not order:
+            raise HTTPException(status_code=404, detail="Order not found")
+        return order
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Invoice endpoints
+@router.post("/invoices", response_model=schemas.Invoice)
+async def create_invoice(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    invoice_in: schemas.InvoiceCreate,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Create new invoice.
+    """
+    try:
+        invoice = await sales.create_invoice(db, invoice_in, current_user.id)
+        return invoice
+    except numbering.DuplicateDocumentNumber as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.put("/invoices/{invoice_id}", response_model=schemas.Invoice)
+async def update_invoice(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    invoice_id: int,
+    invoice_in: schemas.InvoiceUpdate,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Update an invoice.
+    """
+    try:
+        invoice = await sales.update_invoice(db, invoice_id, invoice_in)
+        if not invoice:
+            raise HTTPException(status_code=404, detail="Invoice not found")
+        return invoice
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Payment endpoints
+@router.post("/payments", response_model=schemas.Payment)
+async def create_payment(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    payment_in: schemas.PaymentCreate,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Create new payment.
+    """
+    try:
+        payment = await sales.create_payment(db, payment_in, current_user.id)
+        return payment
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/payments/{invoice_id}", response_model=List[schemas.Payment])
+async def read_payments(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    invoice_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    current_user: models.User = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Retrieve payments for an invoice.
+    """
+    try:
+        page = await sales.get_payments(
+            db, invoice_id, skip=skip, limit=limit, cursor=cursor, sort=sort
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return deps.page_items(response, page)
@@ -1,26 +1,34 @@
 from datetime import timedelta
-from typing import Any, List
+from typing import Any, Dict, List
 from fastapi import APIRouter, Body, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app import crud, models, schemas
 from app.api import deps
 from app.core import security
+from app.core.cache import principal_cache
 from app.core.config import settings
 
 router = APIRouter()
 
 @router.post("/login", response_model=schemas.Token)
-def login(
+async def login(
     db: Session = Depends(deps.get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = crud.user.authenticate(
-        db, email=form_data.username, password=form_data.password
-    )
+    try:
+        user = await crud.user.authenticate_async(
+            db, email=form_data.username, password=form_data.password
+        )
+    except security.PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts in progress, retry shortly",
+            headers={"Retry-After": "1"},
+        )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -78,4 +86,13 @@ def read_user_me(
     """
     Get current user.
     """
-    return current_user 
\ No newline at end of file
+    return current_user
+
+@router.get("/users/principal-cache", response_model=Dict[str, Any])
+def read_principal_cache_stats(
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Get hit/miss counters of the authenticated principal cache.
+    """
+    return principal_cache.stats()
@@ -1,13 +1,19 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+import time
+from typing import Any, AsyncGenerator, Generator, List, Optional
+from fastapi import Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app import crud, models, schemas
 from app.core import security
+from app.core.cache import principal_cache
 from app.core.config import settings
+from app.db import session
+from app.db.pagination import Page
 from app.db.session import SessionLocal
+from app.services import user_async
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/login")
 
@@ -18,23 +24,52 @@ def get_db() -> Generator:
     finally:
         db.close()
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> models.User:
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    if session.AsyncSessionLocal is None:
+        raise RuntimeError("Async database access requires DB_ASYNC_MODE")
+    async with session.AsyncSessionLocal() as db:
+        yield db
+
+def page_items(response: Response, page: Page) -> List[Any]:
+    """
+    Expose the keyset cursor for the next page and return the page rows.
+    """
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return page.items
+
+def _decode_token(token: str) -> schemas.TokenPayload:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        token_data = schemas.TokenPayload(**payload)
+        return schemas.TokenPayload(**payload)
     except (JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
+
+def _cache_principal(token_data: schemas.TokenPayload, user: models.User) -> None:
+    ttl = None
+    if token_data.exp is not None:
+        ttl = token_data.exp - time.time()
+    principal_cache.set((token_data.sub, token_data.exp), user, ttl=ttl)
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+) -> models.User:
+    token_data = _decode_token(token)
+    user = principal_cache.get((token_data.sub, token_data.exp))
+    if user is not None:
+        return user
     user = crud.user.get(db, id=token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    # Detach so commits in later requests cannot expire the cached instance
+    db.expunge(user)
+    _cache_principal(token_data, user)
     return user
 
 def get_current_active_user(
@@ -44,6 +79,21 @@ def get_current_active_user(
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
+def get_current_active_user_for_stream(
+    token: str = Depends(oauth2_scheme),
+) -> models.User:
+    """
+    get_current_active_user for streaming responses. A yield dependency's
+    session stays open until the response has been sent, so the lookup
+    uses its own session, closed before the stream starts.
+    """
+    db = SessionLocal()
+    try:
+        current_user = get_current_user(db, token)
+    finally:
+        db.close()
+    return get_current_active_user(current_user)
+
 def get_current_active_superuser(
     current_user: models.User = Depends(get_current_active_user),
 ) -> models.User:
@@ -51,4 +101,26 @@ def get_current_active_superuser(
         raise HTTPException(
             status_code=400, detail="The user doesn't have enough privileges"
         )
-    return current_user 
\ No newline at end of file
+    return current_user
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme)
+) -> models.User:
+    token_data = _decode_token(token)
+    user = principal_cache.get((token_data.sub, token_data.exp))
+    if user is not None:
+        return user
+    user = await user_async.get(db, id=token_data.sub)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    db.expunge(user)
+    _cache_principal(token_data, user)
+    return user
+
+async def get_current_active_user_async(
+    current_user: models.User = Depends(get_current_user_async),
+) -> models.User:
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
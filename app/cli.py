@@ -0,0 +1,166 @@
+import argparse
+from datetime import date, datetime, timedelta, timezone
+from app.db.session import SessionLocal
+from app.services import credit, inventory, receivables, replenishment, reporting, sales, valuation
+
+def reconcile_payments(args: argparse.Namespace) -> None:
+    db = SessionLocal()
+    try:
+        mismatches = sales.reconcile_invoice_payments(db, fix=args.fix)
+    finally:
+        db.close()
+    for mismatch in mismatches:
+        print(
+            f"invoice {mismatch['invoice_id']}: amount_paid={mismatch['amount_paid']} "
+            f"ledger={mismatch['ledger_paid']}"
+        )
+    action = "fixed" if args.fix else "found"
+    print(f"{len(mismatches)} mismatched invoice(s) {action}")
+
+def rebuild_rollups(args: argparse.Namespace) -> None:
+    day_from, day_to = args.date_from, args.date_to
+    if day_from is None or day_to is None:
+        db = SessionLocal()
+        try:
+            order_days = reporting.order_day_range(db)
+        finally:
+            db.close()
+        if order_days is None:
+            print("no orders, nothing to rebuild")
+            return
+        day_from = day_from or order_days[0]
+        day_to = day_to or order_days[1]
+    chunks = reporting.rebuild_rollups_parallel(
+        day_from, day_to, chunk_days=args.chunk_days, workers=args.workers
+    )
+    print(f"rebuilt sales rollups {day_from}..{day_to} in {chunks} chunk(s)")
+
+def ar_aging(args: argparse.Namespace) -> None:
+    as_of = args.as_of or date.today()
+    db = SessionLocal()
+    try:
+        updated = receivables.mark_overdue_invoices(db, as_of)
+        print(f"{updated} invoice(s) marked overdue")
+        if not args.no_snapshot:
+            snapshot = receivables.create_aging_snapshot(db, as_of)
+            print(f"aging snapshot {snapshot.id} as of {as_of}: {len(snapshot.lines)} customer(s)")
+    finally:
+        db.close()
+
+def recompute_exposure(args: argparse.Namespace) -> None:
+    db = SessionLocal()
+    try:
+        changed = credit.recompute_exposure(db)
+    finally:
+        db.close()
+    print(f"{changed} customer exposure figure(s) corrected")
+
+def stock_checkpoint(args: argparse.Namespace) -> None:
+    db = SessionLocal()
+    try:
+        written = inventory.write_stock_checkpoints(db, args.as_of)
+        if written is None:
+            print("a checkpoint at or after that time already exists, nothing written")
+        else:
+            print(f"stock checkpoint written: {written} product/location position(s)")
+        if args.keep_days is not None:
+            before = datetime.now(timezone.utc) - timedelta(days=args.keep_days)
+            pruned = inventory.prune_stock_checkpoints(db, before)
+            print(f"{pruned} old checkpoint run(s) pruned")
+    finally:
+        db.close()
+
+def plan_replenishment(args: argparse.Namespace) -> None:
+    db = SessionLocal()
+    try:
+        suggestions = replenishment.plan_replenishment(db, args.today)
+        print(f"{len(suggestions)} product(s) below their reorder point")
+        if args.create_drafts:
+            orders = replenishment.create_draft_orders(db, suggestions, args.user_id)
+            for order in orders:
+                print(f"draft purchase order {order.order_number}: {len(order.items)} line(s)")
+            unassigned = sum(1 for s in suggestions if s["supplier_id"] is None)
+            if unassigned:
+                print(f"{unassigned} product(s) without a known supplier left out")
+    finally:
+        db.close()
+
+def rebuild_valuation(args: argparse.Namespace) -> None:
+    partitions = args.partitions or args.workers * 4
+    products = valuation.rebuild_valuation(partitions=partitions, workers=args.workers)
+    print(f"rebuilt inventory valuation of {products} product(s) in {partitions} partition(s)")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser(
+        "reconcile-payments",
+        help="Check invoice.amount_paid against the payment ledger",
+    )
+    command.add_argument("--fix", action="store_true", help="Correct mismatches")
+    command.set_defaults(handler=reconcile_payments)
+
+    command = commands.add_parser(
+        "rebuild-rollups",
+        help="Recompute the daily sales rollups from orders",
+    )
+    command.add_argument("--date-from", type=date.fromisoformat, help="First day (YYYY-MM-DD)")
+    command.add_argument("--date-to", type=date.fromisoformat, help="Last day (YYYY-MM-DD)")
+    command.add_argument("--chunk-days", type=int, default=31, help="Days per chunk")
+    command.add_argument("--workers", type=int, default=4, help="Chunks rebuilt concurrently")
+    command.set_defaults(handler=rebuild_rollups)
+
+    command = commands.add_parser(
+        "ar-aging",
+        help="Mark overdue invoices and persist an aging snapshot",
+    )
+    command.add_argument("--as-of", type=date.fromisoformat, help="Aging date (YYYY-MM-DD)")
+    command.add_argument("--no-snapshot", action="store_true", help="Only mark overdue invoices")
+    command.set_defaults(handler=ar_aging)
+
+    command = commands.add_parser(
+        "recompute-exposure",
+        help="Rebuild customer credit exposure from orders and invoices",
+    )
+    command.set_defaults(handler=recompute_exposure)
+
+    command = commands.add_parser(
+        "stock-checkpoint",
+        help="Checkpoint on-hand stock per product and location from the movement ledger",
+    )
+    command.add_argument(
+        "--as-of", type=datetime.fromisoformat, help="Checkpoint time (ISO 8601, default: now - lag)"
+    )
+    command.add_argument(
+        "--keep-days", type=int,
+        help="Prune runs older than this many days, keeping each month's last",
+    )
+    command.set_defaults(handler=stock_checkpoint)
+
+    command = commands.add_parser(
+        "plan-replenishment",
+        help="Suggest purchase quantities and optionally draft purchase orders",
+    )
+    command.add_argument("--today", type=date.fromisoformat, help="Planning date (YYYY-MM-DD)")
+    command.add_argument(
+        "--create-drafts", action="store_true", help="Draft one purchase order per supplier"
+    )
+    command.add_argument("--user-id", type=int, default=1, help="Creator of the drafts")
+    command.set_defaults(handler=plan_replenishment)
+
+    command = commands.add_parser(
+        "rebuild-valuation",
+        help="Recompute average and FIFO valuation from the stock movement ledger",
+    )
+    command.add_argument("--workers", type=int, default=4, help="Worker processes")
+    command.add_argument(
+        "--partitions", type=int, help="Product partitions (default: 4 per worker)"
+    )
+    command.set_defaults(handler=rebuild_valuation)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
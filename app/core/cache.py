@@ -0,0 +1,257 @@
+import fnmatch
+import math
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, Optional
+from app.core.config import settings
+
+def sizeof(value: Any) -> int:
+    """
+    Approximate memory held by ``value``, following containers.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(sizeof(k) + sizeof(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(sizeof(item) for item in value)
+    return size
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after a TTL. With
+    ``max_bytes`` the least recently used entries are also evicted to keep
+    the approximate memory held under that cap.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, max_bytes: Optional[int] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at, _ = entry
+            if expires_at <= now:
+                self._pop(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        missing = object()
+        found = {key: self.get(key, missing) for key in keys}
+        return {key: value for key, value in found.items() if value is not missing}
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + ttl
+        size = sizeof(key) + sizeof(value) if self.max_bytes is not None else 0
+        with self._lock:
+            self._pop(key)
+            self._data[key] = (value, expires_at, size)
+            self.bytes += size
+            while self._data and (
+                len(self._data) > self.maxsize
+                or (self.max_bytes is not None and self.bytes > self.max_bytes)
+            ):
+                _, (_, _, evicted) = self._data.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def _pop(self, key: Hashable) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._pop(key)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        with self._lock:
+            stale = [key for key in self._data if predicate(key)]
+            for key in stale:
+                self._pop(key)
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "bytes": self.bytes if self.max_bytes is not None else None,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+class LocalStore:
+    """
+    In-process stand-in for a shared key-value store, implementing the
+    subset of the Redis client API that SharedCache uses.
+    """
+
+    def __init__(self) -> None:
+        self._data: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[1] is not None and entry[1] <= time.monotonic():
+                del self._data[key]
+                return None
+            return entry[0]
+
+    def mget(self, keys: Iterable[str]) -> list:
+        return [self.get(key) for key in keys]
+
+    def set(self, key: str, value: bytes, ex: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + ex if ex is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(self._data.pop(key, None) is not None for key in keys)
+
+    def scan_iter(self, match: str = "*") -> Iterator[str]:
+        with self._lock:
+            keys = list(self._data)
+        return (key for key in keys if fnmatch.fnmatchcase(key, match))
+
+    def memory_usage(self) -> int:
+        with self._lock:
+            return sum(len(key) + len(value) for key, (value, _) in self._data.items())
+
+class SharedCache:
+    """
+    Cache kept in a key-value store shared by all workers (a Redis client
+    or LocalStore), so an invalidation in one worker is seen by all.
+    Values are pickled; keys are namespaced by ``prefix``.
+    """
+
+    def __init__(self, client: Any, prefix: str, ttl: float):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.prefix}:{key!r}"
+
+    def _count(self, hits: int, misses: int) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        raw = self.client.get(self._key(key))
+        self._count(raw is not None, raw is None)
+        return pickle.loads(raw) if raw is not None else default
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        found = {
+            key: pickle.loads(raw)
+            for key, raw in zip(keys, self.client.mget([self._key(k) for k in keys]))
+            if raw is not None
+        }
+        self._count(len(found), len(keys) - len(found))
+        return found
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self.client.set(self._key(key), pickle.dumps(value), ex=math.ceil(ttl))
+
+    def delete(self, key: Hashable) -> None:
+        self.client.delete(self._key(key))
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=f"{self.prefix}:*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "shared",
+                "ttl": self.ttl,
+                # Whole store, not just this prefix
+                "bytes": self.client.memory_usage() if isinstance(self.client, LocalStore) else None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+_shared_client: Optional[Any] = None
+
+def shared_client() -> Any:
+    """
+    The process-wide shared store: Redis at CACHE_REDIS_URL, or a
+    LocalStore when no URL is configured.
+    """
+    global _shared_client
+    if _shared_client is None:
+        if settings.CACHE_REDIS_URL:
+            # Optional dependency, only needed for a Redis-backed cache
+            import redis
+            _shared_client = redis.Redis.from_url(settings.CACHE_REDIS_URL)
+        else:
+            _shared_client = LocalStore()
+    return _shared_client
+
+def make_cache(prefix: str, maxsize: int, ttl: float, max_bytes: Optional[int] = None) -> Any:
+    """
+    A TTLCache or SharedCache depending on CACHE_BACKEND; both offer
+    get/get_many/set/delete/clear/stats.
+    """
+    if settings.CACHE_BACKEND == "shared":
+        return SharedCache(shared_client(), prefix, ttl)
+    return TTLCache(maxsize=maxsize, ttl=ttl, max_bytes=max_bytes)
+
+# Authenticated users keyed by (token subject, token expiry)
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+def invalidate_principal(user_id: int) -> None:
+    principal_cache.invalidate_where(lambda key: key[0] == user_id)
@@ -11,12 +11,87 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_DB: str = "erp_db"
     SQLALCHEMY_DATABASE_URI: Optional[str] = None
+    SQLALCHEMY_ASYNC_DATABASE_URI: Optional[str] = None
+    # Serve the CRUD endpoints through AsyncEngine/AsyncSession instead of
+    # the threadpool-bound sync Session
+    DB_ASYNC_MODE: bool = False
+
+    # SQL instrumentation: fraction of requests whose statements are timed
+    # and fingerprinted (Server-Timing header + report endpoint)
+    SQL_INSTRUMENTATION_SAMPLE_RATE: float = 0.0
+    # Same statement fingerprint this many times in one request flags N+1
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+    # Test mode: fail any request that issues more SQL statements than this
+    SQL_STATEMENT_BUDGET: Optional[int] = None
 
     # JWT
     SECRET_KEY: str = "your-secret-key-here"  # Change in production
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Principal cache (authenticated users resolved from JWTs)
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+
+    # Password hashing
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_DEPTH: int = 64
+
+    # Shared caches: "memory" (per worker) or "shared" (Redis at
+    # CACHE_REDIS_URL, or an in-process stand-in when unset)
+    CACHE_BACKEND: str = "memory"
+    CACHE_REDIS_URL: Optional[str] = None
+
+    # Inventory
+    # Reject stock movements that would take a location below zero
+    STOCK_PREVENT_NEGATIVE: bool = False
+    STOCK_MOVEMENT_BATCH_MAX_SIZE: int = 50000
+    # Stock checkpoints are written this far behind now, so transactions
+    # still in flight when the job runs are not left out
+    STOCK_CHECKPOINT_LAG_SECONDS: int = 300
+    # Low-stock alerts on min_stock_level crossings; an alert that
+    # recovered less than the debounce ago is reopened, not raised again
+    STOCK_ALERTS_ENABLED: bool = True
+    STOCK_ALERT_DEBOUNCE_SECONDS: int = 300
+    STOCK_ALERT_STREAM_POLL_SECONDS: float = 2.0
+    CATEGORY_TREE_CACHE_TTL_SECONDS: int = 300
+    # Product/category snapshots read by order and purchase validation
+    CATALOG_CACHE_SIZE: int = 50000
+    CATALOG_CACHE_TTL_SECONDS: int = 600
+    CATALOG_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Product search: "postgresql" (pg_trgm), "memory" (in-process index)
+    # or "auto" to pick by database dialect
+    PRODUCT_SEARCH_BACKEND: str = "auto"
+    PRODUCT_SEARCH_INDEX_REFRESH_SECONDS: int = 300
+    # Fuzzy-match cutoff of the in-process index; pg_trgm uses its own
+    # pg_trgm.similarity_threshold (also 0.3 by default)
+    PRODUCT_SEARCH_MIN_SIMILARITY: float = 0.3
+
+    # Replenishment planner: demand from the daily sales rollup over the
+    # history window, blended with the recent window by REPLENISHMENT_RECENT_WEIGHT
+    REPLENISHMENT_HISTORY_DAYS: int = 90
+    REPLENISHMENT_RECENT_DAYS: int = 28
+    REPLENISHMENT_RECENT_WEIGHT: float = 0.6
+    # Safety stock in standard deviations of daily demand (1.65 ~ 95% service)
+    REPLENISHMENT_SAFETY_FACTOR: float = 1.65
+    # Used for suppliers without purchase order history
+    REPLENISHMENT_DEFAULT_LEAD_TIME_DAYS: int = 14
+    # Days of demand an order covers beyond the reorder point
+    REPLENISHMENT_REVIEW_DAYS: int = 14
+
+    # Sales
+    # Orders over a customer's credit limit: "reject" them or "flag" them
+    # with credit_hold
+    CREDIT_LIMIT_MODE: str = "reject"
+
+    # Document numbering (orders, invoices, purchase orders, receipts)
+    DOCUMENT_NUMBER_BLOCK_SIZE: int = 100
+    DOCUMENT_NUMBER_PADDING: int = 6
+    # Allocate invoice numbers in the invoice's own transaction so a
+    # rolled-back invoice does not leave a gap
+    INVOICE_NUMBERS_GAPLESS: bool = True
+
     class Config:
         case_sensitive = True
         env_file = ".env"
@@ -28,5 +103,10 @@ class Settings(BaseSettings):
                 f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
                 f"@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
             )
+        if not self.SQLALCHEMY_ASYNC_DATABASE_URI:
+            self.SQLALCHEMY_ASYNC_DATABASE_URI = (
+                f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
+                f"@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
+            )
 
 settings = Settings() 
\ No newline at end of file
@@ -1,4 +1,9 @@
 from app.db.base_class import Base
 from app.models.user import User
-from app.models.inventory import Category, Product, Stock, StockMovement
-from app.models.sales import Customer, Order, OrderItem, Invoice, Payment 
\ No newline at end of file
+from app.models.inventory import (
+    Category, Product, Stock, StockAlert, StockAvailability, StockCheckpoint, StockMovement
+)
+from app.models.sales import Customer, Order, OrderItem, Invoice, Payment 
+from app.models.numbering import DocumentSequence
+from app.models.reporting import SalesDailyProduct, SalesDailyCustomer, SalesDailyCategory, AgingSnapshot, AgingSnapshotLine
+from app.models.valuation import ProductValuation, CostLayer, CogsEntry
@@ -0,0 +1,112 @@
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)\s*,)+\s*(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+def fingerprint(statement: str) -> str:
+    """
+    Normalize a statement so repeats of the same query with different
+    parameters (the N+1 shape) collapse to one key.
+    """
+    statement = _LITERAL.sub("?", statement)
+    statement = _PLACEHOLDER_LIST.sub("(?)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+class RequestSQLStats:
+    """
+    SQL activity of one request, fed by the engine hooks in app.db.session.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.fingerprints: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        if duration > self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = statement
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self) -> List[Tuple[str, int]]:
+        threshold = settings.SQL_N_PLUS_ONE_THRESHOLD
+        return [(fp, n) for fp, n in self.fingerprints.most_common() if n >= threshold]
+
+    def server_timing(self) -> str:
+        metrics = [
+            f'db;dur={self.total_time * 1000:.2f};desc="{self.count} statements"',
+            f"db-slowest;dur={self.slowest_time * 1000:.2f}",
+        ]
+        repeated = self.repeated()
+        if repeated:
+            metrics.append(f'db-repeated;desc="{len(repeated)} fingerprints, max {repeated[0][1]}x"')
+        return ", ".join(metrics)
+
+class SQLReport:
+    """
+    In-memory aggregate of sampled requests, keyed by route template.
+    """
+
+    def __init__(self, max_fingerprints: int = 20) -> None:
+        self.max_fingerprints = max_fingerprints
+        self._routes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, route: str, stats: RequestSQLStats) -> None:
+        repeated = stats.repeated()
+        with self._lock:
+            entry = self._routes.setdefault(route, {
+                "requests": 0,
+                "statements": 0,
+                "db_time_ms": 0.0,
+                "max_statements": 0,
+                "slowest_ms": 0.0,
+                "slowest_statement": None,
+                "n_plus_one_requests": 0,
+                "repeated": Counter(),
+            })
+            entry["requests"] += 1
+            entry["statements"] += stats.count
+            entry["db_time_ms"] += stats.total_time * 1000
+            entry["max_statements"] = max(entry["max_statements"], stats.count)
+            if stats.slowest_time * 1000 > entry["slowest_ms"]:
+                entry["slowest_ms"] = stats.slowest_time * 1000
+                entry["slowest_statement"] = stats.slowest_statement
+            if repeated:
+                entry["n_plus_one_requests"] += 1
+                for fp, n in repeated:
+                    entry["repeated"][fp] = max(entry["repeated"][fp], n)
+                if len(entry["repeated"]) > self.max_fingerprints:
+                    entry["repeated"] = Counter(
+                        dict(entry["repeated"].most_common(self.max_fingerprints))
+                    )
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                route: {
+                    **{k: v for k, v in entry.items() if k != "repeated"},
+                    "avg_statements": entry["statements"] / entry["requests"],
+                    "avg_db_time_ms": entry["db_time_ms"] / entry["requests"],
+                    "repeated": [
+                        {"fingerprint": fp, "max_per_request": n}
+                        for fp, n in entry["repeated"].most_common()
+                    ],
+                }
+                for route, entry in self._routes.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+sql_report = SQLReport()
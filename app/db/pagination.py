@@ -0,0 +1,132 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import tuple_
+
+class InvalidCursor(ValueError):
+    pass
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+
+def _dump_value(value: Any) -> Tuple[str, Any]:
+    if isinstance(value, datetime):
+        return "dt", value.isoformat()
+    if isinstance(value, date):
+        return "d", value.isoformat()
+    return "v", value
+
+def _load_value(kind: str, value: Any) -> Any:
+    if kind == "dt":
+        return datetime.fromisoformat(value)
+    if kind == "d":
+        return date.fromisoformat(value)
+    return value
+
+def encode_cursor(sort: str, value: Any, id: int) -> str:
+    kind, dumped = _dump_value(value)
+    raw = json.dumps({"s": sort, "k": kind, "v": dumped, "i": id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return {
+            "sort": data["s"],
+            "value": _load_value(data["k"], data["v"]),
+            "id": int(data["i"]),
+        }
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursor("Invalid pagination cursor")
+
+def keyset(
+    query: Any,
+    id_column: Any,
+    sort_fields: Dict[str, Any],
+    sort: Optional[str] = None,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> Tuple[Any, str, str]:
+    """
+    Order ``query`` (a legacy Query or a 2.0 Select) by ``(sort_key, id)``
+    and seek past ``cursor`` when given, falling back to ``skip`` otherwise.
+
+    ``sort`` is one of ``sort_fields`` optionally prefixed with "-" for
+    descending order. One extra row is fetched so build_page can tell
+    whether another page exists.
+    """
+    sort = sort or "id"
+    descending = sort.startswith("-")
+    field = sort.lstrip("-")
+    if field not in sort_fields:
+        raise InvalidCursor(
+            f"Unsupported sort field '{field}', expected one of: {', '.join(sort_fields)}"
+        )
+    sort_column = sort_fields[field]
+
+    if sort_column is id_column:
+        order_by = [id_column.desc() if descending else id_column.asc()]
+    elif descending:
+        order_by = [sort_column.desc(), id_column.desc()]
+    else:
+        order_by = [sort_column.asc(), id_column.asc()]
+    query = query.order_by(*order_by)
+
+    if cursor:
+        position = decode_cursor(cursor)
+        if position["sort"] != sort:
+            raise InvalidCursor("Cursor was issued for a different sort order")
+        if sort_column is id_column:
+            key, bound = id_column, position["id"]
+        else:
+            key = tuple_(sort_column, id_column)
+            bound = tuple_(position["value"], position["id"])
+        query = query.filter(key < bound if descending else key > bound)
+    elif skip:
+        query = query.offset(skip)
+
+    return query.limit(limit + 1), sort, field
+
+def build_page(
+    rows: List[Any], sort: str, field: str, limit: int
+) -> Page:
+    if len(rows) <= limit:
+        return Page(list(rows), None)
+    rows = list(rows[:limit])
+    last = rows[-1]
+    return Page(rows, encode_cursor(sort, getattr(last, field), last.id))
+
+def paginate(
+    query: Any,
+    id_column: Any,
+    sort_fields: Dict[str, Any],
+    sort: Optional[str] = None,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> Page:
+    query, sort, field = keyset(
+        query, id_column, sort_fields, sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
+    return build_page(query.all(), sort, field, limit)
+
+async def paginate_async(
+    db: Any,
+    stmt: Any,
+    id_column: Any,
+    sort_fields: Dict[str, Any],
+    sort: Optional[str] = None,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> Page:
+    stmt, sort, field = keyset(
+        stmt, id_column, sort_fields, sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
+    result = await db.execute(stmt)
+    return build_page(result.scalars().all(), sort, field, limit)
+
@@ -1,14 +1,65 @@
-from sqlalchemy import create_engine
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.instrumentation import RequestSQLStats
 
 engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine is only built in async mode so the async driver
+# (asyncpg/aiosqlite) stays optional for sync deployments
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC_MODE:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        settings.SQLALCHEMY_ASYNC_DATABASE_URI, pool_pre_ping=True
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
+_sql_stats: ContextVar[Optional[RequestSQLStats]] = ContextVar(
+    "sql_stats", default=None
+)
+
+@contextmanager
+def collect_sql_stats() -> Iterator[RequestSQLStats]:
+    """
+    Record SQL statements issued within the block, including work done in
+    threadpool workers and tasks spawned from it (they inherit the context).
+    """
+    stats = RequestSQLStats()
+    token = _sql_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _sql_stats.reset(token)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _sql_stats.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _sql_stats.get()
+    if stats is not None:
+        starts = conn.info.get("query_start")
+        if starts:
+            stats.record(statement, time.perf_counter() - starts.pop())
+
+for _engine in filter(None, (engine, async_engine and async_engine.sync_engine)):
+    event.listen(_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(_engine, "after_cursor_execute", _after_cursor_execute)
+
 # Dependency
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
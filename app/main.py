@@ -1,7 +1,10 @@
-from fastapi import FastAPI
+import random
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.api_v1.api import api_router
+from app.db.instrumentation import sql_report
+from app.db.session import collect_sql_stats
 
 app = FastAPI(
     title="Modern ERP System",
@@ -17,8 +20,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing"],
 )
 
+@app.middleware("http")
+async def sql_instrumentation(request: Request, call_next):
+    budget = settings.SQL_STATEMENT_BUDGET
+    if budget is None and random.random() >= settings.SQL_INSTRUMENTATION_SAMPLE_RATE:
+        return await call_next(request)
+
+    with collect_sql_stats() as stats:
+        response = await call_next(request)
+    if budget is not None and stats.count > budget:
+        raise AssertionError(
+            f"{request.method} {request.url.path} issued {stats.count} SQL "
+            f"statements, budget is {budget}"
+        )
+    route = request.scope.get("route")
+    sql_report.add(
+        f"{request.method} {getattr(route, 'path', request.url.path)}", stats
+    )
+    response.headers["Server-Timing"] = stats.server_timing()
+    return response
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -1 +1,134 @@
- 
\ No newline at end of file
+from sqlalchemy import Boolean, Column, Integer, String, Float, ForeignKey, DateTime, Text, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import false, func
+from app.db.base_class import Base
+
+class Category(Base):
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, index=True, nullable=False)
+    description = Column(Text)
+    parent_id = Column(Integer, ForeignKey("category.id"))
+    # Materialized path of ancestor ids, e.g. "/1/7/42/"; a subtree is a
+    # prefix match
+    path = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relationships
+    parent = relationship("Category", remote_side=[id], back_populates="children")
+    children = relationship("Category", back_populates="parent")
+    products = relationship("Product", back_populates="category")
+
+    __table_args__ = (
+        Index("ix_category_name_id", "name", "id"),
+        Index("ix_category_path", "path", postgresql_ops={"path": "varchar_pattern_ops"}),
+    )
+
+class Product(Base):
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, index=True, nullable=False)
+    sku = Column(String, unique=True, index=True, nullable=False)
+    description = Column(Text)
+    category_id = Column(Integer, ForeignKey("category.id"), nullable=False)
+    unit_price = Column(Float, nullable=False)
+    cost_price = Column(Float, nullable=False)
+    min_stock_level = Column(Integer, nullable=False, default=0)
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relationships
+    category = relationship("Category", back_populates="products")
+    stock = relationship("Stock", back_populates="product")
+
+    __table_args__ = (
+        Index("ix_product_name_id", "name", "id"),
+        Index("ix_product_created_at_id", "created_at", "id"),
+        Index("ix_product_sku_id", "sku", "id"),
+    )
+
+class Stock(Base):
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("product.id"), nullable=False)
+    quantity = Column(Integer, nullable=False, default=0)
+    location = Column(String, nullable=False, default="default")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relationships
+    product = relationship("Product", back_populates="stock")
+
+    __table_args__ = (
+        Index("ix_stock_product_id_location", "product_id", "location", unique=True),
+        Index("ix_stock_location_id", "location", "id"),
+        Index("ix_stock_location_product_id_id", "location", "product_id", "id"),
+    )
+
+# Total on-hand quantity of a product across all locations, kept current by
+# every stock write in the same transaction
+class StockAvailability(Base):
+    product_id = Column(Integer, ForeignKey("product.id"), primary_key=True)
+    quantity = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class StockMovement(Base):
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("product.id"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    movement_type = Column(String, nullable=False)  # "in" or "out"
+    location = Column(String, nullable=False, default="default", server_default="default")
+    reference = Column(String)
+    notes = Column(Text)
+    # Cost per unit of an inbound movement, as valued when it was posted
+    unit_cost = Column(Float)
+    # Legs of a location transfer; they leave valuation untouched
+    is_transfer = Column(Boolean, nullable=False, default=False, server_default=false())
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_by = Column(Integer, ForeignKey("user.id"), nullable=False)
+
+    # Relationships
+    product = relationship("Product")
+    user = relationship("User")
+
+    __table_args__ = (
+        Index("ix_stockmovement_product_id_id", "product_id", "id"),
+        Index("ix_stockmovement_product_id_created_at_id", "product_id", "created_at", "id"),
+        Index("ix_stockmovement_created_at", "created_at"),
+    )
+
+# On-hand quantity per (product, location) as of a point in time, written by
+# app.services.inventory.write_stock_checkpoints. Every run carries all
+# known pairs forward, so one run's rows are a complete catalog position.
+class StockCheckpoint(Base):
+    as_of = Column(DateTime(timezone=True), primary_key=True)
+    product_id = Column(Integer, ForeignKey("product.id"), primary_key=True)
+    location = Column(String, primary_key=True)
+    quantity = Column(Integer, nullable=False)
+
+# One row per low-stock episode of a stock row, raised and resolved by
+# app.services.stock_alerts when the quantity crosses min_stock_level.
+# At most one alert per (product, location) is open at a time.
+class StockAlert(Base):
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("product.id"), nullable=False)
+    location = Column(String, nullable=False)
+    min_stock_level = Column(Integer, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    raised_at = Column(DateTime(timezone=True), nullable=False)
+    resolved_at = Column(DateTime(timezone=True))
+    # Last raise/resolve; the alert stream polls on it
+    changed_at = Column(DateTime(timezone=True), nullable=False)
+
+    # Relationships
+    product = relationship("Product")
+
+    __table_args__ = (
+        Index(
+            "ix_stockalert_open_product_id_location", "product_id", "location",
+            unique=True,
+            postgresql_where=resolved_at.is_(None),
+            sqlite_where=resolved_at.is_(None),
+        ),
+        Index("ix_stockalert_changed_at", "changed_at"),
+        Index("ix_stockalert_raised_at_id", "raised_at", "id"),
+    )
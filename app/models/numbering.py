@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, String
+from app.db.base_class import Base
+
+class DocumentSequence(Base):
+    # One counter per document type and year; last_value is the highest
+    # number handed out (or reserved by a worker's block)
+    name = Column(String, primary_key=True)
+    year = Column(Integer, primary_key=True)
+    last_value = Column(Integer, nullable=False, default=0)
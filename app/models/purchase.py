@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, Float, ForeignKey, DateTime, Text, Enum
+from sqlalchemy import Boolean, Column, Integer, String, Float, ForeignKey, DateTime, Text, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -14,6 +14,7 @@ class PurchaseOrderStatus(str, enum.Enum):
     DRAFT = "draft"
     SENT = "sent"
     CONFIRMED = "confirmed"
+    PARTIALLY_RECEIVED = "partially_received"
     RECEIVED = "received"
     CANCELLED = "cancelled"
 
@@ -38,6 +39,10 @@ class Supplier(Base):
     # Relationships
     purchase_orders = relationship("PurchaseOrder", back_populates="supplier")
 
+    __table_args__ = (
+        Index("ix_supplier_name_id", "name", "id"),
+    )
+
 class PurchaseOrder(Base):
     id = Column(Integer, primary_key=True, index=True)
     supplier_id = Column(Integer, ForeignKey("supplier.id"), nullable=False)
@@ -57,6 +62,12 @@ class PurchaseOrder(Base):
     receipts = relationship("PurchaseReceipt", back_populates="order")
     user = relationship("User")
 
+    __table_args__ = (
+        Index("ix_purchaseorder_order_date_id", "order_date", "id"),
+        Index("ix_purchaseorder_expected_date_id", "expected_date", "id"),
+        Index("ix_purchaseorder_order_number_id", "order_number", "id"),
+    )
+
 class PurchaseOrderItem(Base):
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("purchaseorder.id"), nullable=False)
@@ -65,6 +76,8 @@ class PurchaseOrderItem(Base):
     unit_price = Column(Float, nullable=False)
     discount = Column(Float, default=0.0)
     total_amount = Column(Float, nullable=False)
+    # Sum of posted (RECEIVED) receipt lines, maintained by post_receipt
+    received_quantity = Column(Integer, nullable=False, default=0, server_default="0")
     notes = Column(Text)
 
     # Relationships
@@ -77,6 +90,7 @@ class PurchaseReceipt(Base):
     receipt_number = Column(String, unique=True, index=True, nullable=False)
     receipt_date = Column(DateTime(timezone=True), server_default=func.now())
     status = Column(Enum(ReceiptStatus), default=ReceiptStatus.DRAFT)
+    location = Column(String, nullable=False, default="default", server_default="default")
     total_amount = Column(Float, nullable=False)
     notes = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,59 @@
+from sqlalchemy import Column, Date, DateTime, Float, ForeignKey, Index, Integer
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+# Daily sales rollups, maintained incrementally by app.services.reporting
+# for orders in a counted status. The (day, key) primary keys double as the
+# range-scan index for report queries.
+class SalesDailyProduct(Base):
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, ForeignKey("product.id"), primary_key=True)
+    revenue = Column(Float, nullable=False, default=0.0)
+    quantity = Column(Integer, nullable=False, default=0)
+    discount = Column(Float, nullable=False, default=0.0)
+    orders = Column(Integer, nullable=False, default=0)
+
+class SalesDailyCustomer(Base):
+    day = Column(Date, primary_key=True)
+    customer_id = Column(Integer, ForeignKey("customer.id"), primary_key=True)
+    revenue = Column(Float, nullable=False, default=0.0)
+    quantity = Column(Integer, nullable=False, default=0)
+    discount = Column(Float, nullable=False, default=0.0)
+    orders = Column(Integer, nullable=False, default=0)
+
+class SalesDailyCategory(Base):
+    day = Column(Date, primary_key=True)
+    category_id = Column(Integer, ForeignKey("category.id"), primary_key=True)
+    revenue = Column(Float, nullable=False, default=0.0)
+    quantity = Column(Integer, nullable=False, default=0)
+    discount = Column(Float, nullable=False, default=0.0)
+    orders = Column(Integer, nullable=False, default=0)
+
+# Accounts-receivable aging snapshots, written by app.services.receivables
+class AgingSnapshot(Base):
+    id = Column(Integer, primary_key=True, index=True)
+    as_of = Column(Date, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_by = Column(Integer, ForeignKey("user.id"))
+
+    # Relationships
+    lines = relationship("AgingSnapshotLine", back_populates="snapshot")
+
+    __table_args__ = (
+        Index("ix_agingsnapshot_as_of_id", "as_of", "id"),
+    )
+
+class AgingSnapshotLine(Base):
+    snapshot_id = Column(Integer, ForeignKey("agingsnapshot.id"), primary_key=True)
+    customer_id = Column(Integer, ForeignKey("customer.id"), primary_key=True)
+    current = Column(Float, nullable=False, default=0.0)
+    days_1_30 = Column(Float, nullable=False, default=0.0)
+    days_31_60 = Column(Float, nullable=False, default=0.0)
+    days_61_90 = Column(Float, nullable=False, default=0.0)
+    days_over_90 = Column(Float, nullable=False, default=0.0)
+    total = Column(Float, nullable=False, default=0.0)
+    invoices = Column(Integer, nullable=False, default=0)
+
+    # Relationships
+    snapshot = relationship("AgingSnapshot", back_populates="lines")
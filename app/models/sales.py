@@ -1,6 +1,6 @@
-from sqlalchemy import Boolean, Column, Integer, String, Float, ForeignKey, DateTime, Text, Enum
+from sqlalchemy import Boolean, Column, Integer, String, Float, ForeignKey, DateTime, Text, Enum, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import expression, func
 import enum
 from app.db.base_class import Base
 
@@ -30,6 +30,8 @@ class Customer(Base):
     address = Column(Text)
     tax_id = Column(String)  # VAT/Tax ID for companies
     credit_limit = Column(Float, default=0.0)
+    # Open confirmed orders plus unpaid invoice balance, kept by app.services.credit
+    exposure = Column(Float, nullable=False, default=0.0, server_default="0")
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -37,6 +39,10 @@ class Customer(Base):
     # Relationships
     orders = relationship("Order", back_populates="customer")
 
+    __table_args__ = (
+        Index("ix_customer_name_id", "name", "id"),
+    )
+
 class Order(Base):
     id = Column(Integer, primary_key=True, index=True)
     customer_id = Column(Integer, ForeignKey("customer.id"), nullable=False)
@@ -45,6 +51,8 @@ class Order(Base):
     status = Column(Enum(OrderStatus), default=OrderStatus.DRAFT)
     total_amount = Column(Float, nullable=False)
     notes = Column(Text)
+    # Accepted over the customer's credit limit (CREDIT_LIMIT_MODE=flag)
+    credit_hold = Column(Boolean, nullable=False, default=False, server_default=expression.false())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     created_by = Column(Integer, ForeignKey("user.id"), nullable=False)
@@ -55,6 +63,12 @@ class Order(Base):
     invoice = relationship("Invoice", back_populates="order", uselist=False)
     user = relationship("User")
 
+    __table_args__ = (
+        Index("ix_order_order_date_id", "order_date", "id"),
+        Index("ix_order_created_at_id", "created_at", "id"),
+        Index("ix_order_order_number_id", "order_number", "id"),
+    )
+
 class OrderItem(Base):
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("order.id"), nullable=False)
@@ -78,6 +92,7 @@ class Invoice(Base):
     total_amount = Column(Float, nullable=False)
     tax_amount = Column(Float, nullable=False)
     payment_status = Column(Enum(PaymentStatus), default=PaymentStatus.PENDING)
+    amount_paid = Column(Float, nullable=False, default=0.0, server_default="0")
     notes = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -88,6 +103,10 @@ class Invoice(Base):
     payments = relationship("Payment", back_populates="invoice")
     user = relationship("User")
 
+    __table_args__ = (
+        Index("ix_invoice_payment_status_due_date", "payment_status", "due_date"),
+    )
+
 class Payment(Base):
     id = Column(Integer, primary_key=True, index=True)
     invoice_id = Column(Integer, ForeignKey("invoice.id"), nullable=False)
@@ -101,4 +120,9 @@ class Payment(Base):
 
     # Relationships
     invoice = relationship("Invoice", back_populates="payments")
-    user = relationship("User") 
\ No newline at end of file
+    user = relationship("User")
+
+    __table_args__ = (
+        Index("ix_payment_invoice_id_id", "invoice_id", "id"),
+        Index("ix_payment_invoice_id_payment_date_id", "invoice_id", "payment_date", "id"),
+    )
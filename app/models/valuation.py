@@ -0,0 +1,50 @@
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+# Inventory valuation, maintained incrementally by app.services.valuation
+# from the stock movement ledger and rebuildable from it
+class ProductValuation(Base):
+    product_id = Column(Integer, ForeignKey("product.id"), primary_key=True)
+    quantity = Column(Integer, nullable=False, default=0)
+    # Weighted-average method
+    average_cost = Column(Float, nullable=False, default=0.0)
+    average_value = Column(Float, nullable=False, default=0.0)
+    # FIFO method: the sum of the open cost layers
+    fifo_value = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationships
+    product = relationship("Product")
+
+class CostLayer(Base):
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("product.id"), nullable=False)
+    received_at = Column(DateTime(timezone=True), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    remaining = Column(Integer, nullable=False)
+    unit_cost = Column(Float, nullable=False)
+
+    __table_args__ = (
+        # Open layers of a product, oldest first
+        Index(
+            "ix_costlayer_open_product_id_id", "product_id", "id",
+            postgresql_where=remaining > 0,
+            sqlite_where=remaining > 0,
+        ),
+    )
+
+# Cost of each outbound movement under both methods
+class CogsEntry(Base):
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("product.id"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    average_cost = Column(Float, nullable=False)
+    fifo_cost = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_cogsentry_created_at_product_id", "created_at", "product_id"),
+        Index("ix_cogsentry_product_id", "product_id"),
+    )
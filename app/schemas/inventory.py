@@ -1 +1,205 @@
- 
\ No newline at end of file
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from datetime import datetime
+import enum
+from app.core.config import settings
+
+# Category schemas
+class CategoryBase(BaseModel):
+    name: str
+    description: Optional[str] = None
+    parent_id: Optional[int] = None
+
+class CategoryCreate(CategoryBase):
+    pass
+
+class CategoryUpdate(CategoryBase):
+    name: Optional[str] = None
+
+class Category(CategoryBase):
+    id: int
+    path: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class CategoryNode(BaseModel):
+    id: int
+    name: str
+    parent_id: Optional[int] = None
+    children: List["CategoryNode"] = []
+
+# Product schemas
+class ProductBase(BaseModel):
+    name: str
+    sku: str
+    description: Optional[str] = None
+    category_id: int
+    unit_price: float
+    cost_price: float
+    min_stock_level: int = 0
+    is_active: bool = True
+
+class ProductCreate(ProductBase):
+    pass
+
+class ProductUpdate(ProductBase):
+    name: Optional[str] = None
+    sku: Optional[str] = None
+    category_id: Optional[int] = None
+    unit_price: Optional[float] = None
+    cost_price: Optional[float] = None
+    min_stock_level: Optional[int] = None
+    is_active: Optional[bool] = None
+
+class Product(ProductBase):
+    id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+# Stock schemas
+class StockBase(BaseModel):
+    product_id: int
+    quantity: int
+    location: str = "default"
+
+class StockCreate(StockBase):
+    pass
+
+class StockUpdate(StockBase):
+    product_id: Optional[int] = None
+    quantity: Optional[int] = None
+    location: Optional[str] = None
+
+class Stock(StockBase):
+    id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class StockAvailability(BaseModel):
+    product_id: int
+    quantity: int
+
+    class Config:
+        from_attributes = True
+
+class StockTransferCreate(BaseModel):
+    product_id: int
+    from_location: str
+    to_location: str
+    quantity: int = Field(..., gt=0)
+    reference: Optional[str] = None
+    notes: Optional[str] = None
+
+class StockPosition(BaseModel):
+    product_id: int
+    location: str
+    quantity: int
+
+class StockAlert(BaseModel):
+    id: int
+    product_id: int
+    location: str
+    min_stock_level: int
+    quantity: int
+    raised_at: datetime
+    resolved_at: Optional[datetime] = None
+    changed_at: datetime
+
+    class Config:
+        from_attributes = True
+
+# Stock Movement schemas
+class StockMovementBase(BaseModel):
+    product_id: int
+    quantity: int = Field(..., gt=0)
+    movement_type: Literal["in", "out"]
+    location: str = "default"
+    reference: Optional[str] = None
+    notes: Optional[str] = None
+    # Inbound only; defaults to the average cost, else the product's cost_price
+    unit_cost: Optional[float] = Field(None, ge=0)
+
+class StockMovementCreate(StockMovementBase):
+    pass
+
+class StockMovement(StockMovementBase):
+    id: int
+    is_transfer: bool = False
+    created_at: datetime
+    created_by: int
+
+    class Config:
+        from_attributes = True
+
+# Stock Movement batch schemas
+class StockMovementBatchMode(str, enum.Enum):
+    ALL_OR_NOTHING = "all_or_nothing"
+    PARTIAL = "partial"
+
+class StockMovementBatchRow(BaseModel):
+    # Checked row by row by the batch service, so one bad row is reported
+    # in the results instead of failing the whole upload
+    product_id: int
+    quantity: int
+    movement_type: str
+    location: str = "default"
+    reference: Optional[str] = None
+    notes: Optional[str] = None
+    unit_cost: Optional[float] = Field(None, ge=0)
+
+class StockMovementBatchCreate(BaseModel):
+    movements: List[StockMovementBatchRow] = Field(
+        ..., min_length=1, max_length=settings.STOCK_MOVEMENT_BATCH_MAX_SIZE
+    )
+    mode: StockMovementBatchMode = StockMovementBatchMode.ALL_OR_NOTHING
+
+class StockMovementBatchRowResult(BaseModel):
+    index: int
+    accepted: bool
+    error: Optional[str] = None
+
+class StockMovementBatchResult(BaseModel):
+    accepted: int
+    rejected: int
+    results: List[StockMovementBatchRowResult]
+
+
+# Valuation schemas
+class ProductValuation(BaseModel):
+    product_id: int
+    quantity: int
+    average_cost: float
+    average_value: float
+    fifo_value: float
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class ValuationSummary(BaseModel):
+    products: int
+    quantity: int
+    average_value: float
+    fifo_value: float
+
+class CostOfGoodsSoldLine(BaseModel):
+    product_id: int
+    quantity: int
+    average_cost: float
+    fifo_cost: float
+
+class CostOfGoodsSold(BaseModel):
+    date_from: datetime
+    date_to: datetime
+    average_cost: float
+    fifo_cost: float
+    lines: List[CostOfGoodsSoldLine]
@@ -47,6 +47,7 @@ class PurchaseOrderItem(PurchaseOrderItemBase):
     id: int
     order_id: int
     total_amount: float
+    received_quantity: int = 0
 
     class Config:
         from_attributes = True
@@ -60,6 +61,8 @@ class PurchaseOrderBase(BaseModel):
     notes: Optional[str] = None
 
 class PurchaseOrderCreate(PurchaseOrderBase):
+    # Allocated server-side when omitted
+    order_number: Optional[str] = None
     items: List[PurchaseOrderItemCreate]
 
 class PurchaseOrderUpdate(PurchaseOrderBase):
@@ -104,15 +107,20 @@ class PurchaseReceiptBase(BaseModel):
     order_id: int
     receipt_number: str
     status: ReceiptStatus = ReceiptStatus.DRAFT
+    # Stock location the received goods are posted to
+    location: str = "default"
     notes: Optional[str] = None
 
 class PurchaseReceiptCreate(PurchaseReceiptBase):
+    # Allocated server-side when omitted
+    receipt_number: Optional[str] = None
     items: List[PurchaseReceiptItemCreate]
 
 class PurchaseReceiptUpdate(PurchaseReceiptBase):
     order_id: Optional[int] = None
     receipt_number: Optional[str] = None
     status: Optional[ReceiptStatus] = None
+    location: Optional[str] = None
     items: Optional[List[PurchaseReceiptItemCreate]] = None
 
 class PurchaseReceipt(PurchaseReceiptBase):
@@ -125,4 +133,17 @@ class PurchaseReceipt(PurchaseReceiptBase):
     items: List[PurchaseReceiptItem]
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+# Replenishment schemas
+class ReplenishmentSuggestion(BaseModel):
+    product_id: int
+    supplier_id: Optional[int] = None
+    on_hand: int
+    on_order: int
+    daily_demand: float
+    safety_stock: float
+    reorder_point: float
+    lead_time_days: float
+    quantity: int
+    unit_price: float
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
-from datetime import datetime
+from typing import Optional, List, Union
+from datetime import date, datetime
+import enum
 from app.models.sales import CustomerType, OrderStatus, PaymentStatus
 
 # Customer schemas
@@ -26,6 +27,7 @@ class CustomerUpdate(CustomerBase):
 
 class Customer(CustomerBase):
     id: int
+    exposure: float = 0.0
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -59,6 +61,8 @@ class OrderBase(BaseModel):
     notes: Optional[str] = None
 
 class OrderCreate(OrderBase):
+    # Allocated server-side when omitted
+    order_number: Optional[str] = None
     items: List[OrderItemCreate]
 
 class OrderUpdate(OrderBase):
@@ -71,6 +75,7 @@ class Order(OrderBase):
     id: int
     order_date: datetime
     total_amount: float
+    credit_hold: bool = False
     created_at: datetime
     updated_at: Optional[datetime] = None
     created_by: int
@@ -90,7 +95,8 @@ class InvoiceBase(BaseModel):
     notes: Optional[str] = None
 
 class InvoiceCreate(InvoiceBase):
-    pass
+    # Allocated server-side when omitted
+    invoice_number: Optional[str] = None
 
 class InvoiceUpdate(InvoiceBase):
     order_id: Optional[int] = None
@@ -102,6 +108,7 @@ class InvoiceUpdate(InvoiceBase):
 
 class Invoice(InvoiceBase):
     id: int
+    amount_paid: float = 0.0
     invoice_date: datetime
     created_at: datetime
     updated_at: Optional[datetime] = None
@@ -128,4 +135,45 @@ class Payment(PaymentBase):
     created_by: int
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+# Sales report schemas
+class SalesReportDimension(str, enum.Enum):
+    DAY = "day"
+    PRODUCT = "product"
+    CUSTOMER = "customer"
+    CATEGORY = "category"
+
+class SalesReportRow(BaseModel):
+    key: Union[date, int]
+    revenue: float
+    quantity: int
+    discount: float
+    orders: int
+
+# Receivables aging schemas
+class AgingRow(BaseModel):
+    customer_id: int
+    current: float
+    days_1_30: float
+    days_31_60: float
+    days_61_90: float
+    days_over_90: float
+    total: float
+    invoices: int
+
+    class Config:
+        from_attributes = True
+
+class AgingSnapshot(BaseModel):
+    id: int
+    as_of: date
+    created_at: datetime
+    lines: List[AgingRow]
+
+    class Config:
+        from_attributes = True
+
+class OverdueUpdate(BaseModel):
+    as_of: date
+    updated: int
@@ -0,0 +1,143 @@
+from typing import Optional, Tuple
+from sqlalchemy import case, exists, func, or_, select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.sales import Customer, Invoice, Order, OrderStatus
+
+# Orders in these statuses count towards exposure until they are invoiced;
+# from then on the invoice's unpaid balance counts instead
+EXPOSURE_ORDER_STATUSES = (OrderStatus.CONFIRMED, OrderStatus.SHIPPED, OrderStatus.DELIVERED)
+
+class CreditLimitExceeded(ValueError):
+    pass
+
+def add_exposure(db: Session, customer_id: int, amount: float) -> None:
+    if amount:
+        db.execute(
+            update(Customer)
+            .where(Customer.id == customer_id)
+            .values(exposure=Customer.exposure + amount)
+            .execution_options(synchronize_session=False)
+        )
+
+def reserve_exposure(db: Session, customer_id: int, amount: float) -> bool:
+    """
+    Add ``amount`` to the customer's exposure if it stays within the credit
+    limit (a limit of 0 means unlimited). Returns False when the limit is
+    exceeded in "flag" mode; raises CreditLimitExceeded in "reject" mode.
+
+    The check and the increment are one conditional UPDATE, so concurrent
+    reservations serialize on the customer row and cannot overshoot.
+    """
+    within = db.execute(
+        update(Customer)
+        .where(
+            Customer.id == customer_id,
+            or_(
+                func.coalesce(Customer.credit_limit, 0) <= 0,
+                Customer.exposure + amount <= Customer.credit_limit,
+            ),
+        )
+        .values(exposure=Customer.exposure + amount)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if within:
+        return True
+    if settings.CREDIT_LIMIT_MODE == "reject":
+        raise CreditLimitExceeded(f"Order exceeds the credit limit of customer {customer_id}")
+    add_exposure(db, customer_id, amount)
+    return False
+
+def order_exposure(db: Session, order: Order) -> Tuple[int, float]:
+    """
+    (customer_id, amount) the order currently contributes to exposure.
+    """
+    if order.status not in EXPOSURE_ORDER_STATUSES:
+        return order.customer_id, 0.0
+    if order.id is not None and db.execute(
+        select(exists().where(Invoice.order_id == order.id))
+    ).scalar():
+        return order.customer_id, 0.0
+    return order.customer_id, order.total_amount
+
+def apply_order_exposure(
+    db: Session, order: Order, before: Optional[Tuple[int, float]] = None
+) -> None:
+    """
+    Move exposure from the order's ``before`` contribution to its current
+    one. Increases go through the credit check and set ``credit_hold``.
+    """
+    customer_id, amount = order_exposure(db, order)
+    old_customer_id, old_amount = before or (customer_id, 0.0)
+    if old_customer_id != customer_id:
+        add_exposure(db, old_customer_id, -old_amount)
+        old_amount = 0.0
+    delta = amount - old_amount
+    if delta > 0:
+        order.credit_hold = not reserve_exposure(db, customer_id, delta)
+    elif delta < 0:
+        add_exposure(db, customer_id, delta)
+
+def invoice_outstanding(invoice: Invoice) -> float:
+    return max(0.0, invoice.total_amount - (invoice.amount_paid or 0.0))
+
+def apply_payment_exposure(db: Session, invoice_id: int, amount: float) -> None:
+    """
+    Release what a payment of ``amount`` just paid off, after the invoice's
+    amount_paid was incremented (its row is locked by that UPDATE).
+    """
+    paid, total, customer_id = db.execute(
+        select(Invoice.amount_paid, Invoice.total_amount, Order.customer_id)
+        .join(Order, Order.id == Invoice.order_id)
+        .where(Invoice.id == invoice_id)
+    ).one()
+    released = max(0.0, total - (paid - amount)) - max(0.0, total - paid)
+    add_exposure(db, customer_id, -released)
+
+def invoice_customer_id(db: Session, invoice: Invoice) -> int:
+    return db.execute(
+        select(Order.customer_id).where(Order.id == invoice.order_id)
+    ).scalar_one()
+
+def recompute_exposure(db: Session) -> int:
+    """
+    Rebuild every customer's exposure from orders and invoices in one
+    UPDATE; returns the number of customers whose figure changed.
+    """
+    open_orders = (
+        select(func.coalesce(func.sum(Order.total_amount), 0))
+        .where(
+            Order.customer_id == Customer.id,
+            Order.status.in_(EXPOSURE_ORDER_STATUSES),
+            ~exists().where(Invoice.order_id == Order.id),
+        )
+        .scalar_subquery()
+    )
+    unpaid = (
+        select(
+            func.coalesce(
+                func.sum(
+                    case(
+                        (
+                            Invoice.total_amount > Invoice.amount_paid,
+                            Invoice.total_amount - Invoice.amount_paid,
+                        ),
+                        else_=0,
+                    )
+                ),
+                0,
+            )
+        )
+        .join(Order, Order.id == Invoice.order_id)
+        .where(Order.customer_id == Customer.id)
+        .scalar_subquery()
+    )
+    exposure = open_orders + unpaid
+    changed = db.execute(
+        update(Customer)
+        .where(func.abs(Customer.exposure - exposure) > 0.005)
+        .values(exposure=exposure)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return changed
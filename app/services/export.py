@@ -0,0 +1,117 @@
+import csv
+import enum
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Iterator, Optional
+from sqlalchemy import select
+from app.db.session import engine
+from app.models.inventory import Product, StockMovement
+from app.models.sales import Order, OrderItem, Invoice
+from app.models.purchase import PurchaseOrder, PurchaseOrderItem
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_CHUNK_SIZE = 5000
+
+class ExportFormat(str, enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+def _between(stmt: Any, column: Any, date_from: Optional[datetime], date_to: Optional[datetime]) -> Any:
+    if date_from is not None:
+        stmt = stmt.where(column >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(column < date_to)
+    return stmt
+
+# Export statements; Core selects only, so rows never become ORM instances
+def orders_statement(date_from: Optional[datetime] = None, date_to: Optional[datetime] = None) -> Any:
+    stmt = (
+        select(
+            Order.id.label("order_id"), Order.order_number, Order.customer_id,
+            Order.order_date, Order.status, Order.total_amount.label("order_total"),
+            OrderItem.id.label("item_id"), OrderItem.product_id, OrderItem.quantity,
+            OrderItem.unit_price, OrderItem.discount, OrderItem.total_amount.label("item_total"),
+        )
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .order_by(Order.id, OrderItem.id)
+    )
+    return _between(stmt, Order.order_date, date_from, date_to)
+
+def invoices_statement(date_from: Optional[datetime] = None, date_to: Optional[datetime] = None) -> Any:
+    stmt = select(
+        Invoice.id, Invoice.invoice_number, Invoice.order_id, Invoice.invoice_date,
+        Invoice.due_date, Invoice.total_amount, Invoice.tax_amount,
+        Invoice.amount_paid, Invoice.payment_status,
+    ).order_by(Invoice.id)
+    return _between(stmt, Invoice.invoice_date, date_from, date_to)
+
+def purchase_orders_statement(date_from: Optional[datetime] = None, date_to: Optional[datetime] = None) -> Any:
+    stmt = (
+        select(
+            PurchaseOrder.id.label("order_id"), PurchaseOrder.order_number,
+            PurchaseOrder.supplier_id, PurchaseOrder.order_date, PurchaseOrder.expected_date,
+            PurchaseOrder.status, PurchaseOrder.total_amount.label("order_total"),
+            PurchaseOrderItem.id.label("item_id"), PurchaseOrderItem.product_id,
+            PurchaseOrderItem.quantity, PurchaseOrderItem.unit_price,
+            PurchaseOrderItem.discount, PurchaseOrderItem.total_amount.label("item_total"),
+        )
+        .outerjoin(PurchaseOrderItem, PurchaseOrderItem.order_id == PurchaseOrder.id)
+        .order_by(PurchaseOrder.id, PurchaseOrderItem.id)
+    )
+    return _between(stmt, PurchaseOrder.order_date, date_from, date_to)
+
+def products_statement() -> Any:
+    return select(
+        Product.id, Product.sku, Product.name, Product.category_id, Product.unit_price,
+        Product.cost_price, Product.min_stock_level, Product.is_active,
+    ).order_by(Product.id)
+
+def stock_movements_statement(date_from: Optional[datetime] = None, date_to: Optional[datetime] = None) -> Any:
+    stmt = select(
+        StockMovement.id, StockMovement.product_id, StockMovement.quantity,
+        StockMovement.movement_type, StockMovement.location, StockMovement.reference,
+        StockMovement.unit_cost, StockMovement.is_transfer,
+        StockMovement.created_at, StockMovement.created_by,
+    ).order_by(StockMovement.id)
+    return _between(stmt, StockMovement.created_at, date_from, date_to)
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+def stream_export(stmt: Any, format: ExportFormat) -> Iterator[str]:
+    """
+    Yield ``stmt`` encoded as CSV or NDJSON, one chunk of rows at a time.
+
+    Runs on its own connection with a server-side cursor, so memory stays
+    bounded by EXPORT_CHUNK_SIZE regardless of the result size and the
+    request's session is not held open while the client reads.
+    """
+    with engine.connect() as conn:
+        result = conn.execution_options(yield_per=EXPORT_CHUNK_SIZE).execute(stmt)
+        columns = list(result.keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if format == ExportFormat.CSV:
+            writer.writerow(columns)
+        for rows in result.partitions():
+            if format == ExportFormat.CSV:
+                writer.writerows([_plain(v) for v in row] for row in rows)
+            else:
+                for row in rows:
+                    buffer.write(json.dumps(dict(zip(columns, map(_plain, row)))))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
@@ -1,27 +1,137 @@
-from typing import List, Optional
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import (
+    DateTime, bindparam, case, delete, func, insert, literal, select, tuple_,
+    union_all, update
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from app.models.inventory import Category, Product, Stock, StockMovement
+from app.core.cache import make_cache
+from app.core.config import settings
+from app.db.pagination import Page, paginate
+from app.models.inventory import (
+    Category, Product, Stock, StockAvailability, StockCheckpoint, StockMovement
+)
+from app.services import reporting, stock_alerts, valuation
+from app.services.product_search import index_product
 from app.schemas.inventory import (
     CategoryCreate, CategoryUpdate,
     ProductCreate, ProductUpdate,
     StockCreate, StockUpdate,
-    StockMovementCreate
+    StockMovementCreate, StockTransferCreate,
+    StockMovementBatchCreate, StockMovementBatchMode
 )
 
+# Keyset sort fields; each is backed by a (field, id) index
+CATEGORY_SORT_FIELDS = {"id": Category.id, "name": Category.name}
+PRODUCT_SORT_FIELDS = {
+    "id": Product.id,
+    "name": Product.name,
+    "sku": Product.sku,
+    "created_at": Product.created_at,
+}
+STOCK_SORT_FIELDS = {"id": Stock.id, "product_id": Stock.product_id}
+# Keyed by product; "id" keeps the pagination default
+AVAILABILITY_SORT_FIELDS = {"id": StockAvailability.product_id}
+STOCK_MOVEMENT_SORT_FIELDS = {
+    "id": StockMovement.id,
+    "created_at": StockMovement.created_at,
+}
+
+class InsufficientStockError(ValueError):
+    pass
+
+category_tree_cache = make_cache(
+    "category-tree", maxsize=1, ttl=settings.CATEGORY_TREE_CACHE_TTL_SECONDS
+)
+# Catalog snapshots keyed by id: plain column dicts, never ORM instances,
+# which belong to the session that loaded them
+product_cache = make_cache(
+    "product",
+    maxsize=settings.CATALOG_CACHE_SIZE,
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS,
+    max_bytes=settings.CATALOG_CACHE_MAX_BYTES,
+)
+category_cache = make_cache(
+    "category",
+    maxsize=settings.CATALOG_CACHE_SIZE,
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS,
+    max_bytes=settings.CATALOG_CACHE_MAX_BYTES,
+)
+
+def _cached_rows(db: Session, cache: Any, model: Any, ids: Iterable[int]) -> Dict[int, Dict]:
+    ids = set(ids)
+    found = cache.get_many(ids)
+    missing = ids - found.keys()
+    if missing:
+        for row in db.execute(select(model.__table__).where(model.id.in_(missing))).mappings():
+            found[row["id"]] = snapshot = dict(row)
+            cache.set(row["id"], snapshot)
+    return found
+
 # Category services
 def get_category(db: Session, category_id: int) -> Optional[Category]:
     return db.query(Category).filter(Category.id == category_id).first()
 
+def get_cached_categories(db: Session, category_ids: Iterable[int]) -> Dict[int, Dict]:
+    """
+    Column snapshots of the given categories, read through the catalog
+    cache; unknown ids are left out.
+    """
+    return _cached_rows(db, category_cache, Category, category_ids)
+
 def get_categories(
-    db: Session, skip: int = 0, limit: int = 100
-) -> List[Category]:
-    return db.query(Category).offset(skip).limit(limit).all()
+    db: Session, skip: int = 0, limit: int = 100,
+    cursor: Optional[str] = None, sort: Optional[str] = None
+) -> Page:
+    return paginate(
+        db.query(Category), Category.id, CATEGORY_SORT_FIELDS,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
+
+def _parent_path(db: Session, parent_id: Optional[int]) -> str:
+    if parent_id is None:
+        return "/"
+    path = db.query(Category.path).filter(Category.id == parent_id).scalar()
+    if path is None:
+        raise ValueError(f"Parent category {parent_id} not found")
+    return path
+
+def assign_category_path(db: Session, category: Category) -> None:
+    # The path ends in the category's own id, so it is set after the flush
+    parent_path = _parent_path(db, category.parent_id)
+    db.flush()
+    category.path = f"{parent_path}{category.id}/"
+
+def move_category(db: Session, category: Category, parent_id: Optional[int]) -> None:
+    """
+    Re-parent ``category``, rewriting the paths of its whole subtree in one
+    UPDATE. Moving a category under itself or a descendant is rejected.
+    """
+    new_parent_path = _parent_path(db, parent_id)
+    old_path = category.path
+    if new_parent_path.startswith(old_path):
+        raise ValueError("A category cannot be moved under itself or its descendants")
+    new_path = f"{new_parent_path}{category.id}/"
+    db.execute(
+        update(Category)
+        .where(Category.path.startswith(old_path))
+        .values(path=literal(new_path) + func.substr(Category.path, len(old_path) + 1))
+        .execution_options(synchronize_session=False)
+    )
+    category.parent_id = parent_id
+    category.path = new_path
 
 def create_category(db: Session, category: CategoryCreate) -> Category:
     db_category = Category(**category.dict())
     db.add(db_category)
+    assign_category_path(db, db_category)
     db.commit()
     db.refresh(db_category)
+    invalidate_category_tree()
     return db_category
 
 def update_category(
@@ -32,14 +142,65 @@ def update_category(
         return None
     
     update_data = category.dict(exclude_unset=True)
+    if "parent_id" in update_data:
+        parent_id = update_data.pop("parent_id")
+        if parent_id != db_category.parent_id:
+            move_category(db, db_category, parent_id)
     for field, value in update_data.items():
         setattr(db_category, field, value)
     
     db.add(db_category)
     db.commit()
     db.refresh(db_category)
+    invalidate_categories()
     return db_category
 
+def get_category_products(
+    db: Session, category_id: int, skip: int = 0, limit: int = 100,
+    cursor: Optional[str] = None, sort: Optional[str] = None
+) -> Optional[Page]:
+    """
+    Products in the category and all of its descendants.
+    """
+    category = get_cached_categories(db, [category_id]).get(category_id)
+    if category is None:
+        return None
+    subtree = select(Category.id).where(Category.path.startswith(category["path"]))
+    return paginate(
+        db.query(Product).filter(Product.category_id.in_(subtree)),
+        Product.id, PRODUCT_SORT_FIELDS,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
+
+def get_category_tree(db: Session) -> bytes:
+    """
+    The whole category forest as JSON, built once and cached until a
+    category changes (or the TTL lapses, for changes made by other workers).
+    """
+    tree = category_tree_cache.get("tree")
+    if tree is not None:
+        return tree
+    nodes: Dict[int, Dict] = {}
+    roots: List[Dict] = []
+    # Path order puts every parent before its children
+    for id, name, parent_id in db.execute(
+        select(Category.id, Category.name, Category.parent_id).order_by(Category.path)
+    ):
+        node = nodes[id] = {"id": id, "name": name, "parent_id": parent_id, "children": []}
+        parent = nodes.get(parent_id)
+        (parent["children"] if parent else roots).append(node)
+    tree = json.dumps(roots, separators=(",", ":")).encode()
+    category_tree_cache.set("tree", tree)
+    return tree
+
+def invalidate_category_tree() -> None:
+    category_tree_cache.clear()
+
+def invalidate_categories() -> None:
+    # A move rewrites the paths of a whole subtree, so every snapshot goes
+    category_cache.clear()
+    invalidate_category_tree()
+
 # Product services
 def get_product(db: Session, product_id: int) -> Optional[Product]:
     return db.query(Product).filter(Product.id == product_id).first()
@@ -47,16 +208,43 @@ def get_product(db: Session, product_id: int) -> Optional[Product]:
 def get_product_by_sku(db: Session, sku: str) -> Optional[Product]:
     return db.query(Product).filter(Product.sku == sku).first()
 
+def get_cached_products(db: Session, product_ids: Iterable[int]) -> Dict[int, Dict]:
+    """
+    Column snapshots of the given products, read through the catalog cache
+    with one IN query for the misses; unknown ids are left out.
+    """
+    return _cached_rows(db, product_cache, Product, product_ids)
+
+def invalidate_product(product_id: int) -> None:
+    product_cache.delete(product_id)
+
+def validate_products(db: Session, product_ids: Iterable[int]) -> None:
+    ids = set(product_ids)
+    if not ids:
+        return
+    found = get_cached_products(db, ids)
+    missing = sorted(ids - found.keys())
+    if missing:
+        raise ValueError(f"Product {', '.join(map(str, missing))} not found")
+    inactive = sorted(pid for pid, product in found.items() if not product["is_active"])
+    if inactive:
+        raise ValueError(f"Product {', '.join(map(str, inactive))} is inactive")
+
 def get_products(
-    db: Session, skip: int = 0, limit: int = 100
-) -> List[Product]:
-    return db.query(Product).offset(skip).limit(limit).all()
+    db: Session, skip: int = 0, limit: int = 100,
+    cursor: Optional[str] = None, sort: Optional[str] = None
+) -> Page:
+    return paginate(
+        db.query(Product), Product.id, PRODUCT_SORT_FIELDS,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
 
 def create_product(db: Session, product: ProductCreate) -> Product:
     db_product = Product(**product.dict())
     db.add(db_product)
     db.commit()
     db.refresh(db_product)
+    index_product(db_product)
     return db_product
 
 def update_product(
@@ -66,78 +254,641 @@ def update_product(
     if not db_product:
         return None
     
+    old_category_id = db_product.category_id
     update_data = product.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_product, field, value)
     
     db.add(db_product)
+    # The product's sales history moves with it in the category rollup
+    if db_product.category_id != old_category_id:
+        db.flush()
+        reporting.move_product_category(db, product_id, old_category_id)
     db.commit()
     db.refresh(db_product)
+    invalidate_product(product_id)
+    index_product(db_product)
     return db_product
 
 # Stock services
 def get_stock(db: Session, stock_id: int) -> Optional[Stock]:
     return db.query(Stock).filter(Stock.id == stock_id).first()
 
-def get_stock_by_product(db: Session, product_id: int) -> Optional[Stock]:
-    return db.query(Stock).filter(Stock.product_id == product_id).first()
+def get_stock_by_product(
+    db: Session, product_id: int, location: str = "default"
+) -> Optional[Stock]:
+    return (
+        db.query(Stock)
+        .filter(Stock.product_id == product_id, Stock.location == location)
+        .first()
+    )
+
+def get_stock_locations(db: Session, product_id: int) -> List[Stock]:
+    return (
+        db.query(Stock)
+        .filter(Stock.product_id == product_id)
+        .order_by(Stock.location)
+        .all()
+    )
+
+def get_location_stock(
+    db: Session, location: str, skip: int = 0, limit: int = 100,
+    cursor: Optional[str] = None, sort: Optional[str] = None
+) -> Page:
+    return paginate(
+        db.query(Stock).filter(Stock.location == location), Stock.id, STOCK_SORT_FIELDS,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
+
+def get_availability(db: Session, product_id: int) -> Optional[StockAvailability]:
+    return db.get(StockAvailability, product_id)
+
+def get_availabilities(
+    db: Session, skip: int = 0, limit: int = 100,
+    cursor: Optional[str] = None, sort: Optional[str] = None
+) -> Page:
+    return paginate(
+        db.query(StockAvailability), StockAvailability.product_id, AVAILABILITY_SORT_FIELDS,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
+
+def add_availability(db: Session, deltas: Dict[int, int]) -> None:
+    """
+    Add per-product deltas to the maintained totals, in product order so
+    concurrent writers lock the rows in the same order.
+    """
+    rows = [
+        {"product_id": product_id, "quantity": delta}
+        for product_id, delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return
+    dialect_insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(
+        db.get_bind().dialect.name
+    )
+    if dialect_insert is not None:
+        for start in range(0, len(rows), STOCK_UPSERT_CHUNK_SIZE):
+            stmt = dialect_insert(StockAvailability).values(
+                rows[start:start + STOCK_UPSERT_CHUNK_SIZE]
+            )
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[StockAvailability.product_id],
+                set_={
+                    "quantity": StockAvailability.quantity + stmt.excluded.quantity,
+                    "updated_at": func.now(),
+                },
+            ))
+        return
+    for row in rows:
+        updated = db.execute(
+            update(StockAvailability)
+            .where(StockAvailability.product_id == row["product_id"])
+            .values(quantity=StockAvailability.quantity + row["quantity"])
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not updated:
+            db.execute(insert(StockAvailability), [row])
 
 def create_stock(db: Session, stock: StockCreate) -> Stock:
     db_stock = Stock(**stock.dict())
-    db.add(db_stock)
+    # Inserted before availability is touched; the unique (product_id,
+    # location) index turns a duplicate into a clean rejection
+    try:
+        with db.begin_nested():
+            db.add(db_stock)
+    except IntegrityError:
+        raise ValueError(
+            f"Stock for product {stock.product_id} at {stock.location} already exists"
+        )
+    add_availability(db, {stock.product_id: stock.quantity})
     db.commit()
     db.refresh(db_stock)
     return db_stock
 
+def get_stock_for_update(db: Session, stock_id: int) -> Optional[Stock]:
+    # Locked and re-read, so availability and alert crossings are computed
+    # from the committed quantity, not a copy a concurrent movement has
+    # since changed
+    return (
+        db.query(Stock)
+        .filter(Stock.id == stock_id)
+        .with_for_update()
+        .populate_existing()
+        .first()
+    )
+
 def update_stock(
     db: Session, stock_id: int, stock: StockUpdate
 ) -> Optional[Stock]:
-    db_stock = get_stock(db, stock_id)
+    db_stock = get_stock_for_update(db, stock_id)
     if not db_stock:
         return None
+    before = {(db_stock.product_id, db_stock.location): db_stock.quantity}
     
     update_data = stock.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_stock, field, value)
+    product_id = update_data.get("product_id", db_stock.product_id)
+    location = update_data.get("location", db_stock.location)
+    # Flushed before availability is touched, like create_stock: the
+    # unique (product_id, location) index rejects moving the row onto a
+    # location the product already has (stock moves via transfer_stock)
+    try:
+        with db.begin_nested():
+            for field, value in update_data.items():
+                setattr(db_stock, field, value)
+    except IntegrityError:
+        raise ValueError(
+            f"Stock for product {product_id} at {location} already exists"
+        )
     
+    changes = {key: (quantity, 0) for key, quantity in before.items()}
+    key = (db_stock.product_id, db_stock.location)
+    changes[key] = (before.get(key, 0), db_stock.quantity)
+    availability: Dict[int, int] = defaultdict(int)
+    for (product_id, _), (previous, quantity) in changes.items():
+        availability[product_id] += quantity - previous
+    add_availability(db, availability)
+    check_stock_levels(db, changes)
     db.add(db_stock)
     db.commit()
     db.refresh(db_stock)
     return db_stock
 
+def check_stock_levels(db: Session, changes: Dict[Tuple[int, str], Tuple[int, int]]) -> None:
+    """
+    Raise or resolve low-stock alerts for {(product_id, location):
+    (previous, quantity)}; thresholds come from the catalog cache.
+    """
+    if not settings.STOCK_ALERTS_ENABLED or not changes:
+        return
+    products = get_cached_products(db, {product_id for product_id, _ in changes})
+    stock_alerts.apply_stock_levels(
+        db, changes,
+        {product_id: product["min_stock_level"] for product_id, product in products.items()},
+    )
+
+def value_stock_movements(db: Session, rows: List[Dict]) -> None:
+    """
+    Carry new ledger rows into the inventory valuation before they are
+    inserted; inbound rows get their unit_cost filled in.
+    """
+    products = get_cached_products(db, {row["product_id"] for row in rows})
+    valuation.apply_movements(
+        db, rows,
+        {product_id: product["cost_price"] for product_id, product in products.items()},
+    )
+
+def signed_quantity(movement_type: str, quantity: int) -> int:
+    if movement_type == "in":
+        return quantity
+    if movement_type == "out":
+        return -quantity
+    raise ValueError(f"Invalid movement type '{movement_type}'")
+
+def guarded_decrement_statement(product_id: int, location: str, delta: int) -> Any:
+    # Applies only while the result stays non-negative; no row back means oversell
+    return (
+        update(Stock)
+        .where(
+            Stock.product_id == product_id,
+            Stock.location == location,
+            Stock.quantity + delta >= 0,
+        )
+        .values(quantity=Stock.quantity + delta, updated_at=func.now())
+        .returning(Stock.quantity)
+        .execution_options(synchronize_session=False)
+    )
+
+def increment_statement(product_id: int, location: str, delta: int) -> Any:
+    return (
+        update(Stock)
+        .where(Stock.product_id == product_id, Stock.location == location)
+        .values(quantity=Stock.quantity + delta, updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+
+def upsert_statement(
+    dialect_name: str, product_id: int, location: str, delta: int
+) -> Optional[Any]:
+    """
+    Single-statement ``INSERT ... ON CONFLICT (product_id, location) DO
+    UPDATE SET quantity = stock.quantity + :delta RETURNING quantity``.
+
+    Returns None for dialects without ON CONFLICT/RETURNING; callers then
+    fall back to update-then-insert.
+    """
+    dialect_insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(
+        dialect_name
+    )
+    if dialect_insert is None:
+        return None
+    stmt = dialect_insert(Stock).values(
+        product_id=product_id, location=location, quantity=delta
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[Stock.product_id, Stock.location],
+        set_={
+            "quantity": Stock.quantity + stmt.excluded.quantity,
+            "updated_at": func.now(),
+        },
+    ).returning(Stock.quantity)
+
+def adjust_stock(
+    db: Session,
+    product_id: int,
+    delta: int,
+    location: str = "default",
+    prevent_negative: Optional[bool] = None,
+) -> int:
+    """
+    Atomically add ``delta`` to the stock row and the product's
+    availability, and return the row's new quantity.
+    """
+    quantity = adjust_stock_row(db, product_id, delta, location, prevent_negative)
+    add_availability(db, {product_id: delta})
+    return quantity
+
+def adjust_stock_row(
+    db: Session,
+    product_id: int,
+    delta: int,
+    location: str = "default",
+    prevent_negative: Optional[bool] = None,
+) -> int:
+    if prevent_negative is None:
+        prevent_negative = settings.STOCK_PREVENT_NEGATIVE
+
+    if delta < 0 and prevent_negative:
+        quantity = db.execute(
+            guarded_decrement_statement(product_id, location, delta)
+        ).scalar()
+        if quantity is None:
+            raise InsufficientStockError(
+                f"Insufficient stock for product {product_id} at {location}"
+            )
+        return quantity
+
+    stmt = upsert_statement(db.get_bind().dialect.name, product_id, location, delta)
+    if stmt is not None:
+        return db.execute(stmt).scalar_one()
+
+    # Fallback: the unique (product_id, location) index arbitrates races
+    # between two first-time inserts
+    for _ in range(2):
+        if db.execute(increment_statement(product_id, location, delta)).rowcount:
+            break
+        try:
+            with db.begin_nested():
+                db.add(Stock(product_id=product_id, location=location, quantity=delta))
+            break
+        except IntegrityError:
+            continue
+    return db.execute(
+        select(Stock.quantity)
+        .where(Stock.product_id == product_id, Stock.location == location)
+    ).scalar_one()
+
+# Rows per multi-row upsert; keeps bind parameters well under driver limits
+STOCK_UPSERT_CHUNK_SIZE = 5000
+
+def apply_stock_deltas(
+    db: Session, deltas: Dict[Tuple[int, str], int]
+) -> Dict[Tuple[int, str], int]:
+    """
+    Add many (product_id, location) deltas, and their per-product sums to
+    availability, in set-based statements: one multi-row upsert per chunk,
+    or an executemany update plus insert of missing rows where ON CONFLICT
+    is unavailable. Returns the new quantities of the rows changed.
+    """
+    rows = [
+        {"product_id": product_id, "location": location, "quantity": delta}
+        for (product_id, location), delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return {}
+    availability: Dict[int, int] = defaultdict(int)
+    for row in rows:
+        availability[row["product_id"]] += row["quantity"]
+
+    dialect_insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(
+        db.get_bind().dialect.name
+    )
+    if dialect_insert is not None:
+        quantities = {}
+        for start in range(0, len(rows), STOCK_UPSERT_CHUNK_SIZE):
+            stmt = dialect_insert(Stock).values(rows[start:start + STOCK_UPSERT_CHUNK_SIZE])
+            quantities.update(
+                ((product_id, location), quantity)
+                for product_id, location, quantity in db.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=[Stock.product_id, Stock.location],
+                        set_={
+                            "quantity": Stock.quantity + stmt.excluded.quantity,
+                            "updated_at": func.now(),
+                        },
+                    ).returning(Stock.product_id, Stock.location, Stock.quantity)
+                )
+            )
+        add_availability(db, availability)
+        return quantities
+
+    keys = [(row["product_id"], row["location"]) for row in rows]
+    existing = set(
+        db.execute(
+            select(Stock.product_id, Stock.location)
+            .where(tuple_(Stock.product_id, Stock.location).in_(keys))
+        ).all()
+    )
+    updates = [
+        {"b_product_id": row["product_id"], "b_location": row["location"],
+         "b_delta": row["quantity"]}
+        for row in rows
+        if (row["product_id"], row["location"]) in existing
+    ]
+    if updates:
+        db.connection().execute(
+            update(Stock.__table__)
+            .where(
+                Stock.product_id == bindparam("b_product_id"),
+                Stock.location == bindparam("b_location"),
+            )
+            .values(quantity=Stock.quantity + bindparam("b_delta"), updated_at=func.now()),
+            updates,
+        )
+    missing = [row for row in rows if (row["product_id"], row["location"]) not in existing]
+    if missing:
+        db.execute(insert(Stock), missing)
+    add_availability(db, availability)
+    return {
+        (product_id, location): quantity
+        for product_id, location, quantity in db.execute(
+            select(Stock.product_id, Stock.location, Stock.quantity)
+            .where(tuple_(Stock.product_id, Stock.location).in_(keys))
+        )
+    }
+
 # Stock Movement services
 def create_stock_movement(
-    db: Session, movement: StockMovementCreate, user_id: int
+    db: Session,
+    movement: StockMovementCreate,
+    user_id: int,
+    prevent_negative: Optional[bool] = None,
 ) -> StockMovement:
-    db_movement = StockMovement(**movement.dict(), created_by=user_id)
-    
-    # Update stock quantity
-    stock = get_stock_by_product(db, movement.product_id)
-    if not stock:
-        stock = Stock(
-            product_id=movement.product_id,
-            quantity=0,
-            location="default"
-        )
-        db.add(stock)
-    
-    if movement.movement_type == "in":
-        stock.quantity += movement.quantity
-    else:
-        stock.quantity -= movement.quantity
+    validate_products(db, [movement.product_id])
+    delta = signed_quantity(movement.movement_type, movement.quantity)
+    quantity = adjust_stock(
+        db, movement.product_id, delta, movement.location, prevent_negative
+    )
+    check_stock_levels(db, {(movement.product_id, movement.location): (quantity - delta, quantity)})
     
+    row = movement.dict()
+    value_stock_movements(db, [row])
+    db_movement = StockMovement(**row, created_by=user_id)
     db.add(db_movement)
     db.commit()
     db.refresh(db_movement)
     return db_movement
 
-def get_stock_movements(
-    db: Session, product_id: int, skip: int = 0, limit: int = 100
+def transfer_stock(
+    db: Session, transfer: StockTransferCreate, user_id: int
 ) -> List[StockMovement]:
+    """
+    Move stock between two locations in one transaction: a guarded
+    decrement at the source (never below zero), an increment at the
+    destination and an out/in pair in the ledger. Availability and
+    valuation are unchanged, so they are not touched.
+    """
+    if transfer.from_location == transfer.to_location:
+        raise ValueError("Source and destination locations must differ")
+    validate_products(db, [transfer.product_id])
+    product_id, quantity = transfer.product_id, transfer.quantity
+    source = adjust_stock_row(
+        db, product_id, -quantity, transfer.from_location, prevent_negative=True
+    )
+    destination = adjust_stock_row(db, product_id, quantity, transfer.to_location)
+    check_stock_levels(db, {
+        (product_id, transfer.from_location): (source + quantity, source),
+        (product_id, transfer.to_location): (destination - quantity, destination),
+    })
+    movements = [
+        StockMovement(
+            product_id=product_id, quantity=quantity, movement_type=movement_type,
+            location=location, reference=transfer.reference, notes=transfer.notes,
+            is_transfer=True, created_by=user_id,
+        )
+        for movement_type, location in (
+            ("out", transfer.from_location), ("in", transfer.to_location)
+        )
+    ]
+    db.add_all(movements)
+    db.commit()
+    for movement in movements:
+        db.refresh(movement)
+    return movements
+
+def create_stock_movements_batch(
+    db: Session,
+    batch: StockMovementBatchCreate,
+    user_id: int,
+    prevent_negative: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """
+    Apply a scanner/warehouse upload in one transaction: deltas are
+    aggregated per product and location, stock is updated set-based and
+    the movement ledger is bulk-inserted.
+
+    In partial mode invalid rows are rejected and the rest applied; in
+    all-or-nothing mode a single rejected row leaves the database
+    untouched. Either way the per-row results are returned.
+    """
+    if prevent_negative is None:
+        prevent_negative = settings.STOCK_PREVENT_NEGATIVE
+    movements = batch.movements
+    errors: Dict[int, str] = {}
+
+    product_ids = {movement.product_id for movement in movements}
+    known = get_cached_products(db, product_ids).keys()
+    for index, movement in enumerate(movements):
+        if movement.product_id not in known:
+            errors[index] = f"Product {movement.product_id} not found"
+        elif movement.movement_type not in ("in", "out"):
+            errors[index] = f"Invalid movement type '{movement.movement_type}'"
+        elif movement.quantity <= 0:
+            errors[index] = "Quantity must be positive"
+
+    deltas: Dict[Tuple[int, str], int] = defaultdict(int)
+    rows_by_key: Dict[Tuple[int, str], List[int]] = defaultdict(list)
+    for index, movement in enumerate(movements):
+        if index not in errors:
+            key = (movement.product_id, movement.location)
+            deltas[key] += signed_quantity(movement.movement_type, movement.quantity)
+            rows_by_key[key].append(index)
+
+    if prevent_negative:
+        # Lock the rows we are about to take stock from, then check the
+        # net result per product and location in one query
+        decreasing = [key for key, delta in deltas.items() if delta < 0]
+        on_hand = {
+            (product_id, location): quantity
+            for product_id, location, quantity in db.execute(
+                select(Stock.product_id, Stock.location, Stock.quantity)
+                .where(tuple_(Stock.product_id, Stock.location).in_(decreasing))
+                .with_for_update()
+            )
+        } if decreasing else {}
+        for key in decreasing:
+            if on_hand.get(key, 0) + deltas[key] < 0:
+                for index in rows_by_key.pop(key):
+                    errors[index] = f"Insufficient stock for product {key[0]} at {key[1]}"
+                del deltas[key]
+
+    rejected_all = batch.mode == StockMovementBatchMode.ALL_OR_NOTHING and errors
+    if not rejected_all:
+        quantities = apply_stock_deltas(db, deltas)
+        check_stock_levels(db, {
+            key: (quantity - deltas[key], quantity) for key, quantity in quantities.items()
+        })
+        # Upload order: ids follow it, and valuation consumes cost layers
+        # in the same order a rebuild replays them by id
+        accepted_rows = [
+            {**movements[index].dict(), "created_by": user_id}
+            for index in sorted(
+                index for indexes in rows_by_key.values() for index in indexes
+            )
+        ]
+        if accepted_rows:
+            value_stock_movements(db, accepted_rows)
+            db.execute(insert(StockMovement), accepted_rows)
+        db.commit()
+
+    results = [
+        {
+            "index": index,
+            "accepted": not rejected_all and index not in errors,
+            "error": errors.get(index),
+        }
+        for index in range(len(movements))
+    ]
+    accepted = sum(1 for result in results if result["accepted"])
+    return {
+        "accepted": accepted,
+        "rejected": len(movements) - accepted,
+        "results": results,
+    }
+
+def get_stock_movements(
+    db: Session, product_id: int, skip: int = 0, limit: int = 100,
+    cursor: Optional[str] = None, sort: Optional[str] = None
+) -> Page:
+    return paginate(
+        db.query(StockMovement).filter(StockMovement.product_id == product_id),
+        StockMovement.id, STOCK_MOVEMENT_SORT_FIELDS,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    ) 
+
+# Stock checkpoints
+LEDGER_START = datetime(1970, 1, 1, tzinfo=timezone.utc)
+SIGNED_MOVEMENT_QUANTITY = case(
+    (StockMovement.movement_type == "in", StockMovement.quantity),
+    else_=-StockMovement.quantity,
+)
+
+def as_utc(value: datetime) -> datetime:
+    # Naive datetimes (and SQLite's stored timestamps) are taken as UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def stock_positions_statement(at: datetime, product_id: Optional[int] = None) -> Any:
+    """
+    (product_id, location, quantity) on hand at ``at`` per the movement
+    ledger: the latest checkpoint at or before ``at`` plus the movements
+    after it, so the cost is bounded by the checkpoint interval rather
+    than the length of the history.
+    """
+    at = as_utc(at)
+    since = (
+        select(func.max(StockCheckpoint.as_of))
+        .where(StockCheckpoint.as_of <= at)
+        .scalar_subquery()
+    )
+    checkpoint = select(
+        StockCheckpoint.product_id, StockCheckpoint.location, StockCheckpoint.quantity
+    ).where(StockCheckpoint.as_of == since)
+    movements = select(
+        StockMovement.product_id, StockMovement.location,
+        SIGNED_MOVEMENT_QUANTITY.label("quantity"),
+    ).where(
+        StockMovement.created_at <= at,
+        # A plain range on created_at, so the index bounds the scan
+        StockMovement.created_at > func.coalesce(since, LEDGER_START),
+    )
+    if product_id is not None:
+        checkpoint = checkpoint.where(StockCheckpoint.product_id == product_id)
+        movements = movements.where(StockMovement.product_id == product_id)
+    ledger = union_all(checkpoint, movements).subquery()
     return (
-        db.query(StockMovement)
-        .filter(StockMovement.product_id == product_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
-    ) 
\ No newline at end of file
+        select(
+            ledger.c.product_id, ledger.c.location,
+            func.sum(ledger.c.quantity).label("quantity"),
+        )
+        .group_by(ledger.c.product_id, ledger.c.location)
+        .order_by(ledger.c.product_id, ledger.c.location)
+    )
+
+def get_stock_as_of(db: Session, product_id: int, at: datetime) -> List[Dict]:
+    return [
+        dict(row._mapping)
+        for row in db.execute(stock_positions_statement(at, product_id))
+    ]
+
+def write_stock_checkpoints(db: Session, as_of: Optional[datetime] = None) -> Optional[int]:
+    """
+    Write the whole catalog's position as of ``as_of`` in one INSERT ...
+    SELECT from the previous checkpoint and the movements since. Returns
+    the number of rows written, or None if a checkpoint at or after
+    ``as_of`` already exists.
+
+    ``as_of`` defaults to now minus STOCK_CHECKPOINT_LAG_SECONDS, so that
+    movements of transactions still in flight, whose created_at is already
+    set, are not left out.
+    """
+    if as_of is None:
+        as_of = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.STOCK_CHECKPOINT_LAG_SECONDS
+        )
+    as_of = as_utc(as_of)
+    last = db.execute(select(func.max(StockCheckpoint.as_of))).scalar()
+    if last is not None and as_utc(last) >= as_of:
+        return None
+    positions = stock_positions_statement(as_of).subquery()
+    written = db.execute(
+        insert(StockCheckpoint).from_select(
+            ["as_of", "product_id", "location", "quantity"],
+            select(
+                literal(as_of, DateTime(timezone=True)),
+                positions.c.product_id, positions.c.location, positions.c.quantity,
+            ),
+        )
+    ).rowcount
+    db.commit()
+    return written
+
+def prune_stock_checkpoints(db: Session, before: datetime) -> int:
+    """
+    Delete checkpoint runs older than ``before``, except the last run of
+    each month, which month-end valuation reads. Returns the runs deleted.
+    """
+    runs = db.execute(
+        select(StockCheckpoint.as_of).distinct().where(StockCheckpoint.as_of < as_utc(before))
+    ).scalars().all()
+    month_ends: Dict[Tuple[int, int], datetime] = {}
+    for run in runs:
+        month = (as_utc(run).year, as_utc(run).month)
+        month_ends[month] = max(month_ends.get(month, run), run)
+    stale = sorted(set(runs) - set(month_ends.values()))
+    if stale:
+        db.execute(delete(StockCheckpoint).where(StockCheckpoint.as_of.in_(stale)))
+        db.commit()
+    return len(stale)
@@ -0,0 +1,254 @@
+from collections import defaultdict
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.pagination import Page, paginate_async
+from app.models.inventory import Category, Product, Stock, StockMovement
+from app.schemas.inventory import (
+    CategoryCreate, CategoryUpdate,
+    ProductCreate, ProductUpdate,
+    StockCreate, StockUpdate,
+    StockMovementCreate
+)
+from app.core.config import settings
+from app.services.inventory import (
+    CATEGORY_SORT_FIELDS, PRODUCT_SORT_FIELDS, STOCK_MOVEMENT_SORT_FIELDS,
+    InsufficientStockError, add_availability, assign_category_path, check_stock_levels,
+    guarded_decrement_statement,
+    invalidate_categories, invalidate_category_tree, invalidate_product,
+    move_category, signed_quantity, upsert_statement, validate_products,
+    value_stock_movements
+)
+from app.services import reporting
+from app.services.product_search import index_product
+
+# Category services
+async def get_category(db: AsyncSession, category_id: int) -> Optional[Category]:
+    return await db.get(Category, category_id)
+
+async def get_categories(
+    db: AsyncSession, skip: int = 0, limit: int = 100,
+    cursor: Optional[str] = None, sort: Optional[str] = None
+) -> Page:
+    return await paginate_async(
+        db, select(Category), Category.id, CATEGORY_SORT_FIELDS,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
+
+async def create_category(db: AsyncSession, category: CategoryCreate) -> Category:
+    db_category = Category(**category.dict())
+    db.add(db_category)
+    await db.run_sync(assign_category_path, db_category)
+    await db.commit()
+    await db.refresh(db_category)
+    invalidate_category_tree()
+    return db_category
+
+async def update_category(
+    db: AsyncSession, category_id: int, category: CategoryUpdate
+) -> Optional[Category]:
+    db_category = await get_category(db, category_id)
+    if not db_category:
+        return None
+
+    update_data = category.dict(exclude_unset=True)
+    if "parent_id" in update_data:
+        parent_id = update_data.pop("parent_id")
+        if parent_id != db_category.parent_id:
+            await db.run_sync(move_category, db_category, parent_id)
+    for field, value in update_data.items():
+        setattr(db_category, field, value)
+
+    db.add(db_category)
+    await db.commit()
+    await db.refresh(db_category)
+    invalidate_categories()
+    return db_category
+
+# Product services
+async def get_product(db: AsyncSession, product_id: int) -> Optional[Product]:
+    return await db.get(Product, product_id)
+
+async def get_product_by_sku(db: AsyncSession, sku: str) -> Optional[Product]:
+    result = await db.execute(select(Product).filter(Product.sku == sku))
+    return result.scalars().first()
+
+async def get_products(
+    db: AsyncSession, skip: int = 0, limit: int = 100,
+    cursor: Optional[str] = None, sort: Optional[str] = None
+) -> Page:
+    return await paginate_async(
+        db, select(Product), Product.id, PRODUCT_SORT_FIELDS,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
+
+async def create_product(db: AsyncSession, product: ProductCreate) -> Product:
+    db_product = Product(**product.dict())
+    db.add(db_product)
+    await db.commit()
+    await db.refresh(db_product)
+    index_product(db_product)
+    return db_product
+
+async def update_product(
+    db: AsyncSession, product_id: int, product: ProductUpdate
+) -> Optional[Product]:
+    db_product = await get_product(db, product_id)
+    if not db_product:
+        return None
+
+    old_category_id = db_product.category_id
+    update_data = product.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(db_product, field, value)
+
+    db.add(db_product)
+    if db_product.category_id != old_category_id:
+        await db.flush()
+        await db.run_sync(reporting.move_product_category, product_id, old_category_id)
+    await db.commit()
+    await db.refresh(db_product)
+    invalidate_product(product_id)
+    index_product(db_product)
+    return db_product
+
+# Stock services
+async def get_stock(db: AsyncSession, stock_id: int) -> Optional[Stock]:
+    return await db.get(Stock, stock_id)
+
+async def get_stock_by_product(
+    db: AsyncSession, product_id: int, location: str = "default"
+) -> Optional[Stock]:
+    result = await db.execute(
+        select(Stock).filter(Stock.product_id == product_id, Stock.location == location)
+    )
+    return result.scalars().first()
+
+async def create_stock(db: AsyncSession, stock: StockCreate) -> Stock:
+    db_stock = Stock(**stock.dict())
+    try:
+        async with db.begin_nested():
+            db.add(db_stock)
+    except IntegrityError:
+        raise ValueError(
+            f"Stock for product {stock.product_id} at {stock.location} already exists"
+        )
+    await db.run_sync(add_availability, {stock.product_id: stock.quantity})
+    await db.commit()
+    await db.refresh(db_stock)
+    return db_stock
+
+async def get_stock_for_update(db: AsyncSession, stock_id: int) -> Optional[Stock]:
+    result = await db.execute(
+        select(Stock)
+        .filter(Stock.id == stock_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+async def update_stock(
+    db: AsyncSession, stock_id: int, stock: StockUpdate
+) -> Optional[Stock]:
+    db_stock = await get_stock_for_update(db, stock_id)
+    if not db_stock:
+        return None
+    before = {(db_stock.product_id, db_stock.location): db_stock.quantity}
+
+    update_data = stock.dict(exclude_unset=True)
+    product_id = update_data.get("product_id", db_stock.product_id)
+    location = update_data.get("location", db_stock.location)
+    try:
+        async with db.begin_nested():
+            for field, value in update_data.items():
+                setattr(db_stock, field, value)
+    except IntegrityError:
+        raise ValueError(
+            f"Stock for product {product_id} at {location} already exists"
+        )
+
+    changes = {key: (quantity, 0) for key, quantity in before.items()}
+    key = (db_stock.product_id, db_stock.location)
+    changes[key] = (before.get(key, 0), db_stock.quantity)
+    availability: Dict[int, int] = defaultdict(int)
+    for (product_id, _), (previous, quantity) in changes.items():
+        availability[product_id] += quantity - previous
+    await db.run_sync(add_availability, availability)
+    await db.run_sync(check_stock_levels, changes)
+    db.add(db_stock)
+    await db.commit()
+    await db.refresh(db_stock)
+    return db_stock
+
+# Stock Movement services
+async def adjust_stock(
+    db: AsyncSession,
+    product_id: int,
+    delta: int,
+    location: str = "default",
+    prevent_negative: Optional[bool] = None,
+) -> int:
+    quantity = await adjust_stock_row(db, product_id, delta, location, prevent_negative)
+    await db.run_sync(add_availability, {product_id: delta})
+    return quantity
+
+async def adjust_stock_row(
+    db: AsyncSession,
+    product_id: int,
+    delta: int,
+    location: str = "default",
+    prevent_negative: Optional[bool] = None,
+) -> int:
+    if prevent_negative is None:
+        prevent_negative = settings.STOCK_PREVENT_NEGATIVE
+
+    if delta < 0 and prevent_negative:
+        quantity = (
+            await db.execute(guarded_decrement_statement(product_id, location, delta))
+        ).scalar()
+        if quantity is None:
+            raise InsufficientStockError(
+                f"Insufficient stock for product {product_id} at {location}"
+            )
+        return quantity
+
+    stmt = upsert_statement(db.get_bind().dialect.name, product_id, location, delta)
+    if stmt is None:
+        raise RuntimeError("Async stock updates require ON CONFLICT support")
+    return (await db.execute(stmt)).scalar_one()
+
+async def create_stock_movement(
+    db: AsyncSession,
+    movement: StockMovementCreate,
+    user_id: int,
+    prevent_negative: Optional[bool] = None,
+) -> StockMovement:
+    await db.run_sync(validate_products, [movement.product_id])
+    delta = signed_quantity(movement.movement_type, movement.quantity)
+    quantity = await adjust_stock(
+        db, movement.product_id, delta, movement.location, prevent_negative
+    )
+    await db.run_sync(
+        check_stock_levels,
+        {(movement.product_id, movement.location): (quantity - delta, quantity)},
+    )
+
+    row = movement.dict()
+    await db.run_sync(value_stock_movements, [row])
+    db_movement = StockMovement(**row, created_by=user_id)
+    db.add(db_movement)
+    await db.commit()
+    await db.refresh(db_movement)
+    return db_movement
+
+async def get_stock_movements(
+    db: AsyncSession, product_id: int, skip: int = 0, limit: int = 100,
+    cursor: Optional[str] = None, sort: Optional[str] = None
+) -> Page:
+    return await paginate_async(
+        db,
+        select(StockMovement).filter(StockMovement.product_id == product_id),
+        StockMovement.id, STOCK_MOVEMENT_SORT_FIELDS,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
@@ -0,0 +1,67 @@
+from collections import defaultdict
+from typing import Any, Dict, List, Sequence, Tuple
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+
+def match_line_items(
+    existing: Sequence[Any], rows: List[Dict], key: str
+) -> Tuple[List[Tuple[Any, Dict]], List[Dict], List[Any]]:
+    """
+    Pair ``rows`` with stored lines on ``key``; repeated keys pair up in id
+    order. Returns the (line, row) pairs, the unmatched rows and the
+    unmatched stored lines.
+    """
+    stored = defaultdict(list)
+    for line in sorted(existing, key=lambda line: line.id):
+        stored[getattr(line, key)].append(line)
+
+    matched, new = [], []
+    for row in rows:
+        matches = stored.get(row[key])
+        if matches:
+            matched.append((matches.pop(0), row))
+        else:
+            new.append(row)
+    return matched, new, [line for lines in stored.values() for line in lines]
+
+def sync_line_items(
+    db: Session,
+    model: Any,
+    parent: Dict[str, Any],
+    existing: Sequence[Any],
+    rows: List[Dict],
+    key: str,
+) -> float:
+    """
+    Bring a document's stored lines (``existing``) in line with ``rows``
+    with the fewest writes: matched lines that changed are updated in one
+    executemany, unmatched stored lines are deleted in one statement and new
+    rows are inserted in one executemany. Untouched lines keep their ids.
+
+    Lines are matched as in match_line_items. ``parent`` holds the foreign
+    key values for inserted rows. Returns the change in the summed
+    ``total_amount``.
+    """
+    matched, new, removed = match_line_items(existing, rows, key)
+
+    updates, delta = [], 0.0
+    for line, row in matched:
+        if any(getattr(line, field) != value for field, value in row.items()):
+            updates.append({"id": line.id, **row})
+            delta += row["total_amount"] - line.total_amount
+    inserts = [{**row, **parent} for row in new]
+    delta += sum(row["total_amount"] for row in new)
+
+    if removed:
+        db.execute(
+            delete(model)
+            .where(model.id.in_([line.id for line in removed]))
+            .execution_options(synchronize_session=False)
+        )
+        delta -= sum(line.total_amount for line in removed)
+    if updates:
+        # ORM bulk UPDATE by primary key: one executemany
+        db.execute(update(model), updates)
+    if inserts:
+        db.execute(insert(model), inserts)
+    return delta
@@ -0,0 +1,166 @@
+import os
+import threading
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import exists, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.numbering import DocumentSequence
+
+# Document type -> number prefix
+DOCUMENT_PREFIXES = {
+    "order": "SO",
+    "invoice": "INV",
+    "purchase_order": "PO",
+    "purchase_receipt": "GR",
+}
+
+class DuplicateDocumentNumber(ValueError):
+    pass
+
+def is_gapless(doc_type: str) -> bool:
+    return doc_type == "invoice" and settings.INVOICE_NUMBERS_GAPLESS
+
+def format_number(doc_type: str, year: int, value: int) -> str:
+    return f"{DOCUMENT_PREFIXES[doc_type]}-{year}-{value:0{settings.DOCUMENT_NUMBER_PADDING}d}"
+
+def _increment(conn: Any, name: str, year: int, step: int) -> int:
+    """
+    Advance the (name, year) counter by ``step`` on ``conn`` and return the
+    new last_value, creating the counter on first use.
+    """
+    bind = conn.get_bind() if isinstance(conn, Session) else conn
+    dialect_insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(
+        bind.dialect.name
+    )
+    if dialect_insert is not None:
+        stmt = dialect_insert(DocumentSequence).values(name=name, year=year, last_value=step)
+        return conn.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[DocumentSequence.name, DocumentSequence.year],
+                set_={"last_value": DocumentSequence.last_value + stmt.excluded.last_value},
+            ).returning(DocumentSequence.last_value)
+        ).scalar_one()
+
+    key = (DocumentSequence.name == name, DocumentSequence.year == year)
+    while True:
+        updated = conn.execute(
+            update(DocumentSequence)
+            .where(*key)
+            .values(last_value=DocumentSequence.last_value + step)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if updated:
+            return conn.execute(select(DocumentSequence.last_value).where(*key)).scalar_one()
+        try:
+            with conn.begin_nested():
+                conn.execute(
+                    DocumentSequence.__table__.insert().values(
+                        name=name, year=year, last_value=step
+                    )
+                )
+            return step
+        except IntegrityError:
+            continue
+
+class BlockAllocator:
+    """
+    Hands out numbers from blocks reserved in the database, so only one
+    allocation per ``block_size`` touches the counter row. Each block is
+    reserved in its own short transaction; numbers left in a block when
+    the process exits are skipped.
+    """
+
+    def __init__(self, block_size: int) -> None:
+        self.block_size = block_size
+        self._blocks: Dict[Tuple[str, int], List[List[int]]] = {}
+        self._lock = threading.Lock()
+
+    def _take(self, key: Tuple[str, int]) -> Optional[int]:
+        blocks = self._blocks.get(key)
+        while blocks:
+            block = blocks[0]
+            if block[0] <= block[1]:
+                block[0] += 1
+                return block[0] - 1
+            blocks.pop(0)
+        return None
+
+    def allocate(self, bind: Any, name: str, year: int) -> int:
+        key = (name, year)
+        while True:
+            with self._lock:
+                value = self._take(key)
+                if value is not None:
+                    return value
+            # Reserve outside the lock: async services run this on the
+            # event-loop thread, where waiting on a lock held across I/O
+            # would stall every other coroutine. A block reserved by a
+            # concurrent caller is queued and used, not wasted.
+            with bind.begin() as conn:
+                last = _increment(conn, name, year, self.block_size)
+            with self._lock:
+                self._blocks.setdefault(key, []).append([last - self.block_size + 1, last])
+
+    def reset(self) -> None:
+        # Forked workers must not reuse the parent's reserved blocks
+        self._blocks = {}
+        self._lock = threading.Lock()
+
+block_allocator = BlockAllocator(settings.DOCUMENT_NUMBER_BLOCK_SIZE)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=block_allocator.reset)
+
+def next_number(db: Session, doc_type: str, year: Optional[int] = None) -> str:
+    """
+    Allocate the next formatted number for ``doc_type``.
+
+    Gapless types take the number inside the caller's transaction: the
+    counter row stays locked until commit, and a rollback returns the
+    number. Other types draw from the worker's reserved block.
+    """
+    year = year or date.today().year
+    if is_gapless(doc_type):
+        value = _increment(db, doc_type, year, 1)
+    else:
+        value = block_allocator.allocate(db.get_bind(), doc_type, year)
+    return format_number(doc_type, year, value)
+
+def document_number(db: Session, doc_type: str, number: Optional[str] = None) -> str:
+    """
+    The number for a new document: the client-supplied ``number``, or the
+    next allocated one. Call it before the document's transaction writes
+    anything, so a block reservation never waits on the caller's locks.
+    """
+    if number is None:
+        return next_number(db, doc_type)
+    # A number from outside the allocator would break a gapless sequence
+    if is_gapless(doc_type):
+        raise ValueError(f"{doc_type.replace('_', ' ').capitalize()} numbers are assigned by the server")
+    return number
+
+def add_numbered(
+    db: Session, document: Any, column: Any, doc_type: str, supplied: bool
+) -> None:
+    """
+    Add and flush a new document numbered by document_number.
+
+    The flush runs in a savepoint so a clash on the unique number column
+    does not end the caller's transaction: a ``supplied`` number that is
+    taken raises DuplicateDocumentNumber, and an allocated number a client
+    had already used is skipped for the next one.
+    """
+    while True:
+        value = getattr(document, column.key)
+        try:
+            with db.begin_nested():
+                db.add(document)
+            return
+        except IntegrityError:
+            if not db.execute(select(exists().where(column == value))).scalar():
+                raise
+            if supplied:
+                raise DuplicateDocumentNumber(f"Document number {value} is already in use")
+            setattr(document, column.key, next_number(db, doc_type))
@@ -0,0 +1,181 @@
+import bisect
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.inventory import Product
+
+# Match tiers, best first; fuzzy similarity (0..1) breaks ties within a tier
+EXACT_SKU, SKU_PREFIX, NAME_PREFIX, SUBSTRING, FUZZY = 4, 3, 2, 1, 0
+
+def trigrams(text: str) -> Set[str]:
+    # Same padding as pg_trgm, so both backends rank alike
+    grams: Set[str] = set()
+    for word in text.lower().split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def similarity(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+def _tier(q: str, name: str, sku: str) -> int:
+    if sku == q:
+        return EXACT_SKU
+    if sku.startswith(q):
+        return SKU_PREFIX
+    if name.startswith(q):
+        return NAME_PREFIX
+    if q in name or q in sku:
+        return SUBSTRING
+    return FUZZY
+
+class ProductSearchIndex:
+    """
+    In-process trigram and prefix index over product names and SKUs, for
+    databases without pg_trgm. Loaded on first use, kept current by
+    create_product/update_product in this worker and reloaded after
+    PRODUCT_SEARCH_INDEX_REFRESH_SECONDS to pick up other workers' writes.
+    """
+
+    def __init__(self, refresh_seconds: float) -> None:
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.RLock()
+        self._loaded_at: Optional[float] = None
+        self._products: Dict[int, Tuple[str, str, bool]] = {}
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._names: List[Tuple[str, int]] = []
+        self._skus: List[Tuple[str, int]] = []
+
+    def _ensure_loaded(self, db: Session) -> None:
+        if (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < self.refresh_seconds
+        ):
+            return
+        rows = db.execute(
+            select(Product.id, Product.name, Product.sku, Product.is_active)
+        ).all()
+        with self._lock:
+            self._products = {}
+            self._postings = defaultdict(set)
+            for id, name, sku, is_active in rows:
+                self._add(id, name, sku, is_active)
+            self._names = sorted((name, id) for id, (name, _, _) in self._products.items())
+            self._skus = sorted((sku, id) for id, (_, sku, _) in self._products.items())
+            self._loaded_at = time.monotonic()
+
+    def _add(self, id: int, name: str, sku: str, is_active: bool) -> None:
+        name, sku = name.lower(), sku.lower()
+        self._products[id] = (name, sku, bool(is_active))
+        for gram in trigrams(name) | trigrams(sku):
+            self._postings[gram].add(id)
+
+    def _remove(self, id: int) -> None:
+        name, sku, _ = self._products.pop(id)
+        for gram in trigrams(name) | trigrams(sku):
+            self._postings[gram].discard(id)
+        for entries, key in ((self._names, name), (self._skus, sku)):
+            i = bisect.bisect_left(entries, (key, id))
+            if i < len(entries) and entries[i] == (key, id):
+                del entries[i]
+
+    def update(self, product: Product) -> None:
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            if product.id in self._products:
+                self._remove(product.id)
+            self._add(product.id, product.name, product.sku, product.is_active)
+            name, sku, _ = self._products[product.id]
+            bisect.insort(self._names, (name, product.id))
+            bisect.insort(self._skus, (sku, product.id))
+
+    def _prefixed(self, entries: List[Tuple[str, int]], q: str, limit: int) -> List[int]:
+        i = bisect.bisect_left(entries, (q, -1))
+        ids = []
+        while i < len(entries) and entries[i][0].startswith(q) and len(ids) < limit:
+            ids.append(entries[i][1])
+            i += 1
+        return ids
+
+    def search(
+        self, db: Session, q: str, limit: int, include_inactive: bool = False
+    ) -> List[int]:
+        self._ensure_loaded(db)
+        q = q.lower().strip()
+        q_grams = trigrams(q)
+        with self._lock:
+            candidates = set(self._prefixed(self._skus, q, limit * 5))
+            candidates.update(self._prefixed(self._names, q, limit * 5))
+            if q_grams:
+                hits = Counter()
+                for gram in q_grams:
+                    hits.update(self._postings.get(gram, ()))
+                candidates.update(id for id, _ in hits.most_common(limit * 20))
+            scored = []
+            for id in candidates:
+                name, sku, is_active = self._products[id]
+                if not is_active and not include_inactive:
+                    continue
+                tier = _tier(q, name, sku)
+                score = max(
+                    similarity(q_grams, trigrams(name)), similarity(q_grams, trigrams(sku))
+                )
+                if tier == FUZZY and score < settings.PRODUCT_SEARCH_MIN_SIMILARITY:
+                    continue
+                scored.append((-tier, -score, name, id))
+        scored.sort()
+        return [id for *_, id in scored[:limit]]
+
+product_index = ProductSearchIndex(settings.PRODUCT_SEARCH_INDEX_REFRESH_SECONDS)
+
+def _search_postgresql(
+    db: Session, q: str, limit: int, include_inactive: bool
+) -> List[Product]:
+    # Served by the gin_trgm_ops indexes on lower(name) and lower(sku)
+    q = q.lower().strip()
+    name, sku = func.lower(Product.name), func.lower(Product.sku)
+    # One whole pattern rather than '%' || q || '%', so the planner sees a
+    # plain constant it can match against the trigram index
+    pattern = "%" + q.replace("/", "//").replace("%", "/%").replace("_", "/_") + "%"
+    substring = or_(name.like(pattern, escape="/"), sku.like(pattern, escape="/"))
+    tier = case(
+        (sku == q, EXACT_SKU),
+        (sku.startswith(q, autoescape=True), SKU_PREFIX),
+        (name.startswith(q, autoescape=True), NAME_PREFIX),
+        (substring, SUBSTRING),
+        else_=FUZZY,
+    )
+    score = func.greatest(func.similarity(name, q), func.similarity(sku, q))
+    query = db.query(Product).filter(or_(substring, name.op("%")(q), sku.op("%")(q)))
+    if not include_inactive:
+        query = query.filter(Product.is_active.is_(True))
+    return query.order_by(tier.desc(), score.desc(), Product.name).limit(limit).all()
+
+def search_products(
+    db: Session, q: str, limit: int = 20, include_inactive: bool = False
+) -> List[Product]:
+    """
+    Ranked product lookup on name and SKU: exact SKU, SKU prefix, name
+    prefix, substring, then trigram similarity.
+    """
+    if use_postgresql(db):
+        return _search_postgresql(db, q, limit, include_inactive)
+    ids = product_index.search(db, q, limit, include_inactive)
+    if not ids:
+        return []
+    products = {p.id: p for p in db.query(Product).filter(Product.id.in_(ids))}
+    return [products[id] for id in ids if id in products]
+
+def use_postgresql(db: Any) -> bool:
+    backend = settings.PRODUCT_SEARCH_BACKEND
+    if backend == "auto":
+        return db.get_bind().dialect.name == "postgresql"
+    return backend == "postgresql"
+
+def index_product(product: Product) -> None:
+    product_index.update(product)
@@ -1,10 +1,18 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.orm import Session, selectinload
+from app.db.pagination import Page, paginate
+from app.models.inventory import StockMovement
 from app.models.purchase import (
-    Supplier, PurchaseOrder, PurchaseOrderItem,
-    PurchaseReceipt, PurchaseReceiptItem
+    Supplier, PurchaseOrder, PurchaseOrderItem, PurchaseOrderStatus,
+    PurchaseReceipt, PurchaseReceiptItem, ReceiptStatus
 )
-from app.models.inventory import Product
+from app.services import numbering
+from app.services.inventory import (
+    apply_stock_deltas, check_stock_levels, validate_products, value_stock_movements
+)
+from app.services.lines import match_line_items, sync_line_items
 from app.schemas.purchase import (
     SupplierCreate, SupplierUpdate,
     PurchaseOrderCreate, PurchaseOrderUpdate,
@@ -14,6 +22,24 @@ from app.schemas.purchase import (
 )
 from datetime import datetime
 
+# Keyset sort fields; each is backed by a (field, id) index
+SUPPLIER_SORT_FIELDS = {"id": Supplier.id, "name": Supplier.name}
+PURCHASE_ORDER_SORT_FIELDS = {
+    "id": PurchaseOrder.id,
+    "order_date": PurchaseOrder.order_date,
+    "expected_date": PurchaseOrder.expected_date,
+    "order_number": PurchaseOrder.order_number,
+}
+
+# Purchase orders that accept receipts
+RECEIVABLE_ORDER_STATUSES = (PurchaseOrderStatus.CONFIRMED, PurchaseOrderStatus.PARTIALLY_RECEIVED)
+
+# Relationship loading per endpoint: selectin for collections, joined for
+# to-one. Only relationships the response schema serializes are loaded.
+PURCHASE_ORDER_LIST_LOADERS = (selectinload(PurchaseOrder.items),)
+PURCHASE_ORDER_DETAIL_LOADERS = (selectinload(PurchaseOrder.items),)
+PURCHASE_RECEIPT_DETAIL_LOADERS = (selectinload(PurchaseReceipt.items),)
+
 # Supplier services
 def get_supplier(db: Session, supplier_id: int) -> Optional[Supplier]:
     return db.query(Supplier).filter(Supplier.id == supplier_id).first()
@@ -22,9 +48,13 @@ def get_supplier_by_email(db: Session, email: str) -> Optional[Supplier]:
     return db.query(Supplier).filter(Supplier.email == email).first()
 
 def get_suppliers(
-    db: Session, skip: int = 0, limit: int = 100
-) -> List[Supplier]:
-    return db.query(Supplier).offset(skip).limit(limit).all()
+    db: Session, skip: int = 0, limit: int = 100,
+    cursor: Optional[str] = None, sort: Optional[str] = None
+) -> Page:
+    return paginate(
+        db.query(Supplier), Supplier.id, SUPPLIER_SORT_FIELDS,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
 
 def create_supplier(db: Session, supplier: SupplierCreate) -> Supplier:
     db_supplier = Supplier(**supplier.dict())
@@ -51,48 +81,105 @@ def update_supplier(
 
 # Purchase Order services
 def get_purchase_order(db: Session, order_id: int) -> Optional[PurchaseOrder]:
-    return db.query(PurchaseOrder).filter(PurchaseOrder.id == order_id).first()
+    return (
+        db.query(PurchaseOrder)
+        .options(*PURCHASE_ORDER_DETAIL_LOADERS)
+        .filter(PurchaseOrder.id == order_id)
+        .first()
+    )
 
 def get_purchase_order_by_number(db: Session, order_number: str) -> Optional[PurchaseOrder]:
-    return db.query(PurchaseOrder).filter(PurchaseOrder.order_number == order_number).first()
+    return (
+        db.query(PurchaseOrder)
+        .options(*PURCHASE_ORDER_DETAIL_LOADERS)
+        .filter(PurchaseOrder.order_number == order_number)
+        .first()
+    )
 
 def get_purchase_orders(
-    db: Session, skip: int = 0, limit: int = 100
-) -> List[PurchaseOrder]:
-    return db.query(PurchaseOrder).offset(skip).limit(limit).all()
+    db: Session, skip: int = 0, limit: int = 100,
+    cursor: Optional[str] = None, sort: Optional[str] = None
+) -> Page:
+    return paginate(
+        db.query(PurchaseOrder).options(*PURCHASE_ORDER_LIST_LOADERS),
+        PurchaseOrder.id, PURCHASE_ORDER_SORT_FIELDS,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
+
+def _build_purchase_order_items(
+    db: Session, items: Sequence[PurchaseOrderItemCreate]
+) -> Tuple[List[Dict], float]:
+    validate_products(db, (item.product_id for item in items))
 
-def create_purchase_order(db: Session, order: PurchaseOrderCreate, user_id: int) -> PurchaseOrder:
-    # Calculate total amount
     total_amount = 0
-    order_items = []
-    
-    for item in order.items:
-        product = db.query(Product).filter(Product.id == item.product_id).first()
-        if not product:
-            raise ValueError(f"Product {item.product_id} not found")
-        
+    rows = []
+    for item in items:
         item_total = (item.quantity * item.unit_price) * (1 - item.discount)
         total_amount += item_total
-        
-        order_item = PurchaseOrderItem(
-            **item.dict(),
-            total_amount=item_total
+        rows.append({**item.dict(), "total_amount": item_total})
+    return rows, total_amount
+
+def _insert_purchase_order_items(db: Session, order_id: int, rows: List[Dict]) -> None:
+    # Single executemany (multi-row VALUES where the driver supports it)
+    if rows:
+        db.execute(
+            insert(PurchaseOrderItem),
+            [{**row, "order_id": order_id} for row in rows]
         )
-        order_items.append(order_item)
+
+def check_line_changes(
+    db: Session, order_id: int, existing: Sequence[PurchaseOrderItem], rows: List[Dict]
+) -> None:
+    """
+    Refuse line changes that would break what has been received: a line
+    received against or on a receipt cannot be removed, and no quantity
+    may drop below what was received. The order's lines stay locked until
+    commit, so a receipt cannot be posted in between.
+    """
+    received = dict(
+        db.execute(
+            select(PurchaseOrderItem.id, PurchaseOrderItem.received_quantity)
+            .where(PurchaseOrderItem.order_id == order_id)
+            .with_for_update()
+        ).all()
+    )
+    matched, _, removed = match_line_items(existing, rows, "product_id")
+    for line, row in matched:
+        if row["quantity"] < received.get(line.id, 0):
+            raise ValueError(
+                f"Order item {line.id}: quantity {row['quantity']} is below the "
+                f"{received[line.id]} already received"
+            )
+    removed_ids = [line.id for line in removed]
+    if not removed_ids:
+        return
+    on_receipt = db.execute(
+        select(PurchaseReceiptItem.order_item_id)
+        .where(PurchaseReceiptItem.order_item_id.in_(removed_ids))
+        .limit(1)
+    ).scalar()
+    if on_receipt is None:
+        on_receipt = next((id for id in removed_ids if received.get(id)), None)
+    if on_receipt is not None:
+        raise ValueError(f"Order item {on_receipt} has been received against and cannot be removed")
+
+def create_purchase_order(db: Session, order: PurchaseOrderCreate, user_id: int) -> PurchaseOrder:
+    order_items, total_amount = _build_purchase_order_items(db, order.items)
     
     # Create order
     db_order = PurchaseOrder(
-        **order.dict(exclude={'items'}),
+        **order.dict(exclude={'items', 'order_number'}),
+        order_number=numbering.document_number(db, "purchase_order", order.order_number),
         total_amount=total_amount,
         created_by=user_id
     )
-    db.add(db_order)
-    db.flush()  # Get order ID
+    # Flushed for the order ID
+    numbering.add_numbered(
+        db, db_order, PurchaseOrder.order_number, "purchase_order",
+        order.order_number is not None,
+    )
     
-    # Add order items
-    for item in order_items:
-        item.order_id = db_order.id
-        db.add(item)
+    _insert_purchase_order_items(db, db_order.id, order_items)
     
     db.commit()
     db.refresh(db_order)
@@ -112,27 +199,18 @@ def update_purchase_order(
     
     # Update items if provided
     if order.items:
-        # Delete existing items
-        db.query(PurchaseOrderItem).filter(PurchaseOrderItem.order_id == order_id).delete()
+        order_items, _ = _build_purchase_order_items(db, order.items)
+        check_line_changes(db, order_id, db_order.items, order_items)
         
-        # Calculate new total
-        total_amount = 0
-        for item in order.items:
-            product = db.query(Product).filter(Product.id == item.product_id).first()
-            if not product:
-                raise ValueError(f"Product {item.product_id} not found")
-            
-            item_total = (item.quantity * item.unit_price) * (1 - item.discount)
-            total_amount += item_total
-            
-            order_item = PurchaseOrderItem(
-                **item.dict(),
-                order_id=order_id,
-                total_amount=item_total
-            )
-            db.add(order_item)
-        
-        db_order.total_amount = total_amount
+        # Only changed, removed and new lines are written
+        db_order.total_amount += sync_line_items(
+            db, PurchaseOrderItem, {"order_id": order_id}, db_order.items, order_items,
+            key="product_id",
+        )
+        db.expire(db_order, ["items"])
+        status = order_status(db, order_id)
+        if status is not None:
+            db_order.status = status
     
     db.add(db_order)
     db.commit()
@@ -141,99 +219,241 @@ def update_purchase_order(
 
 # Purchase Receipt services
 def get_purchase_receipt(db: Session, receipt_id: int) -> Optional[PurchaseReceipt]:
-    return db.query(PurchaseReceipt).filter(PurchaseReceipt.id == receipt_id).first()
+    return (
+        db.query(PurchaseReceipt)
+        .options(*PURCHASE_RECEIPT_DETAIL_LOADERS)
+        .filter(PurchaseReceipt.id == receipt_id)
+        .first()
+    )
 
 def get_purchase_receipt_by_number(db: Session, receipt_number: str) -> Optional[PurchaseReceipt]:
-    return db.query(PurchaseReceipt).filter(PurchaseReceipt.receipt_number == receipt_number).first()
+    return (
+        db.query(PurchaseReceipt)
+        .options(*PURCHASE_RECEIPT_DETAIL_LOADERS)
+        .filter(PurchaseReceipt.receipt_number == receipt_number)
+        .first()
+    )
+
+def _receipt_quantities(items: Iterable[Any]) -> Dict[int, int]:
+    quantities: Dict[int, int] = defaultdict(int)
+    for item in items:
+        if item.quantity <= 0:
+            raise ValueError(f"Order item {item.order_item_id}: quantity must be positive")
+        quantities[item.order_item_id] += item.quantity
+    return quantities
+
+def stored_receipt_quantities(db: Session, receipt_id: int) -> Dict[int, int]:
+    return _receipt_quantities(
+        db.execute(
+            select(PurchaseReceiptItem.order_item_id, PurchaseReceiptItem.quantity)
+            .where(PurchaseReceiptItem.receipt_id == receipt_id)
+        ).all()
+    )
+
+def check_outstanding(
+    db: Session, order_id: int, quantities: Dict[int, int], lock: bool = False
+) -> Dict[int, int]:
+    """
+    Validate receipt quantities ({order_item_id: quantity}) against what
+    is still outstanding on the order's lines, in one query. With ``lock``
+    the lines stay locked until commit, so the counters cannot move
+    underneath the caller. Returns {order_item_id: product_id}.
+    """
+    query = select(
+        PurchaseOrderItem.id, PurchaseOrderItem.order_id, PurchaseOrderItem.product_id,
+        PurchaseOrderItem.quantity - PurchaseOrderItem.received_quantity,
+    ).where(PurchaseOrderItem.id.in_(quantities))
+    if lock:
+        query = query.with_for_update()
+    products = {}
+    for order_item_id, item_order_id, product_id, outstanding in db.execute(query):
+        if item_order_id != order_id:
+            raise ValueError(f"Order item {order_item_id} is not on purchase order {order_id}")
+        if quantities[order_item_id] > outstanding:
+            raise ValueError(
+                f"Order item {order_item_id}: receiving {quantities[order_item_id]} "
+                f"exceeds the outstanding {outstanding}"
+            )
+        products[order_item_id] = product_id
+    missing = quantities.keys() - products.keys()
+    if missing:
+        raise ValueError(f"Order item {min(missing)} not found")
+    return products
+
+def order_status(db: Session, order_id: int) -> Optional[PurchaseOrderStatus]:
+    """
+    Receiving status derived from line completion: RECEIVED once every
+    line is fully received, PARTIALLY_RECEIVED once any line has been.
+    """
+    open_lines, started_lines = db.execute(
+        select(
+            func.count().filter(PurchaseOrderItem.received_quantity < PurchaseOrderItem.quantity),
+            func.count().filter(PurchaseOrderItem.received_quantity > 0),
+        ).where(PurchaseOrderItem.order_id == order_id)
+    ).one()
+    if not open_lines:
+        return PurchaseOrderStatus.RECEIVED
+    if started_lines:
+        return PurchaseOrderStatus.PARTIALLY_RECEIVED
+    return None
+
+def post_receipt(
+    db: Session, order: PurchaseOrder, receipt: PurchaseReceipt,
+    quantities: Dict[int, int], user_id: int
+) -> None:
+    """
+    Book a received receipt inside the caller's transaction: bump the
+    order lines' received_quantity, post the goods to stock at the
+    receipt's location set-based, value them at the receipt's prices,
+    write the ledger and move the order's status along.
+    """
+    products = check_outstanding(db, order.id, quantities, lock=True)
+    db.connection().execute(
+        update(PurchaseOrderItem.__table__)
+        .where(PurchaseOrderItem.id == bindparam("b_id"))
+        .values(received_quantity=PurchaseOrderItem.received_quantity + bindparam("b_quantity")),
+        [
+            {"b_id": order_item_id, "b_quantity": quantity}
+            for order_item_id, quantity in sorted(quantities.items())
+        ],
+    )
+
+    deltas: Dict[Tuple[int, str], int] = defaultdict(int)
+    for order_item_id, quantity in quantities.items():
+        deltas[(products[order_item_id], receipt.location)] += quantity
+    stock = apply_stock_deltas(db, deltas)
+    check_stock_levels(db, {
+        key: (quantity - deltas[key], quantity) for key, quantity in stock.items()
+    })
+    # Goods are valued at the receipt's prices
+    amounts = dict(
+        db.execute(
+            select(
+                PurchaseReceiptItem.order_item_id,
+                func.sum(PurchaseReceiptItem.quantity * PurchaseReceiptItem.unit_price),
+            )
+            .where(PurchaseReceiptItem.receipt_id == receipt.id)
+            .group_by(PurchaseReceiptItem.order_item_id)
+        ).all()
+    )
+    movements = [
+        {
+            "product_id": products[order_item_id], "quantity": quantity,
+            "movement_type": "in", "location": receipt.location,
+            "unit_cost": amounts[order_item_id] / quantity,
+            "reference": receipt.receipt_number, "created_by": user_id,
+        }
+        for order_item_id, quantity in sorted(quantities.items())
+    ]
+    value_stock_movements(db, movements)
+    db.execute(insert(StockMovement), movements)
+    status = order_status(db, order.id)
+    if status is not None:
+        order.status = status
 
 def create_purchase_receipt(db: Session, receipt: PurchaseReceiptCreate, user_id: int) -> PurchaseReceipt:
-    # Verify order exists and is confirmed
+    # Verify order exists and is open for receiving
     order = db.query(PurchaseOrder).filter(PurchaseOrder.id == receipt.order_id).first()
     if not order:
         raise ValueError(f"Purchase order {receipt.order_id} not found")
-    if order.status != PurchaseOrderStatus.CONFIRMED:
+    if order.status not in RECEIVABLE_ORDER_STATUSES:
         raise ValueError("Purchase order must be confirmed before creating receipt")
     
-    # Calculate total amount
-    total_amount = 0
-    receipt_items = []
-    
-    for item in receipt.items:
-        order_item = db.query(PurchaseOrderItem).filter(
-            PurchaseOrderItem.id == item.order_item_id
-        ).first()
-        if not order_item:
-            raise ValueError(f"Order item {item.order_item_id} not found")
-        
-        item_total = item.quantity * item.unit_price
-        total_amount += item_total
-        
-        receipt_item = PurchaseReceiptItem(
-            **item.dict(),
-            total_amount=item_total
-        )
-        receipt_items.append(receipt_item)
+    quantities = _receipt_quantities(receipt.items)
+    if receipt.status != ReceiptStatus.RECEIVED:
+        # A received receipt is checked under lock when it is posted
+        check_outstanding(db, order.id, quantities)
+    receipt_items = _build_purchase_receipt_items(receipt.items)
     
     # Create receipt
     db_receipt = PurchaseReceipt(
-        **receipt.dict(exclude={'items'}),
-        total_amount=total_amount,
+        **receipt.dict(exclude={'items', 'receipt_number'}),
+        receipt_number=numbering.document_number(db, "purchase_receipt", receipt.receipt_number),
+        total_amount=sum(item["total_amount"] for item in receipt_items),
         created_by=user_id
     )
-    db.add(db_receipt)
-    db.flush()  # Get receipt ID
+    # Flushed for the receipt ID
+    numbering.add_numbered(
+        db, db_receipt, PurchaseReceipt.receipt_number, "purchase_receipt",
+        receipt.receipt_number is not None,
+    )
     
-    # Add receipt items
-    for item in receipt_items:
-        item.receipt_id = db_receipt.id
-        db.add(item)
+    _insert_purchase_receipt_items(db, db_receipt.id, receipt_items)
     
-    # Update order status if all items are received
-    if total_amount >= order.total_amount:
-        order.status = PurchaseOrderStatus.RECEIVED
+    if receipt.status == ReceiptStatus.RECEIVED:
+        post_receipt(db, order, db_receipt, quantities, user_id)
     
     db.commit()
     db.refresh(db_receipt)
     return db_receipt
 
+def _build_purchase_receipt_items(items: Sequence[PurchaseReceiptItemCreate]) -> List[Dict]:
+    return [
+        {**item.dict(), "total_amount": item.quantity * item.unit_price}
+        for item in items
+    ]
+
+def _insert_purchase_receipt_items(db: Session, receipt_id: int, rows: List[Dict]) -> None:
+    if rows:
+        db.execute(
+            insert(PurchaseReceiptItem),
+            [{**row, "receipt_id": receipt_id} for row in rows]
+        )
+
 def update_purchase_receipt(
-    db: Session, receipt_id: int, receipt: PurchaseReceiptUpdate
+    db: Session, receipt_id: int, receipt: PurchaseReceiptUpdate,
+    user_id: Optional[int] = None
 ) -> Optional[PurchaseReceipt]:
     db_receipt = get_purchase_receipt(db, receipt_id)
     if not db_receipt:
         return None
     
     update_data = receipt.dict(exclude={'items'}, exclude_unset=True)
+    posting = _check_receipt_update(db_receipt, update_data, receipt.items)
     for field, value in update_data.items():
         setattr(db_receipt, field, value)
     
     # Update items if provided
     if receipt.items:
-        # Delete existing items
-        db.query(PurchaseReceiptItem).filter(PurchaseReceiptItem.receipt_id == receipt_id).delete()
+        quantities = _receipt_quantities(receipt.items)
+        if not posting:
+            check_outstanding(db, db_receipt.order_id, quantities)
+        receipt_items = _build_purchase_receipt_items(receipt.items)
         
-        # Calculate new total
-        total_amount = 0
-        for item in receipt.items:
-            order_item = db.query(PurchaseOrderItem).filter(
-                PurchaseOrderItem.id == item.order_item_id
-            ).first()
-            if not order_item:
-                raise ValueError(f"Order item {item.order_item_id} not found")
-            
-            item_total = item.quantity * item.unit_price
-            total_amount += item_total
-            
-            receipt_item = PurchaseReceiptItem(
-                **item.dict(),
-                receipt_id=receipt_id,
-                total_amount=item_total
-            )
-            db.add(receipt_item)
-        
-        db_receipt.total_amount = total_amount
+        # Only changed, removed and new lines are written
+        db_receipt.total_amount += sync_line_items(
+            db, PurchaseReceiptItem, {"receipt_id": receipt_id}, db_receipt.items,
+            receipt_items, key="order_item_id",
+        )
+        db.expire(db_receipt, ["items"])
+    
+    if posting:
+        order = db.query(PurchaseOrder).filter(PurchaseOrder.id == db_receipt.order_id).first()
+        if order.status not in RECEIVABLE_ORDER_STATUSES:
+            raise ValueError("Purchase order must be confirmed before receiving")
+        post_receipt(
+            db, order, db_receipt, stored_receipt_quantities(db, receipt_id),
+            user_id or db_receipt.created_by,
+        )
     
     db.add(db_receipt)
     db.commit()
     db.refresh(db_receipt)
-    return db_receipt 
\ No newline at end of file
+    return db_receipt
+
+def _check_receipt_update(
+    db_receipt: PurchaseReceipt, update_data: Dict[str, Any], items: Optional[List]
+) -> bool:
+    """
+    Reject changes to a receipt that has already been posted; returns
+    whether this update posts it.
+    """
+    if db_receipt.status == ReceiptStatus.RECEIVED:
+        changed = {
+            field for field, value in update_data.items()
+            if field in ("order_id", "status", "location") and value != getattr(db_receipt, field)
+        }
+        if changed or items:
+            raise ValueError("A received receipt cannot be changed")
+        return False
+    return update_data.get("status") == ReceiptStatus.RECEIVED
@@ -0,0 +1,244 @@
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.db.pagination import Page, paginate_async
+from app.models.purchase import (
+    Supplier, PurchaseOrder, PurchaseOrderItem,
+    PurchaseReceipt, PurchaseReceiptItem, ReceiptStatus
+)
+from app.schemas.purchase import (
+    SupplierCreate, SupplierUpdate,
+    PurchaseOrderCreate, PurchaseOrderUpdate,
+    PurchaseReceiptCreate, PurchaseReceiptUpdate
+)
+from app.services import numbering
+from app.services.lines import sync_line_items
+from app.services.purchase import (
+    SUPPLIER_SORT_FIELDS, PURCHASE_ORDER_SORT_FIELDS, RECEIVABLE_ORDER_STATUSES,
+    _build_purchase_order_items, _build_purchase_receipt_items, _check_receipt_update,
+    _insert_purchase_order_items, _insert_purchase_receipt_items, _receipt_quantities,
+    check_line_changes, check_outstanding, order_status, post_receipt,
+    stored_receipt_quantities
+)
+
+# Supplier services
+async def get_supplier(db: AsyncSession, supplier_id: int) -> Optional[Supplier]:
+    return await db.get(Supplier, supplier_id)
+
+async def get_supplier_by_email(db: AsyncSession, email: str) -> Optional[Supplier]:
+    result = await db.execute(select(Supplier).filter(Supplier.email == email))
+    return result.scalars().first()
+
+async def get_suppliers(
+    db: AsyncSession, skip: int = 0, limit: int = 100,
+    cursor: Optional[str] = None, sort: Optional[str] = None
+) -> Page:
+    return await paginate_async(
+        db, select(Supplier), Supplier.id, SUPPLIER_SORT_FIELDS,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
+
+async def create_supplier(db: AsyncSession, supplier: SupplierCreate) -> Supplier:
+    db_supplier = Supplier(**supplier.dict())
+    db.add(db_supplier)
+    await db.commit()
+    await db.refresh(db_supplier)
+    return db_supplier
+
+async def update_supplier(
+    db: AsyncSession, supplier_id: int, supplier: SupplierUpdate
+) -> Optional[Supplier]:
+    db_supplier = await get_supplier(db, supplier_id)
+    if not db_supplier:
+        return None
+
+    update_data = supplier.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(db_supplier, field, value)
+
+    db.add(db_supplier)
+    await db.commit()
+    await db.refresh(db_supplier)
+    return db_supplier
+
+# Purchase Order services
+# Lazy loading is unavailable under asyncio, so items are always eager-loaded
+async def get_purchase_order(db: AsyncSession, order_id: int) -> Optional[PurchaseOrder]:
+    result = await db.execute(
+        select(PurchaseOrder)
+        .options(selectinload(PurchaseOrder.items))
+        .filter(PurchaseOrder.id == order_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+async def get_purchase_order_by_number(
+    db: AsyncSession, order_number: str
+) -> Optional[PurchaseOrder]:
+    result = await db.execute(
+        select(PurchaseOrder)
+        .options(selectinload(PurchaseOrder.items))
+        .filter(PurchaseOrder.order_number == order_number)
+    )
+    return result.scalars().first()
+
+async def get_purchase_orders(
+    db: AsyncSession, skip: int = 0, limit: int = 100,
+    cursor: Optional[str] = None, sort: Optional[str] = None
+) -> Page:
+    return await paginate_async(
+        db,
+        select(PurchaseOrder).options(selectinload(PurchaseOrder.items)),
+        PurchaseOrder.id, PURCHASE_ORDER_SORT_FIELDS,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
+
+async def create_purchase_order(
+    db: AsyncSession, order: PurchaseOrderCreate, user_id: int
+) -> PurchaseOrder:
+    order_items, total_amount = await db.run_sync(_build_purchase_order_items, order.items)
+
+    db_order = PurchaseOrder(
+        **order.dict(exclude={'items', 'order_number'}),
+        order_number=await db.run_sync(
+            numbering.document_number, "purchase_order", order.order_number
+        ),
+        total_amount=total_amount,
+        created_by=user_id
+    )
+    # Flushed for the order ID
+    await db.run_sync(
+        numbering.add_numbered, db_order, PurchaseOrder.order_number, "purchase_order",
+        order.order_number is not None,
+    )
+
+    await db.run_sync(_insert_purchase_order_items, db_order.id, order_items)
+
+    await db.commit()
+    return await get_purchase_order(db, db_order.id)
+
+async def update_purchase_order(
+    db: AsyncSession, order_id: int, order: PurchaseOrderUpdate, user_id: int
+) -> Optional[PurchaseOrder]:
+    db_order = await get_purchase_order(db, order_id)
+    if not db_order:
+        return None
+
+    update_data = order.dict(exclude={'items'}, exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(db_order, field, value)
+
+    if order.items:
+        order_items, _ = await db.run_sync(_build_purchase_order_items, order.items)
+        await db.run_sync(check_line_changes, order_id, db_order.items, order_items)
+        # Only changed, removed and new lines are written
+        db_order.total_amount += await db.run_sync(
+            sync_line_items, PurchaseOrderItem, {"order_id": order_id}, db_order.items,
+            order_items, "product_id",
+        )
+        db.expire(db_order, ["items"])
+        status = await db.run_sync(order_status, order_id)
+        if status is not None:
+            db_order.status = status
+
+    db.add(db_order)
+    await db.commit()
+    return await get_purchase_order(db, order_id)
+
+# Purchase Receipt services
+async def get_purchase_receipt(
+    db: AsyncSession, receipt_id: int
+) -> Optional[PurchaseReceipt]:
+    result = await db.execute(
+        select(PurchaseReceipt)
+        .options(selectinload(PurchaseReceipt.items))
+        .filter(PurchaseReceipt.id == receipt_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+async def get_purchase_receipt_by_number(
+    db: AsyncSession, receipt_number: str
+) -> Optional[PurchaseReceipt]:
+    result = await db.execute(
+        select(PurchaseReceipt)
+        .options(selectinload(PurchaseReceipt.items))
+        .filter(PurchaseReceipt.receipt_number == receipt_number)
+    )
+    return result.scalars().first()
+
+async def create_purchase_receipt(
+    db: AsyncSession, receipt: PurchaseReceiptCreate, user_id: int
+) -> PurchaseReceipt:
+    order = await db.get(PurchaseOrder, receipt.order_id)
+    if not order:
+        raise ValueError(f"Purchase order {receipt.order_id} not found")
+    if order.status not in RECEIVABLE_ORDER_STATUSES:
+        raise ValueError("Purchase order must be confirmed before creating receipt")
+
+    quantities = _receipt_quantities(receipt.items)
+    if receipt.status != ReceiptStatus.RECEIVED:
+        # A received receipt is checked under lock when it is posted
+        await db.run_sync(check_outstanding, order.id, quantities)
+    receipt_items = _build_purchase_receipt_items(receipt.items)
+
+    db_receipt = PurchaseReceipt(
+        **receipt.dict(exclude={'items', 'receipt_number'}),
+        receipt_number=await db.run_sync(
+            numbering.document_number, "purchase_receipt", receipt.receipt_number
+        ),
+        total_amount=sum(item["total_amount"] for item in receipt_items),
+        created_by=user_id
+    )
+    # Flushed for the receipt ID
+    await db.run_sync(
+        numbering.add_numbered, db_receipt, PurchaseReceipt.receipt_number,
+        "purchase_receipt", receipt.receipt_number is not None,
+    )
+
+    await db.run_sync(_insert_purchase_receipt_items, db_receipt.id, receipt_items)
+
+    if receipt.status == ReceiptStatus.RECEIVED:
+        await db.run_sync(post_receipt, order, db_receipt, quantities, user_id)
+
+    await db.commit()
+    return await get_purchase_receipt(db, db_receipt.id)
+
+async def update_purchase_receipt(
+    db: AsyncSession, receipt_id: int, receipt: PurchaseReceiptUpdate,
+    user_id: Optional[int] = None
+) -> Optional[PurchaseReceipt]:
+    db_receipt = await get_purchase_receipt(db, receipt_id)
+    if not db_receipt:
+        return None
+
+    update_data = receipt.dict(exclude={'items'}, exclude_unset=True)
+    posting = _check_receipt_update(db_receipt, update_data, receipt.items)
+    for field, value in update_data.items():
+        setattr(db_receipt, field, value)
+
+    if receipt.items:
+        quantities = _receipt_quantities(receipt.items)
+        if not posting:
+            await db.run_sync(check_outstanding, db_receipt.order_id, quantities)
+        receipt_items = _build_purchase_receipt_items(receipt.items)
+        # Only changed, removed and new lines are written
+        db_receipt.total_amount += await db.run_sync(
+            sync_line_items, PurchaseReceiptItem, {"receipt_id": receipt_id},
+            db_receipt.items, receipt_items, "order_item_id",
+        )
+        db.expire(db_receipt, ["items"])
+
+    if posting:
+        order = await db.get(PurchaseOrder, db_receipt.order_id)
+        if order.status not in RECEIVABLE_ORDER_STATUSES:
+            raise ValueError("Purchase order must be confirmed before receiving")
+        quantities = await db.run_sync(stored_receipt_quantities, receipt_id)
+        await db.run_sync(
+            post_receipt, order, db_receipt, quantities, user_id or db_receipt.created_by
+        )
+
+    db.add(db_receipt)
+    await db.commit()
+    return await get_purchase_receipt(db, receipt_id)
@@ -0,0 +1,110 @@
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import and_, case, func, insert, literal, select, update
+from sqlalchemy.orm import Session, selectinload
+from app.models.reporting import AgingSnapshot, AgingSnapshotLine
+from app.models.sales import Invoice, Order, PaymentStatus
+
+# Invoices that can still carry a balance
+OPEN_PAYMENT_STATUSES = (PaymentStatus.PENDING, PaymentStatus.PARTIAL, PaymentStatus.OVERDUE)
+AGING_COLUMNS = (
+    "current", "days_1_30", "days_31_60", "days_61_90", "days_over_90", "total", "invoices"
+)
+
+OUTSTANDING = Invoice.total_amount - Invoice.amount_paid
+
+def _day_start(as_of: date) -> datetime:
+    return datetime.combine(as_of, time.min)
+
+def aging_statement(as_of: date) -> Any:
+    """
+    One pass over open invoices: outstanding balance per customer, pivoted
+    into buckets by days past due_date as of ``as_of``.
+    """
+    day = _day_start(as_of)
+    bounds = [day, day - timedelta(days=30), day - timedelta(days=60), day - timedelta(days=90)]
+    conditions = [
+        Invoice.due_date >= bounds[0],
+        and_(Invoice.due_date < bounds[0], Invoice.due_date >= bounds[1]),
+        and_(Invoice.due_date < bounds[1], Invoice.due_date >= bounds[2]),
+        and_(Invoice.due_date < bounds[2], Invoice.due_date >= bounds[3]),
+        Invoice.due_date < bounds[3],
+    ]
+    return (
+        select(
+            Order.customer_id,
+            *(
+                func.sum(case((condition, OUTSTANDING), else_=0)).label(name)
+                for condition, name in zip(conditions, AGING_COLUMNS)
+            ),
+            func.sum(OUTSTANDING).label("total"),
+            func.count(Invoice.id).label("invoices"),
+        )
+        .join(Order, Order.id == Invoice.order_id)
+        .where(
+            Invoice.payment_status.in_(OPEN_PAYMENT_STATUSES),
+            Invoice.invoice_date < day + timedelta(days=1),
+            OUTSTANDING > 0.005,
+        )
+        .group_by(Order.customer_id)
+    )
+
+def get_aging(db: Session, as_of: date) -> List[Dict]:
+    return [
+        dict(row._mapping)
+        for row in db.execute(aging_statement(as_of).order_by(Order.customer_id))
+    ]
+
+def create_aging_snapshot(
+    db: Session, as_of: date, user_id: Optional[int] = None
+) -> AgingSnapshot:
+    snapshot = AgingSnapshot(as_of=as_of, created_by=user_id)
+    db.add(snapshot)
+    db.flush()
+
+    aging = aging_statement(as_of).subquery()
+    db.execute(
+        insert(AgingSnapshotLine).from_select(
+            ["snapshot_id", "customer_id", *AGING_COLUMNS],
+            select(
+                literal(snapshot.id), aging.c.customer_id,
+                *(aging.c[name] for name in AGING_COLUMNS),
+            ),
+        )
+    )
+    db.commit()
+    return get_aging_snapshot(db, snapshot.id)
+
+def get_aging_snapshot(db: Session, snapshot_id: int) -> Optional[AgingSnapshot]:
+    return (
+        db.query(AgingSnapshot)
+        .options(selectinload(AgingSnapshot.lines))
+        .filter(AgingSnapshot.id == snapshot_id)
+        .first()
+    )
+
+def get_latest_aging_snapshot(db: Session) -> Optional[AgingSnapshot]:
+    return (
+        db.query(AgingSnapshot)
+        .options(selectinload(AgingSnapshot.lines))
+        .order_by(AgingSnapshot.as_of.desc(), AgingSnapshot.id.desc())
+        .first()
+    )
+
+def mark_overdue_invoices(db: Session, as_of: date) -> int:
+    """
+    Flag every unpaid invoice due before ``as_of`` as OVERDUE in a single
+    UPDATE; returns the number of invoices flipped.
+    """
+    updated = db.execute(
+        update(Invoice)
+        .where(
+            Invoice.payment_status.in_((PaymentStatus.PENDING, PaymentStatus.PARTIAL)),
+            Invoice.due_date < _day_start(as_of),
+            OUTSTANDING > 0.005,
+        )
+        .values(payment_status=PaymentStatus.OVERDUE)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return updated
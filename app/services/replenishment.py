@@ -0,0 +1,221 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.inventory import Product, StockAvailability
+from app.models.purchase import PurchaseOrder, PurchaseOrderItem, PurchaseOrderStatus
+from app.models.reporting import SalesDailyProduct
+from app.schemas.purchase import PurchaseOrderCreate, PurchaseOrderItemCreate
+from app.services import purchase
+
+# Purchase orders in these statuses still have stock on its way
+OPEN_PURCHASE_ORDER_STATUSES = (
+    PurchaseOrderStatus.DRAFT, PurchaseOrderStatus.SENT, PurchaseOrderStatus.CONFIRMED,
+    PurchaseOrderStatus.PARTIALLY_RECEIVED,
+)
+
+def _matrix(rows: Sequence) -> np.ndarray:
+    # Plain tuples: NumPy probes Row objects for the array protocols key by
+    # key, which costs more than the whole forecast on a large catalog
+    return np.array([tuple(row) for row in rows], dtype=np.float64)
+
+def _align(product_ids: np.ndarray, rows: Sequence, columns: int) -> np.ndarray:
+    """
+    Scatter per-product aggregate rows (product_id, value, ...) onto the
+    sorted ``product_ids``; products without a row get zeros.
+    """
+    out = np.zeros((columns, len(product_ids)))
+    if not rows:
+        return out
+    data = _matrix(rows).reshape(len(rows), columns + 1)
+    keys = data[:, 0].astype(np.int64)
+    at = np.searchsorted(product_ids, keys)
+    found = at < len(product_ids)
+    found[found] = product_ids[at[found]] == keys[found]
+    out[:, at[found]] = data[found, 1:].T
+    return out
+
+def _on_order(db: Session) -> List:
+    outstanding = PurchaseOrderItem.quantity - PurchaseOrderItem.received_quantity
+    return db.execute(
+        select(PurchaseOrderItem.product_id, func.sum(outstanding))
+        .join(PurchaseOrder, PurchaseOrder.id == PurchaseOrderItem.order_id)
+        .where(
+            PurchaseOrder.status.in_(OPEN_PURCHASE_ORDER_STATUSES),
+            outstanding > 0,
+        )
+        .group_by(PurchaseOrderItem.product_id)
+    ).all()
+
+def _sales(db: Session, today: date) -> List:
+    since = today - timedelta(days=settings.REPLENISHMENT_HISTORY_DAYS)
+    recent = today - timedelta(days=settings.REPLENISHMENT_RECENT_DAYS)
+    quantity = SalesDailyProduct.quantity
+    return db.execute(
+        select(
+            SalesDailyProduct.product_id,
+            func.sum(quantity),
+            func.sum(quantity * quantity),
+            # No sales in the recent window sums to NULL; NumPy would
+            # carry it as NaN and drop the product from the plan
+            func.coalesce(func.sum(quantity).filter(SalesDailyProduct.day >= recent), 0),
+        )
+        .where(SalesDailyProduct.day >= since, SalesDailyProduct.day < today)
+        .group_by(SalesDailyProduct.product_id)
+    ).all()
+
+def _last_purchases(db: Session) -> List:
+    # Supplier and price of each product's most recent purchase order line
+    latest = (
+        select(func.max(PurchaseOrderItem.id).label("id"))
+        .group_by(PurchaseOrderItem.product_id)
+        .subquery()
+    )
+    return db.execute(
+        select(
+            PurchaseOrderItem.product_id, PurchaseOrder.supplier_id,
+            PurchaseOrderItem.unit_price,
+        )
+        .join(latest, latest.c.id == PurchaseOrderItem.id)
+        .join(PurchaseOrder, PurchaseOrder.id == PurchaseOrderItem.order_id)
+    ).all()
+
+def supplier_lead_times(db: Session, today: date) -> Dict[int, float]:
+    """
+    Mean days from order to expected delivery over each supplier's
+    purchase orders in the history window.
+    """
+    since = datetime.combine(
+        today - timedelta(days=settings.REPLENISHMENT_HISTORY_DAYS), datetime.min.time()
+    )
+    rows = db.execute(
+        select(PurchaseOrder.supplier_id, PurchaseOrder.order_date, PurchaseOrder.expected_date)
+        .where(
+            PurchaseOrder.order_date >= since,
+            PurchaseOrder.expected_date.is_not(None),
+            PurchaseOrder.status != PurchaseOrderStatus.CANCELLED,
+        )
+    ).all()
+    if not rows:
+        return {}
+    suppliers = np.array([row[0] for row in rows], dtype=np.int64)
+    days = np.array(
+        [(row[2].replace(tzinfo=None) - row[1].replace(tzinfo=None)).total_seconds() for row in rows]
+    ) / 86400
+    ids, index = np.unique(suppliers, return_inverse=True)
+    means = np.bincount(index, weights=np.clip(days, 0, None)) / np.bincount(index)
+    return dict(zip(ids.tolist(), means.tolist()))
+
+def plan_replenishment(db: Session, today: Optional[date] = None) -> List[Dict]:
+    """
+    Suggested purchase quantities for active products whose stock
+    position (on hand plus still on order) is below the reorder point.
+
+    Each input is one aggregate query over the whole catalog; the
+    forecast is computed column-wise with NumPy:
+
+    - daily demand: moving averages over the history window and the recent
+      window, blended by REPLENISHMENT_RECENT_WEIGHT
+    - safety stock: REPLENISHMENT_SAFETY_FACTOR x daily demand deviation
+      x sqrt(lead time)
+    - reorder point: demand over the lead time plus safety stock, and
+      never below min_stock_level
+    - order quantity: up to the reorder point plus REPLENISHMENT_REVIEW_DAYS
+      of demand
+    """
+    today = today or datetime.now(timezone.utc).date()
+    products = db.execute(
+        select(Product.id, Product.min_stock_level, Product.cost_price)
+        .where(Product.is_active.is_(True))
+        .order_by(Product.id)
+    ).all()
+    if not products:
+        return []
+    catalog = _matrix(products)
+    product_ids = catalog[:, 0].astype(np.int64)
+    min_level, cost_price = catalog[:, 1], catalog[:, 2]
+
+    (on_hand,) = _align(
+        product_ids,
+        db.execute(select(StockAvailability.product_id, StockAvailability.quantity)).all(),
+        1,
+    )
+    (on_order,) = _align(product_ids, _on_order(db), 1)
+    sold, sold_squared, sold_recent = _align(product_ids, _sales(db, today), 3)
+    supplier, unit_price = _align(product_ids, _last_purchases(db), 2)
+
+    history_days = settings.REPLENISHMENT_HISTORY_DAYS
+    recent_days = min(settings.REPLENISHMENT_RECENT_DAYS, history_days)
+    weight = settings.REPLENISHMENT_RECENT_WEIGHT
+    mean = sold / history_days
+    demand = weight * (sold_recent / recent_days) + (1 - weight) * mean
+    deviation = np.sqrt(np.maximum(sold_squared / history_days - mean * mean, 0))
+
+    lead_times = supplier_lead_times(db, today)
+    default_lead = float(settings.REPLENISHMENT_DEFAULT_LEAD_TIME_DAYS)
+    supplier_ids = supplier.astype(np.int64)
+    lead = np.full(len(product_ids), default_lead)
+    if lead_times:
+        known = np.array(sorted(lead_times), dtype=np.int64)
+        days = np.array([lead_times[id] for id in known.tolist()])
+        at = np.minimum(np.searchsorted(known, supplier_ids), len(known) - 1)
+        found = known[at] == supplier_ids
+        lead[found] = days[at[found]]
+
+    safety = settings.REPLENISHMENT_SAFETY_FACTOR * deviation * np.sqrt(lead)
+    reorder_point = np.maximum(demand * lead + safety, min_level)
+    target = reorder_point + demand * settings.REPLENISHMENT_REVIEW_DAYS
+    position = on_hand + on_order
+    quantity = np.where(position < reorder_point, np.ceil(target - position), 0)
+    price = np.where(unit_price > 0, unit_price, cost_price)
+
+    suggestions = []
+    for i in np.flatnonzero(quantity > 0).tolist():
+        suggestions.append({
+            "product_id": int(product_ids[i]),
+            "supplier_id": int(supplier_ids[i]) or None,
+            "on_hand": int(on_hand[i]),
+            "on_order": int(on_order[i]),
+            "daily_demand": round(float(demand[i]), 4),
+            "safety_stock": round(float(safety[i]), 2),
+            "reorder_point": round(float(reorder_point[i]), 2),
+            "lead_time_days": round(float(lead[i]), 1),
+            "quantity": int(quantity[i]),
+            "unit_price": float(price[i]),
+        })
+    return suggestions
+
+def create_draft_orders(
+    db: Session, suggestions: Sequence[Dict], user_id: int
+) -> List[PurchaseOrder]:
+    """
+    One draft purchase order per supplier from planner suggestions.
+    Suggestions without a known supplier are left for the buyer.
+    """
+    by_supplier: Dict[int, List[Dict]] = defaultdict(list)
+    for suggestion in suggestions:
+        if suggestion["supplier_id"] is not None:
+            by_supplier[suggestion["supplier_id"]].append(suggestion)
+    now = datetime.now(timezone.utc)
+    orders = []
+    for supplier_id, lines in sorted(by_supplier.items()):
+        lead_time = max(line["lead_time_days"] for line in lines)
+        order = PurchaseOrderCreate(
+            supplier_id=supplier_id,
+            expected_date=now + timedelta(days=lead_time),
+            status=PurchaseOrderStatus.DRAFT,
+            notes="Suggested by the replenishment planner",
+            items=[
+                PurchaseOrderItemCreate(
+                    product_id=line["product_id"],
+                    quantity=line["quantity"],
+                    unit_price=line["unit_price"],
+                )
+                for line in lines
+            ],
+        )
+        orders.append(purchase.create_purchase_order(db, order, user_id))
+    return orders
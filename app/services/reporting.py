@@ -0,0 +1,233 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import Date, delete, func, insert, select, type_coerce, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.db.session import SessionLocal
+from app.models.inventory import Product
+from app.models.reporting import SalesDailyCategory, SalesDailyCustomer, SalesDailyProduct
+from app.models.sales import Order, OrderItem, OrderStatus
+from app.schemas.sales import SalesReportDimension
+
+# Orders in these statuses count towards the rollups
+COUNTED_ORDER_STATUSES = (OrderStatus.CONFIRMED, OrderStatus.SHIPPED, OrderStatus.DELIVERED)
+
+# Rollup model -> (key column, source column)
+#
+# The category rollup records each line under the product's current
+# category; move_product_category recounts it when a product moves.
+ROLLUPS = {
+    SalesDailyProduct: ("product_id", OrderItem.product_id),
+    SalesDailyCustomer: ("customer_id", Order.customer_id),
+    SalesDailyCategory: ("category_id", Product.category_id),
+}
+MEASURES = ("revenue", "quantity", "discount", "orders")
+
+ORDER_DAY = type_coerce(func.date(Order.order_date), Date)
+LINE_DISCOUNT = OrderItem.quantity * OrderItem.unit_price * OrderItem.discount
+
+# {rollup model: {(day, key): [revenue, quantity, discount, orders]}}
+Contribution = Dict[Any, Dict[Tuple[date, int], List[float]]]
+
+def _counted_lines() -> Any:
+    return (
+        select(
+            ORDER_DAY.label("day"), Order.customer_id, OrderItem.product_id,
+            Product.category_id, OrderItem.quantity, OrderItem.total_amount,
+            LINE_DISCOUNT.label("discount"),
+        )
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .join(Product, Product.id == OrderItem.product_id)
+        .where(Order.status.in_(COUNTED_ORDER_STATUSES))
+    )
+
+def order_contribution(db: Session, order_id: int) -> Contribution:
+    """
+    What one order currently adds to each rollup; empty unless counted.
+    Pending changes must be flushed first.
+    """
+    contribution: Contribution = {model: {} for model in ROLLUPS}
+    for line in db.execute(_counted_lines().where(Order.id == order_id)):
+        for model, (key, _) in ROLLUPS.items():
+            totals = contribution[model].setdefault(
+                (line.day, getattr(line, key)), [0.0, 0, 0.0, 1]
+            )
+            totals[0] += line.total_amount
+            totals[1] += line.quantity
+            totals[2] += line.discount
+    return contribution
+
+def _increment(db: Session, model: Any, key: str, rows: List[Dict]) -> None:
+    dialect_insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(
+        db.get_bind().dialect.name
+    )
+    if dialect_insert is not None:
+        stmt = dialect_insert(model)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["day", key],
+                set_={m: getattr(model, m) + stmt.excluded[m] for m in MEASURES},
+            ),
+            rows,
+        )
+        return
+    for row in rows:
+        updated = db.execute(
+            update(model)
+            .where(model.day == row["day"], getattr(model, key) == row[key])
+            .values({m: getattr(model, m) + row[m] for m in MEASURES})
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not updated:
+            db.execute(insert(model), [row])
+
+def apply_order_change(
+    db: Session, order_id: int, before: Optional[Contribution] = None
+) -> None:
+    """
+    Move the rollups from the order's ``before`` contribution to its current
+    one, inside the caller's transaction so they commit together.
+    """
+    after = order_contribution(db, order_id)
+    for model, (key, _) in ROLLUPS.items():
+        deltas = {k: list(v) for k, v in after[model].items()}
+        for k, old in (before or {}).get(model, {}).items():
+            new = deltas.setdefault(k, [0.0, 0, 0.0, 0])
+            for i, value in enumerate(old):
+                new[i] -= value
+        rows = [
+            {"day": day, key: key_id, **dict(zip(MEASURES, totals))}
+            for (day, key_id), totals in deltas.items()
+            if any(totals)
+        ]
+        if rows:
+            _increment(db, model, key, rows)
+
+# Reports
+def sales_report(
+    db: Session,
+    dimension: SalesReportDimension,
+    date_from: date,
+    date_to: date,
+    limit: int = 100,
+) -> List[Dict]:
+    """Totals per ``dimension`` from the daily rollups."""
+    if dimension == SalesReportDimension.DAY:
+        model, group = SalesDailyCustomer, SalesDailyCustomer.day
+    else:
+        model = {
+            SalesReportDimension.PRODUCT: SalesDailyProduct,
+            SalesReportDimension.CUSTOMER: SalesDailyCustomer,
+            SalesReportDimension.CATEGORY: SalesDailyCategory,
+        }[dimension]
+        group = getattr(model, ROLLUPS[model][0])
+    revenue = func.sum(model.revenue)
+    stmt = (
+        select(
+            group.label("key"), revenue.label("revenue"),
+            func.sum(model.quantity).label("quantity"),
+            func.sum(model.discount).label("discount"),
+            func.sum(model.orders).label("orders"),
+        )
+        .where(model.day >= date_from, model.day <= date_to)
+        .group_by(group)
+        .having(func.sum(model.orders) > 0)
+        .order_by(group if dimension == SalesReportDimension.DAY else revenue.desc())
+        .limit(limit)
+    )
+    return [dict(row._mapping) for row in db.execute(stmt)]
+
+# Rebuild
+def order_day_range(db: Session) -> Optional[Tuple[date, date]]:
+    first, last = db.execute(select(func.min(ORDER_DAY), func.max(ORDER_DAY))).one()
+    return (first, last) if first is not None else None
+
+def _rollup_totals(source: Any, day_from: date, day_to: date, *criteria: Any) -> Any:
+    start = datetime.combine(day_from, time.min)
+    end = datetime.combine(day_to + timedelta(days=1), time.min)
+    return (
+        select(
+            ORDER_DAY, source, func.sum(OrderItem.total_amount),
+            func.sum(OrderItem.quantity), func.sum(LINE_DISCOUNT),
+            func.count(Order.id.distinct()),
+        )
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .join(Product, Product.id == OrderItem.product_id)
+        .where(
+            Order.status.in_(COUNTED_ORDER_STATUSES),
+            Order.order_date >= start,
+            Order.order_date < end,
+            *criteria,
+        )
+        .group_by(ORDER_DAY, source)
+    )
+
+def move_product_category(db: Session, product_id: int, old_category_id: int) -> None:
+    """
+    Recount the category rollup after ``product_id`` moved out of
+    ``old_category_id``: the old and new categories are recomputed for the
+    days the product has sales, inside the caller's transaction so the
+    move commits with the product. Pending changes must be flushed first.
+    """
+    days = db.execute(
+        select(SalesDailyProduct.day)
+        .where(SalesDailyProduct.product_id == product_id, SalesDailyProduct.orders > 0)
+    ).scalars().all()
+    if not days:
+        return
+    new_category_id = db.execute(
+        select(Product.category_id).where(Product.id == product_id)
+    ).scalar_one()
+    categories = (old_category_id, new_category_id)
+    db.execute(
+        delete(SalesDailyCategory)
+        .where(SalesDailyCategory.day.in_(days), SalesDailyCategory.category_id.in_(categories))
+    )
+    # Distinct-order counts cannot be split per product, so the two
+    # categories are recounted from the orders for just those days
+    db.execute(insert(SalesDailyCategory).from_select(
+        ["day", "category_id", *MEASURES],
+        _rollup_totals(
+            Product.category_id, min(days), max(days),
+            ORDER_DAY.in_(days), Product.category_id.in_(categories),
+        ),
+    ))
+
+def rebuild_rollups(db: Session, day_from: date, day_to: date) -> None:
+    """
+    Recompute all rollups for ``day_from``..``day_to`` (inclusive) from the
+    orders, replacing what is stored.
+    """
+    for model, (key, source) in ROLLUPS.items():
+        db.execute(delete(model).where(model.day >= day_from, model.day <= day_to))
+        db.execute(insert(model).from_select(
+            ["day", key, *MEASURES], _rollup_totals(source, day_from, day_to)
+        ))
+    db.commit()
+
+def _rebuild_chunk(day_from: date, day_to: date) -> None:
+    db = SessionLocal()
+    try:
+        rebuild_rollups(db, day_from, day_to)
+    finally:
+        db.close()
+
+def rebuild_rollups_parallel(
+    day_from: date, day_to: date, chunk_days: int = 31, workers: int = 4
+) -> int:
+    """
+    Rebuild ``day_from``..``day_to`` in chunks of ``chunk_days``, each on its
+    own session and transaction, ``workers`` at a time. Returns the number
+    of chunks.
+    """
+    chunks = []
+    lower = day_from
+    while lower <= day_to:
+        upper = min(lower + timedelta(days=chunk_days - 1), day_to)
+        chunks.append((lower, upper))
+        lower = upper + timedelta(days=1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # list() re-raises the first failed chunk
+        list(executor.map(lambda chunk: _rebuild_chunk(*chunk), chunks))
+    return len(chunks)
@@ -1,7 +1,13 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from app.models.sales import Customer, Order, OrderItem, Invoice, Payment
-from app.models.inventory import Product
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import case, func, insert, literal, select, update
+from sqlalchemy.orm import Session, selectinload
+from app.db.pagination import Page, paginate
+from app.models.sales import (
+    Customer, Order, OrderItem, Invoice, Payment, OrderStatus, PaymentStatus
+)
+from app.services import credit, numbering, reporting
+from app.services.inventory import validate_products
+from app.services.lines import sync_line_items
 from app.schemas.sales import (
     CustomerCreate, CustomerUpdate,
     OrderCreate, OrderUpdate,
@@ -11,6 +17,21 @@ from app.schemas.sales import (
 )
 from datetime import datetime, timedelta
 
+# Keyset sort fields; each is backed by a (field, id) index
+CUSTOMER_SORT_FIELDS = {"id": Customer.id, "name": Customer.name}
+ORDER_SORT_FIELDS = {
+    "id": Order.id,
+    "order_date": Order.order_date,
+    "created_at": Order.created_at,
+    "order_number": Order.order_number,
+}
+PAYMENT_SORT_FIELDS = {"id": Payment.id, "payment_date": Payment.payment_date}
+
+# Relationship loading per endpoint: selectin for collections, joined for
+# to-one. Only relationships the response schema serializes are loaded.
+ORDER_LIST_LOADERS = (selectinload(Order.items),)
+ORDER_DETAIL_LOADERS = (selectinload(Order.items),)
+
 # Customer services
 def get_customer(db: Session, customer_id: int) -> Optional[Customer]:
     return db.query(Customer).filter(Customer.id == customer_id).first()
@@ -19,9 +40,13 @@ def get_customer_by_email(db: Session, email: str) -> Optional[Customer]:
     return db.query(Customer).filter(Customer.email == email).first()
 
 def get_customers(
-    db: Session, skip: int = 0, limit: int = 100
-) -> List[Customer]:
-    return db.query(Customer).offset(skip).limit(limit).all()
+    db: Session, skip: int = 0, limit: int = 100,
+    cursor: Optional[str] = None, sort: Optional[str] = None
+) -> Page:
+    return paginate(
+        db.query(Customer), Customer.id, CUSTOMER_SORT_FIELDS,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
 
 def create_customer(db: Session, customer: CustomerCreate) -> Customer:
     db_customer = Customer(**customer.dict())
@@ -48,48 +73,67 @@ def update_customer(
 
 # Order services
 def get_order(db: Session, order_id: int) -> Optional[Order]:
-    return db.query(Order).filter(Order.id == order_id).first()
+    return (
+        db.query(Order)
+        .options(*ORDER_DETAIL_LOADERS)
+        .filter(Order.id == order_id)
+        .first()
+    )
 
 def get_order_by_number(db: Session, order_number: str) -> Optional[Order]:
-    return db.query(Order).filter(Order.order_number == order_number).first()
+    return (
+        db.query(Order)
+        .options(*ORDER_DETAIL_LOADERS)
+        .filter(Order.order_number == order_number)
+        .first()
+    )
 
 def get_orders(
-    db: Session, skip: int = 0, limit: int = 100
-) -> List[Order]:
-    return db.query(Order).offset(skip).limit(limit).all()
+    db: Session, skip: int = 0, limit: int = 100,
+    cursor: Optional[str] = None, sort: Optional[str] = None
+) -> Page:
+    return paginate(
+        db.query(Order).options(*ORDER_LIST_LOADERS), Order.id, ORDER_SORT_FIELDS,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
+
+def _build_order_items(
+    db: Session, items: Sequence[OrderItemCreate]
+) -> Tuple[List[Dict], float]:
+    validate_products(db, (item.product_id for item in items))
 
-def create_order(db: Session, order: OrderCreate, user_id: int) -> Order:
-    # Calculate total amount
     total_amount = 0
-    order_items = []
-    
-    for item in order.items:
-        product = db.query(Product).filter(Product.id == item.product_id).first()
-        if not product:
-            raise ValueError(f"Product {item.product_id} not found")
-        
+    rows = []
+    for item in items:
         item_total = (item.quantity * item.unit_price) * (1 - item.discount)
         total_amount += item_total
-        
-        order_item = OrderItem(
-            **item.dict(),
-            total_amount=item_total
-        )
-        order_items.append(order_item)
+        rows.append({**item.dict(), "total_amount": item_total})
+    return rows, total_amount
+
+def _insert_order_items(db: Session, order_id: int, rows: List[Dict]) -> None:
+    # Single executemany (multi-row VALUES where the driver supports it)
+    if rows:
+        db.execute(insert(OrderItem), [{**row, "order_id": order_id} for row in rows])
+
+def create_order(db: Session, order: OrderCreate, user_id: int) -> Order:
+    order_items, total_amount = _build_order_items(db, order.items)
     
     # Create order
     db_order = Order(
-        **order.dict(exclude={'items'}),
+        **order.dict(exclude={'items', 'order_number'}),
+        order_number=numbering.document_number(db, "order", order.order_number),
         total_amount=total_amount,
         created_by=user_id
     )
-    db.add(db_order)
-    db.flush()  # Get order ID
+    credit.apply_order_exposure(db, db_order)
+    # Flushed for the order ID
+    numbering.add_numbered(
+        db, db_order, Order.order_number, "order", order.order_number is not None
+    )
     
-    # Add order items
-    for item in order_items:
-        item.order_id = db_order.id
-        db.add(item)
+    _insert_order_items(db, db_order.id, order_items)
+    if db_order.status in reporting.COUNTED_ORDER_STATUSES:
+        reporting.apply_order_change(db, db_order.id)
     
     db.commit()
     db.refresh(db_order)
@@ -101,6 +145,9 @@ def update_order(
     db_order = get_order(db, order_id)
     if not db_order:
         return None
+    counted = db_order.status in reporting.COUNTED_ORDER_STATUSES
+    before = reporting.order_contribution(db, order_id) if counted else None
+    exposure_before = credit.order_exposure(db, db_order)
     
     # Update order fields
     update_data = order.dict(exclude={'items'}, exclude_unset=True)
@@ -109,29 +156,20 @@ def update_order(
     
     # Update items if provided
     if order.items:
-        # Delete existing items
-        db.query(OrderItem).filter(OrderItem.order_id == order_id).delete()
+        order_items, _ = _build_order_items(db, order.items)
         
-        # Calculate new total
-        total_amount = 0
-        for item in order.items:
-            product = db.query(Product).filter(Product.id == item.product_id).first()
-            if not product:
-                raise ValueError(f"Product {item.product_id} not found")
-            
-            item_total = (item.quantity * item.unit_price) * (1 - item.discount)
-            total_amount += item_total
-            
-            order_item = OrderItem(
-                **item.dict(),
-                order_id=order_id,
-                total_amount=item_total
-            )
-            db.add(order_item)
-        
-        db_order.total_amount = total_amount
+        # Only changed, removed and new lines are written
+        db_order.total_amount += sync_line_items(
+            db, OrderItem, {"order_id": order_id}, db_order.items, order_items,
+            key="product_id",
+        )
+        db.expire(db_order, ["items"])
     
+    credit.apply_order_exposure(db, db_order, exposure_before)
     db.add(db_order)
+    if counted or db_order.status in reporting.COUNTED_ORDER_STATUSES:
+        db.flush()
+        reporting.apply_order_change(db, order_id, before)
     db.commit()
     db.refresh(db_order)
     return db_order
@@ -151,8 +189,19 @@ def create_invoice(db: Session, invoice: InvoiceCreate, user_id: int) -> Invoice
     if order.status != OrderStatus.CONFIRMED:
         raise ValueError("Order must be confirmed before creating invoice")
     
-    db_invoice = Invoice(**invoice.dict(), created_by=user_id)
-    db.add(db_invoice)
+    db_invoice = Invoice(
+        **invoice.dict(exclude={'invoice_number'}),
+        invoice_number=numbering.document_number(db, "invoice", invoice.invoice_number),
+        created_by=user_id
+    )
+    # The invoice balance takes over from the open order
+    credit.add_exposure(
+        db, order.customer_id,
+        credit.invoice_outstanding(db_invoice) - credit.order_exposure(db, order)[1],
+    )
+    numbering.add_numbered(
+        db, db_invoice, Invoice.invoice_number, "invoice", invoice.invoice_number is not None
+    )
     db.commit()
     db.refresh(db_invoice)
     return db_invoice
@@ -163,45 +212,109 @@ def update_invoice(
     db_invoice = get_invoice(db, invoice_id)
     if not db_invoice:
         return None
+    outstanding_before = credit.invoice_outstanding(db_invoice)
     
     update_data = invoice.dict(exclude_unset=True)
+    if update_data.get("invoice_number", db_invoice.invoice_number) != db_invoice.invoice_number:
+        numbering.document_number(db, "invoice", update_data["invoice_number"])
     for field, value in update_data.items():
         setattr(db_invoice, field, value)
     
+    credit.add_exposure(
+        db, credit.invoice_customer_id(db, db_invoice),
+        credit.invoice_outstanding(db_invoice) - outstanding_before,
+    )
     db.add(db_invoice)
     db.commit()
     db.refresh(db_invoice)
     return db_invoice
 
 # Payment services
+def _status_literal(status: PaymentStatus) -> Any:
+    return literal(status, Invoice.__table__.c.payment_status.type)
+
+def _payment_status(amount_paid: Any, otherwise: Any = None) -> Any:
+    return case(
+        (amount_paid >= Invoice.total_amount, _status_literal(PaymentStatus.PAID)),
+        # A partial payment does not clear an overdue flag
+        (
+            Invoice.payment_status == _status_literal(PaymentStatus.OVERDUE),
+            _status_literal(PaymentStatus.OVERDUE),
+        ),
+        (amount_paid > 0, _status_literal(PaymentStatus.PARTIAL)),
+        else_=Invoice.payment_status if otherwise is None else otherwise,
+    )
+
 def create_payment(db: Session, payment: PaymentCreate, user_id: int) -> Payment:
-    # Verify invoice exists
-    invoice = db.query(Invoice).filter(Invoice.id == payment.invoice_id).first()
-    if not invoice:
+    # Running total and status move together in one UPDATE, so concurrent
+    # payments serialize on the invoice row instead of racing in Python
+    amount_paid = Invoice.amount_paid + payment.amount
+    updated = db.execute(
+        update(Invoice)
+        .where(Invoice.id == payment.invoice_id)
+        .values(amount_paid=amount_paid, payment_status=_payment_status(amount_paid))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not updated:
         raise ValueError(f"Invoice {payment.invoice_id} not found")
+    credit.apply_payment_exposure(db, payment.invoice_id, payment.amount)
     
     # Create payment
     db_payment = Payment(**payment.dict(), created_by=user_id)
     db.add(db_payment)
     
-    # Update invoice payment status
-    total_paid = sum(p.amount for p in invoice.payments) + payment.amount
-    if total_paid >= invoice.total_amount:
-        invoice.payment_status = PaymentStatus.PAID
-    elif total_paid > 0:
-        invoice.payment_status = PaymentStatus.PARTIAL
-    
     db.commit()
     db.refresh(db_payment)
     return db_payment
 
 def get_payments(
-    db: Session, invoice_id: int, skip: int = 0, limit: int = 100
-) -> List[Payment]:
-    return (
-        db.query(Payment)
-        .filter(Payment.invoice_id == invoice_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
-    ) 
\ No newline at end of file
+    db: Session, invoice_id: int, skip: int = 0, limit: int = 100,
+    cursor: Optional[str] = None, sort: Optional[str] = None
+) -> Page:
+    return paginate(
+        db.query(Payment).filter(Payment.invoice_id == invoice_id),
+        Payment.id, PAYMENT_SORT_FIELDS,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
+
+def reconcile_invoice_payments(db: Session, fix: bool = False) -> List[Dict]:
+    """
+    Compare each invoice's running amount_paid with its payment ledger and
+    return the mismatches, optionally correcting them.
+    """
+    ledger = (
+        select(Payment.invoice_id, func.sum(Payment.amount).label("paid"))
+        .group_by(Payment.invoice_id)
+        .subquery()
+    )
+    ledger_paid = func.coalesce(ledger.c.paid, 0)
+    mismatches = [
+        {"invoice_id": invoice_id, "amount_paid": amount_paid, "ledger_paid": paid}
+        for invoice_id, amount_paid, paid in db.execute(
+            select(Invoice.id, Invoice.amount_paid, ledger_paid)
+            .outerjoin(ledger, ledger.c.invoice_id == Invoice.id)
+            .where(func.abs(Invoice.amount_paid - ledger_paid) > 0.005)
+        )
+    ]
+    if fix and mismatches:
+        for chunk_start in range(0, len(mismatches), 1000):
+            ids = [m["invoice_id"] for m in mismatches[chunk_start:chunk_start + 1000]]
+            correct = (
+                select(func.coalesce(func.sum(Payment.amount), 0))
+                .where(Payment.invoice_id == Invoice.id)
+                .scalar_subquery()
+            )
+            db.execute(
+                update(Invoice)
+                .where(Invoice.id.in_(ids))
+                .values(
+                    amount_paid=correct,
+                    payment_status=_payment_status(
+                        correct, _status_literal(PaymentStatus.PENDING)
+                    ),
+                )
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+    return mismatches
+
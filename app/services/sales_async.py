@@ -0,0 +1,237 @@
+from typing import List, Optional
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.db.pagination import Page, paginate_async
+from app.models.sales import (
+    Customer, Order, OrderItem, Invoice, Payment, OrderStatus, PaymentStatus
+)
+from app.schemas.sales import (
+    CustomerCreate, CustomerUpdate,
+    OrderCreate, OrderUpdate,
+    InvoiceCreate, InvoiceUpdate,
+    PaymentCreate
+)
+from app.services import credit, numbering, reporting
+from app.services.sales import (
+    CUSTOMER_SORT_FIELDS, ORDER_SORT_FIELDS, PAYMENT_SORT_FIELDS,
+    _build_order_items, _insert_order_items, _payment_status
+)
+from app.services.lines import sync_line_items
+
+# Customer services
+async def get_customer(db: AsyncSession, customer_id: int) -> Optional[Customer]:
+    return await db.get(Customer, customer_id)
+
+async def get_customer_by_email(db: AsyncSession, email: str) -> Optional[Customer]:
+    result = await db.execute(select(Customer).filter(Customer.email == email))
+    return result.scalars().first()
+
+async def get_customers(
+    db: AsyncSession, skip: int = 0, limit: int = 100,
+    cursor: Optional[str] = None, sort: Optional[str] = None
+) -> Page:
+    return await paginate_async(
+        db, select(Customer), Customer.id, CUSTOMER_SORT_FIELDS,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
+
+async def create_customer(db: AsyncSession, customer: CustomerCreate) -> Customer:
+    db_customer = Customer(**customer.dict())
+    db.add(db_customer)
+    await db.commit()
+    await db.refresh(db_customer)
+    return db_customer
+
+async def update_customer(
+    db: AsyncSession, customer_id: int, customer: CustomerUpdate
+) -> Optional[Customer]:
+    db_customer = await get_customer(db, customer_id)
+    if not db_customer:
+        return None
+
+    update_data = customer.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(db_customer, field, value)
+
+    db.add(db_customer)
+    await db.commit()
+    await db.refresh(db_customer)
+    return db_customer
+
+# Order services
+# Lazy loading is unavailable under asyncio, so items are always eager-loaded
+async def get_order(db: AsyncSession, order_id: int) -> Optional[Order]:
+    result = await db.execute(
+        select(Order)
+        .options(selectinload(Order.items))
+        .filter(Order.id == order_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+async def get_order_by_number(db: AsyncSession, order_number: str) -> Optional[Order]:
+    result = await db.execute(
+        select(Order)
+        .options(selectinload(Order.items))
+        .filter(Order.order_number == order_number)
+    )
+    return result.scalars().first()
+
+async def get_orders(
+    db: AsyncSession, skip: int = 0, limit: int = 100,
+    cursor: Optional[str] = None, sort: Optional[str] = None
+) -> Page:
+    return await paginate_async(
+        db,
+        select(Order).options(selectinload(Order.items)),
+        Order.id, ORDER_SORT_FIELDS,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
+
+async def create_order(db: AsyncSession, order: OrderCreate, user_id: int) -> Order:
+    order_items, total_amount = await db.run_sync(_build_order_items, order.items)
+
+    db_order = Order(
+        **order.dict(exclude={'items', 'order_number'}),
+        order_number=await db.run_sync(numbering.document_number, "order", order.order_number),
+        total_amount=total_amount,
+        created_by=user_id
+    )
+    await db.run_sync(credit.apply_order_exposure, db_order)
+    # Flushed for the order ID
+    await db.run_sync(
+        numbering.add_numbered, db_order, Order.order_number, "order",
+        order.order_number is not None,
+    )
+
+    await db.run_sync(_insert_order_items, db_order.id, order_items)
+    if db_order.status in reporting.COUNTED_ORDER_STATUSES:
+        await db.run_sync(reporting.apply_order_change, db_order.id)
+
+    await db.commit()
+    return await get_order(db, db_order.id)
+
+async def update_order(
+    db: AsyncSession, order_id: int, order: OrderUpdate, user_id: int
+) -> Optional[Order]:
+    db_order = await get_order(db, order_id)
+    if not db_order:
+        return None
+    counted = db_order.status in reporting.COUNTED_ORDER_STATUSES
+    before = await db.run_sync(reporting.order_contribution, order_id) if counted else None
+    exposure_before = await db.run_sync(credit.order_exposure, db_order)
+
+    update_data = order.dict(exclude={'items'}, exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(db_order, field, value)
+
+    if order.items:
+        order_items, _ = await db.run_sync(_build_order_items, order.items)
+        # Only changed, removed and new lines are written
+        db_order.total_amount += await db.run_sync(
+            sync_line_items, OrderItem, {"order_id": order_id}, db_order.items,
+            order_items, "product_id",
+        )
+        db.expire(db_order, ["items"])
+
+    await db.run_sync(credit.apply_order_exposure, db_order, exposure_before)
+    db.add(db_order)
+    if counted or db_order.status in reporting.COUNTED_ORDER_STATUSES:
+        await db.flush()
+        await db.run_sync(reporting.apply_order_change, order_id, before)
+    await db.commit()
+    return await get_order(db, order_id)
+
+# Invoice services
+async def get_invoice(db: AsyncSession, invoice_id: int) -> Optional[Invoice]:
+    return await db.get(Invoice, invoice_id)
+
+async def get_invoice_by_number(db: AsyncSession, invoice_number: str) -> Optional[Invoice]:
+    result = await db.execute(
+        select(Invoice).filter(Invoice.invoice_number == invoice_number)
+    )
+    return result.scalars().first()
+
+async def create_invoice(db: AsyncSession, invoice: InvoiceCreate, user_id: int) -> Invoice:
+    order = await db.get(Order, invoice.order_id)
+    if not order:
+        raise ValueError(f"Order {invoice.order_id} not found")
+    if order.status != OrderStatus.CONFIRMED:
+        raise ValueError("Order must be confirmed before creating invoice")
+
+    db_invoice = Invoice(
+        **invoice.dict(exclude={'invoice_number'}),
+        invoice_number=await db.run_sync(
+            numbering.document_number, "invoice", invoice.invoice_number
+        ),
+        created_by=user_id
+    )
+    # The invoice balance takes over from the open order
+    _, order_exposure = await db.run_sync(credit.order_exposure, order)
+    await db.run_sync(
+        credit.add_exposure, order.customer_id,
+        credit.invoice_outstanding(db_invoice) - order_exposure,
+    )
+    await db.run_sync(
+        numbering.add_numbered, db_invoice, Invoice.invoice_number, "invoice",
+        invoice.invoice_number is not None,
+    )
+    await db.commit()
+    await db.refresh(db_invoice)
+    return db_invoice
+
+async def update_invoice(
+    db: AsyncSession, invoice_id: int, invoice: InvoiceUpdate
+) -> Optional[Invoice]:
+    db_invoice = await get_invoice(db, invoice_id)
+    if not db_invoice:
+        return None
+    outstanding_before = credit.invoice_outstanding(db_invoice)
+
+    update_data = invoice.dict(exclude_unset=True)
+    if update_data.get("invoice_number", db_invoice.invoice_number) != db_invoice.invoice_number:
+        await db.run_sync(numbering.document_number, "invoice", update_data["invoice_number"])
+    for field, value in update_data.items():
+        setattr(db_invoice, field, value)
+
+    customer_id = await db.run_sync(credit.invoice_customer_id, db_invoice)
+    await db.run_sync(
+        credit.add_exposure, customer_id,
+        credit.invoice_outstanding(db_invoice) - outstanding_before,
+    )
+    db.add(db_invoice)
+    await db.commit()
+    await db.refresh(db_invoice)
+    return db_invoice
+
+# Payment services
+async def create_payment(db: AsyncSession, payment: PaymentCreate, user_id: int) -> Payment:
+    amount_paid = Invoice.amount_paid + payment.amount
+    result = await db.execute(
+        update(Invoice)
+        .where(Invoice.id == payment.invoice_id)
+        .values(amount_paid=amount_paid, payment_status=_payment_status(amount_paid))
+        .execution_options(synchronize_session=False)
+    )
+    if not result.rowcount:
+        raise ValueError(f"Invoice {payment.invoice_id} not found")
+    await db.run_sync(credit.apply_payment_exposure, payment.invoice_id, payment.amount)
+
+    db_payment = Payment(**payment.dict(), created_by=user_id)
+    db.add(db_payment)
+
+    await db.commit()
+    await db.refresh(db_payment)
+    return db_payment
+
+async def get_payments(
+    db: AsyncSession, invoice_id: int, skip: int = 0, limit: int = 100,
+    cursor: Optional[str] = None, sort: Optional[str] = None
+) -> Page:
+    return await paginate_async(
+        db,
+        select(Payment).filter(Payment.invoice_id == invoice_id),
+        Payment.id, PAYMENT_SORT_FIELDS,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
@@ -0,0 +1,167 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import exists, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.pagination import Page, paginate
+from app.db.session import SessionLocal
+from app.models.inventory import StockAlert
+
+STOCK_ALERT_SORT_FIELDS = {"id": StockAlert.id, "raised_at": StockAlert.raised_at}
+
+# How late a write may commit after its changed_at and still reach the
+# stream; the stream re-reads this window on every poll
+STREAM_OVERLAP = timedelta(seconds=30)
+
+def is_low(quantity: int, min_stock_level: int) -> bool:
+    return quantity < min_stock_level
+
+def apply_stock_levels(
+    db: Session,
+    changes: Dict[Tuple[int, str], Tuple[int, int]],
+    levels: Dict[int, int],
+) -> None:
+    """
+    Raise or resolve alerts for stock rows whose quantity moved from
+    ``previous`` to ``quantity`` ({(product_id, location): (previous,
+    quantity)}), inside the caller's transaction. Writes that do not cross
+    min_stock_level cost two comparisons and touch nothing.
+    """
+    now = None
+    for (product_id, location), (previous, quantity) in changes.items():
+        level = levels.get(product_id)
+        if level is None or is_low(previous, level) == is_low(quantity, level):
+            continue
+        now = now or datetime.now(timezone.utc)
+        if is_low(quantity, level):
+            _raise_alert(db, product_id, location, quantity, level, now)
+        else:
+            _resolve_alert(db, product_id, location, quantity, now)
+
+def _raise_alert(
+    db: Session, product_id: int, location: str, quantity: int, level: int, now: datetime
+) -> None:
+    # Debounce: an alert that recovered only moments ago is reopened
+    # rather than raised again, so a level flapping around the threshold
+    # yields one alert
+    recent = db.execute(
+        select(StockAlert.id)
+        .where(
+            StockAlert.product_id == product_id,
+            StockAlert.location == location,
+            StockAlert.resolved_at >= now - timedelta(seconds=settings.STOCK_ALERT_DEBOUNCE_SECONDS),
+        )
+        .order_by(StockAlert.resolved_at.desc())
+        .limit(1)
+    ).scalar()
+    if recent is not None:
+        # Skipped when an alert is already open (a concurrent writer raised
+        # or reopened one); the savepoint covers one committed after our
+        # check, so the partial unique index never fails the stock write
+        is_open = exists().where(
+            StockAlert.product_id == product_id,
+            StockAlert.location == location,
+            StockAlert.resolved_at.is_(None),
+        )
+        try:
+            with db.begin_nested():
+                db.execute(
+                    update(StockAlert)
+                    .where(StockAlert.id == recent, ~is_open)
+                    .values(resolved_at=None, quantity=quantity, min_stock_level=level, changed_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+        except IntegrityError:
+            pass
+        return
+    values = {
+        "product_id": product_id, "location": location, "min_stock_level": level,
+        "quantity": quantity, "raised_at": now, "changed_at": now,
+    }
+    dialect_insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(
+        db.get_bind().dialect.name
+    )
+    if dialect_insert is None:
+        db.execute(insert(StockAlert).values(values))
+        return
+    # A concurrent writer may have raised it first; never fail the stock write
+    db.execute(
+        dialect_insert(StockAlert).values(values).on_conflict_do_nothing(
+            index_elements=[StockAlert.product_id, StockAlert.location],
+            index_where=StockAlert.resolved_at.is_(None),
+        )
+    )
+
+def _resolve_alert(
+    db: Session, product_id: int, location: str, quantity: int, now: datetime
+) -> None:
+    db.execute(
+        update(StockAlert)
+        .where(
+            StockAlert.product_id == product_id,
+            StockAlert.location == location,
+            StockAlert.resolved_at.is_(None),
+        )
+        .values(resolved_at=now, quantity=quantity, changed_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+def get_stock_alerts(
+    db: Session, include_resolved: bool = False, skip: int = 0, limit: int = 100,
+    cursor: Optional[str] = None, sort: Optional[str] = None
+) -> Page:
+    query = db.query(StockAlert)
+    if not include_resolved:
+        query = query.filter(StockAlert.resolved_at.is_(None))
+    return paginate(
+        query, StockAlert.id, STOCK_ALERT_SORT_FIELDS,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
+
+def changed_alerts(db: Session, since: datetime) -> List[StockAlert]:
+    return (
+        db.query(StockAlert)
+        .filter(StockAlert.changed_at > since - STREAM_OVERLAP)
+        .order_by(StockAlert.changed_at, StockAlert.id)
+        .all()
+    )
+
+class AlertFeed:
+    """
+    Per-subscriber cursor over alert changes. Each poll re-reads the
+    overlap window and skips what was already delivered, so a write that
+    commits a little after its changed_at is still picked up once.
+    """
+
+    def __init__(self, since: Optional[datetime] = None) -> None:
+        self.since = since or datetime.now(timezone.utc)
+        self._delivered: Set[Tuple[int, datetime]] = set()
+
+    def poll(self, db: Session) -> List[StockAlert]:
+        fresh = []
+        for alert in changed_alerts(db, self.since):
+            changed_at = alert.changed_at
+            if changed_at.tzinfo is None:
+                changed_at = changed_at.replace(tzinfo=timezone.utc)
+            key = (alert.id, changed_at)
+            if key in self._delivered:
+                continue
+            self._delivered.add(key)
+            self.since = max(self.since, changed_at)
+            fresh.append(alert)
+        # Only changes inside the window the next poll re-reads can come
+        # back; older keys are dropped so a long-lived stream stays bounded
+        horizon = self.since - STREAM_OVERLAP
+        self._delivered = {key for key in self._delivered if key[1] > horizon}
+        return fresh
+
+def poll_feed(feed: AlertFeed) -> List[StockAlert]:
+    # A short-lived session per poll; with the stream's own auth lookup on
+    # a closed session too, an open stream holds no pooled connection
+    db = SessionLocal()
+    try:
+        return feed.poll(db)
+    finally:
+        db.close()
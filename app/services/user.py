@@ -1,8 +1,12 @@
 from typing import Optional
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash, verify_password
+from app.core.cache import invalidate_principal
+from app.core.security import (
+    get_password_hash, verify_password, verify_and_update_password_async
+)
 
 def get_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
@@ -26,11 +30,17 @@ def update(db: Session, db_obj: User, obj_in: UserUpdate) -> User:
         hashed_password = get_password_hash(update_data["password"])
         del update_data["password"]
         update_data["hashed_password"] = hashed_password
+    privileges_changed = any(
+        field in update_data and update_data[field] != getattr(db_obj, field)
+        for field in ("is_active", "is_superuser")
+    )
     for field, value in update_data.items():
         setattr(db_obj, field, value)
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    if privileges_changed:
+        invalidate_principal(db_obj.id)
     return db_obj
 
 def authenticate(db: Session, email: str, password: str) -> Optional[User]:
@@ -39,4 +49,24 @@ def authenticate(db: Session, email: str, password: str) -> Optional[User]:
         return None
     if not verify_password(password, user.hashed_password):
         return None
-    return user 
\ No newline at end of file
+    return user
+
+def _save_password_hash(db: Session, db_obj: User, hashed_password: str) -> None:
+    db_obj.hashed_password = hashed_password
+    db.add(db_obj)
+    db.commit()
+    db.refresh(db_obj)
+
+async def authenticate_async(db: Session, email: str, password: str) -> Optional[User]:
+    user = await run_in_threadpool(get_by_email, db, email=email)
+    if not user:
+        return None
+    verified, new_hash = await verify_and_update_password_async(
+        password, user.hashed_password
+    )
+    if not verified:
+        return None
+    if new_hash:
+        # Stored hash predates the configured bcrypt cost; upgrade it
+        await run_in_threadpool(_save_password_hash, db, user, new_hash)
+    return user
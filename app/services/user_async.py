@@ -0,0 +1,70 @@
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user import User
+from app.schemas.user import UserCreate, UserUpdate
+from app.core.cache import invalidate_principal
+from app.core.security import (
+    get_password_hash_async, verify_and_update_password_async
+)
+
+async def get(db: AsyncSession, id: int) -> Optional[User]:
+    return await db.get(User, id)
+
+async def get_by_email(db: AsyncSession, email: str) -> Optional[User]:
+    result = await db.execute(select(User).filter(User.email == email))
+    return result.scalars().first()
+
+async def get_multi(
+    db: AsyncSession, skip: int = 0, limit: int = 100
+) -> List[User]:
+    result = await db.execute(select(User).order_by(User.id).offset(skip).limit(limit))
+    return list(result.scalars().all())
+
+async def create(db: AsyncSession, obj_in: UserCreate) -> User:
+    db_obj = User(
+        email=obj_in.email,
+        hashed_password=await get_password_hash_async(obj_in.password),
+        full_name=obj_in.full_name,
+        is_superuser=obj_in.is_superuser,
+        is_active=obj_in.is_active,
+    )
+    db.add(db_obj)
+    await db.commit()
+    await db.refresh(db_obj)
+    return db_obj
+
+async def update(db: AsyncSession, db_obj: User, obj_in: UserUpdate) -> User:
+    update_data = obj_in.dict(exclude_unset=True)
+    if "password" in update_data:
+        hashed_password = await get_password_hash_async(update_data["password"])
+        del update_data["password"]
+        update_data["hashed_password"] = hashed_password
+    privileges_changed = any(
+        field in update_data and update_data[field] != getattr(db_obj, field)
+        for field in ("is_active", "is_superuser")
+    )
+    for field, value in update_data.items():
+        setattr(db_obj, field, value)
+    db.add(db_obj)
+    await db.commit()
+    await db.refresh(db_obj)
+    if privileges_changed:
+        invalidate_principal(db_obj.id)
+    return db_obj
+
+async def authenticate(db: AsyncSession, email: str, password: str) -> Optional[User]:
+    user = await get_by_email(db, email=email)
+    if not user:
+        return None
+    verified, new_hash = await verify_and_update_password_async(
+        password, user.hashed_password
+    )
+    if not verified:
+        return None
+    if new_hash:
+        user.hashed_password = new_hash
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+    return user
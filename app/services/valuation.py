@@ -0,0 +1,372 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.db.pagination import Page, paginate
+from app.db.session import SessionLocal
+from app.models.inventory import Product, StockMovement
+from app.models.valuation import CogsEntry, CostLayer, ProductValuation
+
+VALUATION_SORT_FIELDS = {"id": ProductValuation.product_id}
+REBUILD_CHUNK_SIZE = 5000
+
+class ProductCost:
+    """
+    Running cost position of one product under the weighted-average and
+    FIFO methods. Stock below zero carries no value; issues beyond the open
+    layers are costed at the average cost.
+    """
+
+    def __init__(
+        self, quantity: int = 0, average_cost: float = 0.0, fifo_value: float = 0.0,
+        layers: Optional[List[List[Any]]] = None,
+    ) -> None:
+        self.quantity = quantity
+        self.average_cost = average_cost
+        self.fifo_value = fifo_value
+        # Open layers, oldest first: [id, remaining, unit_cost, received_at, quantity];
+        # id is None until the layer is written
+        self.layers = layers or []
+        self._head = 0
+        self.consumed: Set[int] = set()
+
+    @property
+    def average_value(self) -> float:
+        return max(self.quantity, 0) * self.average_cost
+
+    def receive(self, quantity: int, unit_cost: float, at: datetime) -> None:
+        if self.quantity <= 0:
+            self.average_cost = unit_cost
+        else:
+            self.average_cost = (
+                self.average_value + quantity * unit_cost
+            ) / (self.quantity + quantity)
+        self.quantity += quantity
+        # Units that only refill a shortfall were already costed when issued
+        remaining = min(quantity, max(self.quantity, 0))
+        self.layers.append([None, remaining, unit_cost, at, quantity])
+        self.fifo_value += remaining * unit_cost
+
+    def issue(self, quantity: int) -> Tuple[float, float]:
+        """
+        Take ``quantity`` out; returns its (average, FIFO) cost.
+        """
+        average = quantity * self.average_cost
+        fifo = 0.0
+        left = quantity
+        while left and self._head < len(self.layers):
+            layer = self.layers[self._head]
+            taken = min(left, layer[1])
+            layer[1] -= taken
+            left -= taken
+            fifo += taken * layer[2]
+            if layer[0] is not None:
+                self.consumed.add(self._head)
+            if not layer[1]:
+                self._head += 1
+        self.fifo_value = max(self.fifo_value - fifo, 0.0)
+        self.quantity -= quantity
+        return average, fifo + left * self.average_cost
+
+    def apply(
+        self, movement_type: str, quantity: int, unit_cost: Optional[float],
+        fallback_cost: float, at: datetime,
+    ) -> Tuple[Optional[float], Optional[Tuple[float, float]]]:
+        """
+        Apply one ledger movement. Returns the unit cost an inbound movement
+        was valued at, or the (average, FIFO) cost of an outbound one.
+        """
+        if movement_type == "in":
+            if unit_cost is None:
+                unit_cost = self.average_cost if self.quantity > 0 else fallback_cost
+            self.receive(quantity, unit_cost, at)
+            return unit_cost, None
+        return None, self.issue(quantity)
+
+def _ensure_valuations(db: Session, product_ids: List[int]) -> None:
+    rows = [{"product_id": product_id} for product_id in product_ids]
+    dialect_insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(
+        db.get_bind().dialect.name
+    )
+    if dialect_insert is not None:
+        db.execute(
+            dialect_insert(ProductValuation).on_conflict_do_nothing(
+                index_elements=[ProductValuation.product_id]
+            ),
+            rows,
+        )
+        return
+    existing = set(
+        db.execute(
+            select(ProductValuation.product_id)
+            .where(ProductValuation.product_id.in_(product_ids))
+        ).scalars()
+    )
+    missing = [row for row in rows if row["product_id"] not in existing]
+    if missing:
+        db.execute(insert(ProductValuation), missing)
+
+def _load_positions(db: Session, product_ids: List[int]) -> Dict[int, ProductCost]:
+    # Locking the valuation rows serializes writers per product, which
+    # also covers the product's layers
+    _ensure_valuations(db, product_ids)
+    positions = {
+        product_id: ProductCost(quantity, average_cost, fifo_value)
+        for product_id, quantity, average_cost, fifo_value in db.execute(
+            select(
+                ProductValuation.product_id, ProductValuation.quantity,
+                ProductValuation.average_cost, ProductValuation.fifo_value,
+            )
+            .where(ProductValuation.product_id.in_(product_ids))
+            .order_by(ProductValuation.product_id)
+            .with_for_update()
+        )
+    }
+    for id, product_id, remaining, unit_cost, received_at, quantity in db.execute(
+        select(
+            CostLayer.id, CostLayer.product_id, CostLayer.remaining, CostLayer.unit_cost,
+            CostLayer.received_at, CostLayer.quantity,
+        )
+        .where(CostLayer.product_id.in_(product_ids), CostLayer.remaining > 0)
+        .order_by(CostLayer.product_id, CostLayer.id)
+    ):
+        positions[product_id].layers.append([id, remaining, unit_cost, received_at, quantity])
+    return positions
+
+def _layer_rows(product_id: int, position: ProductCost) -> List[Dict]:
+    return [
+        {
+            "product_id": product_id, "received_at": received_at, "quantity": quantity,
+            "remaining": remaining, "unit_cost": unit_cost,
+        }
+        for id, remaining, unit_cost, received_at, quantity in position.layers
+        if id is None
+    ]
+
+def _cogs_row(product_id: int, quantity: int, cost: Tuple[float, float], at: datetime) -> Dict:
+    return {
+        "product_id": product_id, "quantity": quantity,
+        "average_cost": cost[0], "fifo_cost": cost[1], "created_at": at,
+    }
+
+def apply_movements(db: Session, rows: List[Dict], fallback_costs: Dict[int, float]) -> None:
+    """
+    Value new stock movement rows, in order, inside the caller's
+    transaction; call before the rows are inserted. Inbound rows without
+    a unit_cost get one filled in: the product's average cost while it is
+    in stock, else ``fallback_costs`` (its cost_price). That keeps the
+    ledger replayable by rebuild_valuation.
+    """
+    rows = [row for row in rows if not row.get("is_transfer")]
+    if not rows:
+        return
+    positions = _load_positions(db, sorted({row["product_id"] for row in rows}))
+    now = datetime.now(timezone.utc)
+    cogs = []
+    for row in rows:
+        product_id = row["product_id"]
+        at = row.get("created_at") or now
+        unit_cost, cost = positions[product_id].apply(
+            row["movement_type"], row["quantity"], row.get("unit_cost"),
+            fallback_costs.get(product_id, 0.0), at,
+        )
+        if cost is None:
+            row["unit_cost"] = unit_cost
+        else:
+            cogs.append(_cogs_row(product_id, row["quantity"], cost, at))
+
+    db.connection().execute(
+        update(ProductValuation.__table__)
+        .where(ProductValuation.product_id == bindparam("b_product_id"))
+        .values(
+            quantity=bindparam("b_quantity"),
+            average_cost=bindparam("b_average_cost"),
+            average_value=bindparam("b_average_value"),
+            fifo_value=bindparam("b_fifo_value"),
+            updated_at=func.now(),
+        ),
+        [
+            {
+                "b_product_id": product_id, "b_quantity": position.quantity,
+                "b_average_cost": position.average_cost,
+                "b_average_value": position.average_value,
+                "b_fifo_value": position.fifo_value,
+            }
+            for product_id, position in positions.items()
+        ],
+    )
+    consumed = [
+        {"b_id": position.layers[index][0], "b_remaining": position.layers[index][1]}
+        for position in positions.values()
+        for index in sorted(position.consumed)
+    ]
+    if consumed:
+        db.connection().execute(
+            update(CostLayer.__table__)
+            .where(CostLayer.id == bindparam("b_id"))
+            .values(remaining=bindparam("b_remaining")),
+            consumed,
+        )
+    layers = [
+        row for product_id, position in positions.items()
+        for row in _layer_rows(product_id, position)
+    ]
+    if layers:
+        db.execute(insert(CostLayer), layers)
+    if cogs:
+        db.execute(insert(CogsEntry), cogs)
+
+# Rebuild
+def _partition(column: Any, partition: int, partitions: int) -> Any:
+    return column % partitions == partition
+
+def rebuild_partition(partition: int, partitions: int) -> int:
+    """
+    Replay the ledger of the products with id % partitions == partition
+    into fresh valuations, layers and COGS, in one transaction on its own
+    session. Returns the number of products valued.
+    """
+    db = SessionLocal()
+    try:
+        for model in (CogsEntry, CostLayer, ProductValuation):
+            db.execute(
+                delete(model).where(_partition(model.product_id, partition, partitions))
+            )
+        fallback_costs = dict(
+            db.execute(
+                select(Product.id, Product.cost_price)
+                .where(_partition(Product.id, partition, partitions))
+            ).all()
+        )
+        movements = db.execute(
+            select(
+                StockMovement.product_id, StockMovement.movement_type,
+                StockMovement.quantity, StockMovement.unit_cost, StockMovement.created_at,
+            )
+            .where(
+                _partition(StockMovement.product_id, partition, partitions),
+                StockMovement.is_transfer.is_(False),
+            )
+            .order_by(StockMovement.product_id, StockMovement.id)
+            .execution_options(yield_per=REBUILD_CHUNK_SIZE)
+        )
+        products = 0
+        valuations: List[Dict] = []
+        layers: List[Dict] = []
+        cogs: List[Dict] = []
+
+        def flush(product_id: int, position: ProductCost) -> None:
+            valuations.append({
+                "product_id": product_id, "quantity": position.quantity,
+                "average_cost": position.average_cost,
+                "average_value": position.average_value,
+                "fifo_value": position.fifo_value,
+            })
+            layers.extend(_layer_rows(product_id, position))
+            for rows, model in ((valuations, ProductValuation), (layers, CostLayer), (cogs, CogsEntry)):
+                if len(rows) >= REBUILD_CHUNK_SIZE:
+                    db.execute(insert(model), rows)
+                    rows.clear()
+
+        current: Optional[int] = None
+        position = ProductCost()
+        for product_id, movement_type, quantity, unit_cost, created_at in movements:
+            if product_id != current:
+                if current is not None:
+                    flush(current, position)
+                    products += 1
+                current, position = product_id, ProductCost()
+            _, cost = position.apply(
+                movement_type, quantity, unit_cost, fallback_costs.get(product_id, 0.0),
+                created_at,
+            )
+            if cost is not None:
+                cogs.append(_cogs_row(product_id, quantity, cost, created_at))
+        if current is not None:
+            flush(current, position)
+            products += 1
+        for rows, model in ((valuations, ProductValuation), (layers, CostLayer), (cogs, CogsEntry)):
+            if rows:
+                db.execute(insert(model), rows)
+        db.commit()
+        return products
+    finally:
+        db.close()
+
+def rebuild_valuation(partitions: int = 16, workers: int = 4) -> int:
+    """
+    Recompute every product's valuation from the movement ledger,
+    ``partitions`` product partitions at a time across ``workers``
+    processes. Returns the number of products valued.
+
+    Incremental writers are not fenced off; run it in a quiet window.
+    """
+    # Spawned, not forked: a child must not share the parent's pooled
+    # connections
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        return sum(
+            executor.map(rebuild_partition, range(partitions), [partitions] * partitions)
+        )
+
+# Reads
+def get_valuation(db: Session, product_id: int) -> Optional[ProductValuation]:
+    return db.get(ProductValuation, product_id)
+
+def get_valuations(
+    db: Session, skip: int = 0, limit: int = 100,
+    cursor: Optional[str] = None, sort: Optional[str] = None
+) -> Page:
+    return paginate(
+        db.query(ProductValuation), ProductValuation.product_id, VALUATION_SORT_FIELDS,
+        sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
+
+def get_valuation_summary(db: Session) -> Dict[str, Any]:
+    products, quantity, average_value, fifo_value = db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(ProductValuation.quantity), 0),
+            func.coalesce(func.sum(ProductValuation.average_value), 0.0),
+            func.coalesce(func.sum(ProductValuation.fifo_value), 0.0),
+        )
+    ).one()
+    return {
+        "products": products, "quantity": quantity,
+        "average_value": average_value, "fifo_value": fifo_value,
+    }
+
+def get_cost_of_goods_sold(
+    db: Session, date_from: datetime, date_to: datetime,
+    product_ids: Optional[Iterable[int]] = None
+) -> Dict[str, Any]:
+    """
+    Cost of goods issued in [date_from, date_to), per product and in
+    total, under both methods.
+    """
+    query = (
+        select(
+            CogsEntry.product_id, func.sum(CogsEntry.quantity),
+            func.sum(CogsEntry.average_cost), func.sum(CogsEntry.fifo_cost),
+        )
+        .where(CogsEntry.created_at >= date_from, CogsEntry.created_at < date_to)
+        .group_by(CogsEntry.product_id)
+        .order_by(CogsEntry.product_id)
+    )
+    if product_ids is not None:
+        query = query.where(CogsEntry.product_id.in_(list(product_ids)))
+    lines = [
+        {"product_id": product_id, "quantity": quantity,
+         "average_cost": average_cost, "fifo_cost": fifo_cost}
+        for product_id, quantity, average_cost, fifo_cost in db.execute(query)
+    ]
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "average_cost": sum(line["average_cost"] for line in lines),
+        "fifo_cost": sum(line["fifo_cost"] for line in lines),
+        "lines": lines,
+    }
@@ -0,0 +1,68 @@
+import os
+import tempfile
+
+# The engine is built from settings at import time, so point it at a
+# scratch SQLite file before anything from app is imported
+_db_dir = tempfile.mkdtemp(prefix="erp-tests-")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{_db_dir}/test.db")
+
+import pytest
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+import app.models.purchase  # noqa: F401  (not registered in app.db.base)
+from app.models.inventory import Category, Product
+from app.models.user import User
+from app.services import inventory, numbering
+
+@pytest.fixture
+def db():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    for cache in (inventory.product_cache, inventory.category_cache, inventory.category_tree_cache):
+        cache.clear()
+    numbering.block_allocator.reset()
+    session = SessionLocal()
+    session.add(User(id=1, email="admin@example.com", hashed_password="x", full_name="Admin"))
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+async def async_db(db):
+    # The async services over the same scratch database; the async driver
+    # is optional, as in the app
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(engine.url.set(drivername="sqlite+aiosqlite"))
+    session = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)()
+    try:
+        yield session
+    finally:
+        await session.close()
+        await async_engine.dispose()
+
+@pytest.fixture
+def make_product(db):
+    category = Category(name="General")
+    db.add(category)
+    db.commit()
+    counter = iter(range(1, 1000000))
+
+    def make(**fields):
+        n = next(counter)
+        product = Product(**{
+            "name": f"Product {n}", "sku": f"SKU-{n}", "category_id": category.id,
+            "unit_price": 10.0, "cost_price": 5.0, **fields,
+        })
+        db.add(product)
+        db.commit()
+        return product
+
+    return make
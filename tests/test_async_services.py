@@ -0,0 +1,63 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import SessionLocal
+from app.models.inventory import Stock, StockMovement
+from app.schemas.inventory import StockMovementCreate
+from app.services import inventory, inventory_async
+
+CLIENTS = 8
+MOVEMENTS_PER_CLIENT = 10
+
+def _movement(product_id: int) -> StockMovementCreate:
+    return StockMovementCreate(
+        product_id=product_id, quantity=1, movement_type="in", location="main"
+    )
+
+def _sync_client(product_id: int) -> None:
+    db = SessionLocal()
+    try:
+        for _ in range(MOVEMENTS_PER_CLIENT):
+            inventory.create_stock_movement(db, _movement(product_id), user_id=1)
+    finally:
+        db.close()
+
+async def _async_client(bind, product_id: int) -> None:
+    async with AsyncSession(bind, autoflush=False, expire_on_commit=False) as db:
+        for _ in range(MOVEMENTS_PER_CLIENT):
+            await inventory_async.create_stock_movement(db, _movement(product_id), user_id=1)
+
+def _totals(db, product_id):
+    db.expire_all()
+    movements = db.execute(
+        select(func.count()).where(StockMovement.product_id == product_id)
+    ).scalar_one()
+    stock = db.execute(
+        select(Stock.quantity).where(Stock.product_id == product_id, Stock.location == "main")
+    ).scalar_one()
+    return movements, stock
+
+@pytest.mark.anyio
+async def test_sync_and_async_modes_under_concurrent_clients(db, async_db, make_product):
+    sync_product, async_product = make_product().id, make_product().id
+    expected = CLIENTS * MOVEMENTS_PER_CLIENT
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CLIENTS) as pool:
+        list(pool.map(_sync_client, [sync_product] * CLIENTS))
+    sync_rate = expected / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _async_client(async_db.bind, async_product) for _ in range(CLIENTS)
+    ))
+    async_rate = expected / (time.perf_counter() - started)
+
+    assert _totals(db, sync_product) == (expected, expected)
+    assert _totals(db, async_product) == (expected, expected)
+    # SQLite serialises the writes in both modes; the async stack must not
+    # add more than its event-loop overhead on top
+    assert async_rate > sync_rate / 4, (sync_rate, async_rate)
@@ -0,0 +1,82 @@
+import json
+import random
+from collections import defaultdict
+import pytest
+from sqlalchemy import insert, select
+from app.models.inventory import Category, Product
+from app.schemas.inventory import CategoryCreate, CategoryUpdate
+from app.services import inventory
+
+CATEGORIES = 120
+PRODUCTS = 3000
+
+@pytest.fixture
+def catalog(db):
+    rng = random.Random(17)
+    ids = []
+    for n in range(CATEGORIES):
+        parent_id = rng.choice(ids) if ids and rng.random() < 0.8 else None
+        ids.append(inventory.create_category(
+            db, CategoryCreate(name=f"Category {n}", parent_id=parent_id)
+        ).id)
+    db.execute(insert(Product), [
+        {"name": f"Product {n}", "sku": f"SKU-{n}", "category_id": rng.choice(ids),
+         "unit_price": 10.0, "cost_price": 5.0}
+        for n in range(PRODUCTS)
+    ])
+    db.commit()
+    return ids
+
+def _walked_products(db, category_id):
+    # Reference: walk parent_id links instead of the materialized paths
+    children = defaultdict(list)
+    for id, parent_id in db.execute(select(Category.id, Category.parent_id)):
+        children[parent_id].append(id)
+    subtree, pending = set(), [category_id]
+    while pending:
+        id = pending.pop()
+        subtree.add(id)
+        pending.extend(children[id])
+    return sorted(db.execute(
+        select(Product.id).where(Product.category_id.in_(subtree))
+    ).scalars())
+
+def _subtree_products(db, category_id):
+    ids, cursor = [], None
+    while True:
+        page = inventory.get_category_products(db, category_id, cursor=cursor, limit=500)
+        ids.extend(product.id for product in page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            return sorted(ids)
+
+def test_subtree_listing_matches_a_tree_walk(db, catalog):
+    for category_id in catalog[:25]:
+        assert _subtree_products(db, category_id) == _walked_products(db, category_id)
+
+def test_moved_subtree_follows_its_new_parent(db, catalog):
+    root = next(id for id in catalog if db.get(Category, id).parent_id is None)
+    moved = next(
+        id for id in reversed(catalog)
+        if not db.get(Category, id).path.startswith(db.get(Category, root).path)
+    )
+
+    inventory.update_category(db, moved, CategoryUpdate(parent_id=root))
+
+    assert set(_walked_products(db, moved)) <= set(_subtree_products(db, root))
+    assert _subtree_products(db, root) == _walked_products(db, root)
+
+def test_moving_a_category_under_its_descendant_is_rejected(db, catalog):
+    child = next(id for id in reversed(catalog) if db.get(Category, id).parent_id is not None)
+    parent_id = db.get(Category, child).parent_id
+
+    with pytest.raises(ValueError, match="under itself"):
+        inventory.update_category(db, parent_id, CategoryUpdate(parent_id=child))
+
+def test_tree_snapshot_is_cached_until_a_category_changes(db, catalog):
+    tree = inventory.get_category_tree(db)
+    assert inventory.get_category_tree(db) is tree
+
+    inventory.update_category(db, catalog[0], CategoryUpdate(name="Renamed"))
+
+    assert json.loads(inventory.get_category_tree(db))[0]["name"] == "Renamed"
@@ -0,0 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from sqlalchemy import func, select
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.sales import Customer, CustomerType, Order, OrderStatus
+from app.schemas.sales import OrderCreate, OrderItemCreate
+from app.services import credit, sales
+
+CREDIT_LIMIT = 1000.0
+ORDER_AMOUNT = 150.0
+ATTEMPTS = 16
+
+def _place_order(customer_id: int, product_id: int) -> bool:
+    db = SessionLocal()
+    try:
+        sales.create_order(
+            db,
+            OrderCreate(
+                customer_id=customer_id,
+                status=OrderStatus.CONFIRMED,
+                items=[OrderItemCreate(
+                    product_id=product_id, quantity=1, unit_price=ORDER_AMOUNT
+                )],
+            ),
+            user_id=1,
+        )
+        return True
+    except credit.CreditLimitExceeded:
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+def test_parallel_orders_stay_within_the_credit_limit(db, make_product, monkeypatch):
+    monkeypatch.setattr(settings, "CREDIT_LIMIT_MODE", "reject")
+    product = make_product()
+    customer = Customer(
+        name="Acme", type=CustomerType.COMPANY, email="acme@example.com",
+        credit_limit=CREDIT_LIMIT,
+    )
+    db.add(customer)
+    db.commit()
+    customer_id, product_id = customer.id, product.id
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        accepted = list(pool.map(
+            lambda _: _place_order(customer_id, product_id), range(ATTEMPTS)
+        ))
+
+    db.expire_all()
+    exposure = db.execute(
+        select(Customer.exposure).where(Customer.id == customer_id)
+    ).scalar_one()
+    placed = db.execute(
+        select(func.coalesce(func.sum(Order.total_amount), 0))
+        .where(Order.customer_id == customer_id)
+    ).scalar_one()
+
+    assert sum(accepted) == int(CREDIT_LIMIT // ORDER_AMOUNT)
+    assert exposure <= CREDIT_LIMIT
+    assert exposure == pytest.approx(placed)
@@ -0,0 +1,51 @@
+import csv
+import io
+import json
+import tracemalloc
+from sqlalchemy import insert
+from app.models.inventory import Category, Product
+from app.services import export
+from app.services.export import ExportFormat, products_statement, stream_export
+
+def _add_products(db, start, count):
+    db.execute(insert(Product), [
+        {"name": f"Product {n}", "sku": f"SKU-{n:06d}", "category_id": 1,
+         "unit_price": 10.0, "cost_price": 5.0}
+        for n in range(start, start + count)
+    ])
+    db.commit()
+
+def _peak_while_exporting(format):
+    tracemalloc.start()
+    try:
+        chunks = sum(1 for _ in stream_export(products_statement(), format))
+        return tracemalloc.get_traced_memory()[1], chunks
+    finally:
+        tracemalloc.stop()
+
+def test_csv_and_ndjson_carry_the_same_rows(db, make_product):
+    make_product(min_stock_level=3)
+    make_product(is_active=False)
+
+    rows = list(csv.DictReader(io.StringIO("".join(stream_export(products_statement(), ExportFormat.CSV)))))
+    records = [
+        json.loads(line)
+        for line in "".join(stream_export(products_statement(), ExportFormat.NDJSON)).splitlines()
+    ]
+
+    assert [row["sku"] for row in rows] == [record["sku"] for record in records] == ["SKU-1", "SKU-2"]
+    assert records[0]["min_stock_level"] == 3 and records[1]["is_active"] is False
+
+def test_export_memory_stays_flat_as_rows_grow(db, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_CHUNK_SIZE", 500)
+    db.add(Category(name="General"))
+    db.commit()
+
+    _add_products(db, 0, 2000)
+    small, small_chunks = _peak_while_exporting(ExportFormat.NDJSON)
+    _add_products(db, 2000, 14000)
+    large, large_chunks = _peak_while_exporting(ExportFormat.NDJSON)
+
+    assert (small_chunks, large_chunks) == (4, 32)
+    # Eight times the rows, one chunk's worth of memory either way
+    assert large < small * 2, (small, large)
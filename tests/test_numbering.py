@@ -0,0 +1,109 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+import pytest
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.models.sales import Customer, CustomerType, Order, OrderStatus
+from app.schemas.sales import InvoiceCreate, OrderCreate, OrderItemCreate
+from app.services import numbering, sales
+
+@pytest.fixture
+def customer(db):
+    customer = Customer(name="Acme", type=CustomerType.COMPANY, email="acme@example.com")
+    db.add(customer)
+    db.commit()
+    return customer
+
+def _order(customer, product, number=None, status=OrderStatus.DRAFT):
+    return OrderCreate(
+        customer_id=customer.id,
+        order_number=number,
+        status=status,
+        items=[OrderItemCreate(product_id=product.id, quantity=1, unit_price=10.0)],
+    )
+
+def test_duplicate_supplied_order_number_is_rejected(db, customer, make_product):
+    product = make_product()
+    sales.create_order(db, _order(customer, product, "SO-CLIENT-1"), user_id=1)
+
+    with pytest.raises(numbering.DuplicateDocumentNumber):
+        sales.create_order(db, _order(customer, product, "SO-CLIENT-1"), user_id=1)
+    db.rollback()
+
+    assert db.query(Order).count() == 1
+
+def test_allocated_number_skips_one_a_client_took(db, customer, make_product):
+    product = make_product()
+    taken = numbering.format_number("order", date.today().year, 1)
+    sales.create_order(db, _order(customer, product, taken), user_id=1)
+
+    order = sales.create_order(db, _order(customer, product), user_id=1)
+
+    assert order.order_number == numbering.format_number("order", date.today().year, 2)
+
+def test_gapless_invoices_refuse_client_numbers(db, customer, make_product, monkeypatch):
+    monkeypatch.setattr(settings, "INVOICE_NUMBERS_GAPLESS", True)
+    product = make_product()
+    order = sales.create_order(
+        db, _order(customer, product, status=OrderStatus.CONFIRMED), user_id=1
+    )
+    invoice = InvoiceCreate(
+        order_id=order.id, due_date=datetime.utcnow() + timedelta(days=30),
+        total_amount=10.0, tax_amount=0.0,
+    )
+
+    with pytest.raises(ValueError, match="assigned by the server"):
+        sales.create_invoice(db, invoice.copy(update={"invoice_number": "INV-CLIENT-1"}), user_id=1)
+    db.rollback()
+
+    created = sales.create_invoice(db, invoice, user_id=1)
+    assert created.invoice_number == numbering.format_number("invoice", date.today().year, 1)
+
+def test_parallel_allocation_hands_out_unique_numbers(db):
+    def allocate(_):
+        session = SessionLocal()
+        try:
+            return [numbering.next_number(session, "order") for _ in range(25)]
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        numbers = [n for batch in pool.map(allocate, range(8)) for n in batch]
+
+    assert len(set(numbers)) == len(numbers) == 200
+
+def test_blocks_keep_most_allocations_off_the_counter(db, monkeypatch):
+    monkeypatch.setattr(numbering, "block_allocator", numbering.BlockAllocator(50))
+    reservations = []
+    increment = numbering._increment
+    monkeypatch.setattr(
+        numbering, "_increment", lambda *args: reservations.append(args) or increment(*args)
+    )
+
+    numbers = [numbering.next_number(db, "order") for _ in range(200)]
+
+    assert len(reservations) == 4
+    assert numbers[-1] == numbering.format_number("order", date.today().year, 200)
+
+def _allocate_in_worker(count):
+    # Fresh connections in the forked worker; the parent's stay with it
+    engine.dispose(close=False)
+    session = SessionLocal()
+    try:
+        return [numbering.next_number(session, "purchase_receipt") for _ in range(count)]
+    finally:
+        session.close()
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="needs fork"
+)
+def test_worker_processes_never_share_a_number(db):
+    # Reserve a block in the parent first: forked workers must not reuse it
+    parent = numbering.next_number(db, "purchase_receipt")
+    db.commit()
+
+    with ProcessPoolExecutor(4, mp_context=multiprocessing.get_context("fork")) as pool:
+        numbers = [n for batch in pool.map(_allocate_in_worker, [150] * 4) for n in batch]
+
+    assert len(set(numbers + [parent])) == len(numbers) + 1 == 601
@@ -0,0 +1,67 @@
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import pytest
+from sqlalchemy import event
+from app.models.purchase import Supplier, SupplierType
+from app.models.sales import Customer, CustomerType, OrderStatus
+from app.schemas.purchase import PurchaseOrderCreate, PurchaseOrderItemCreate
+from app.schemas.sales import OrderCreate, OrderItemCreate
+from app.services import purchase_async, sales_async
+
+@contextmanager
+def line_inserts(async_db, table):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith(f"INSERT INTO {table} "):
+            statements.append(statement)
+
+    sync_engine = async_db.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", record)
+
+@pytest.mark.anyio
+async def test_async_order_lines_are_inserted_in_one_statement(db, async_db, make_product):
+    product_ids = [make_product().id for _ in range(5)]
+    db.add(Customer(name="Acme", type=CustomerType.COMPANY, email="acme@example.com"))
+    db.commit()
+
+    with line_inserts(async_db, "orderitem") as statements:
+        order = await sales_async.create_order(
+            async_db,
+            OrderCreate(
+                customer_id=1, status=OrderStatus.DRAFT,
+                items=[OrderItemCreate(product_id=id, quantity=2, unit_price=3.0) for id in product_ids],
+            ),
+            user_id=1,
+        )
+
+    assert len(statements) == 1
+    assert sorted(item.product_id for item in order.items) == product_ids
+    assert order.total_amount == 30.0
+
+@pytest.mark.anyio
+async def test_async_purchase_order_lines_are_inserted_in_one_statement(db, async_db, make_product):
+    product_ids = [make_product().id for _ in range(5)]
+    db.add(Supplier(name="Parts Co", type=SupplierType.DISTRIBUTOR, email="parts@example.com"))
+    db.commit()
+
+    with line_inserts(async_db, "purchaseorderitem") as statements:
+        order = await purchase_async.create_purchase_order(
+            async_db,
+            PurchaseOrderCreate(
+                supplier_id=1, expected_date=datetime.now(timezone.utc),
+                items=[
+                    PurchaseOrderItemCreate(product_id=id, quantity=4, unit_price=2.5)
+                    for id in product_ids
+                ],
+            ),
+            user_id=1,
+        )
+
+    assert len(statements) == 1
+    assert sorted(item.product_id for item in order.items) == product_ids
+    assert order.total_amount == 50.0
@@ -0,0 +1,74 @@
+import random
+import statistics
+import time
+import pytest
+from sqlalchemy import insert
+from app.models.inventory import Category, Product
+from app.schemas.inventory import ProductCreate, ProductUpdate
+from app.services import inventory, product_search
+
+@pytest.fixture(autouse=True)
+def fresh_index(monkeypatch):
+    # The index is process-wide; each test loads it from its own database
+    monkeypatch.setattr(product_search, "product_index", product_search.ProductSearchIndex(3600))
+
+def _names(products):
+    return [product.name for product in products]
+
+def test_results_are_ranked_by_match_tier(db, make_product):
+    make_product(name="Blue widget", sku="BW-2")
+    make_product(name="Widget Pro", sku="WP-1")
+    make_product(name="Gadget", sku="WID-7")
+    make_product(name="Wodget", sku="X-9")
+    make_product(name="Widget Old", sku="WO-1", is_active=False)
+
+    results = product_search.search_products(db, "wid")
+
+    assert _names(results) == ["Gadget", "Widget Pro", "Blue widget"]
+    assert _names(product_search.search_products(db, "WID-7")) == ["Gadget"]
+    assert "Widget Old" in _names(product_search.search_products(db, "wid", include_inactive=True))
+
+def test_typos_fall_back_to_trigram_similarity(db, make_product):
+    make_product(name="Hydraulic pump", sku="HP-1")
+    make_product(name="Garden hose", sku="GH-1")
+
+    assert _names(product_search.search_products(db, "hydralic pmp")) == ["Hydraulic pump"]
+
+def test_writes_are_searchable_without_a_reload(db, make_product):
+    product = make_product(name="Old name", sku="ON-1")
+    assert _names(product_search.search_products(db, "old")) == ["Old name"]
+
+    inventory.update_product(db, product.id, ProductUpdate(name="Fresh name"))
+    inventory.create_product(db, ProductCreate(
+        name="Old stock", sku="OS-1", category_id=product.category_id,
+        unit_price=1.0, cost_price=1.0,
+    ))
+
+    assert _names(product_search.search_products(db, "fresh")) == ["Fresh name"]
+    assert _names(product_search.search_products(db, "old")) == ["Old stock"]
+
+def test_search_latency_on_a_large_catalog(db):
+    rng = random.Random(18)
+    words = ["bolt", "nut", "washer", "bracket", "valve", "pump", "hose", "filter",
+             "gasket", "spring", "bearing", "seal", "clamp", "fitting", "sensor"]
+    db.add(Category(name="General"))
+    db.commit()
+    db.execute(insert(Product), [
+        {"name": f"{rng.choice(words)} {rng.choice(words)} {n}", "sku": f"SKU-{n:06d}",
+         "category_id": 1, "unit_price": 1.0, "cost_price": 1.0}
+        for n in range(20000)
+    ])
+    db.commit()
+    product_search.search_products(db, "warm")
+    queries = [rng.choice(["SKU-04", "valve", "brack", "gaskt sel", "pump 12"]) for _ in range(100)]
+
+    samples = []
+    for q in queries:
+        started = time.perf_counter()
+        product_search.search_products(db, q)
+        samples.append(time.perf_counter() - started)
+
+    p99 = statistics.quantiles(samples, n=100)[98]
+    # The in-process index, which small deployments rely on; large
+    # catalogs are served by the pg_trgm indexes
+    assert p99 < 0.05, p99
@@ -0,0 +1,153 @@
+import time
+from datetime import datetime, timezone
+import pytest
+from sqlalchemy import event, func, insert, select
+from app.models.inventory import Product, StockAvailability
+from app.models.purchase import PurchaseOrderStatus, ReceiptStatus, Supplier, SupplierType
+from app.schemas.purchase import (
+    PurchaseOrderCreate, PurchaseOrderItemCreate, PurchaseOrderUpdate,
+    PurchaseReceiptCreate, PurchaseReceiptItemCreate,
+)
+from app.services import purchase
+
+@pytest.fixture
+def received_order(db, make_product):
+    """A confirmed order for 5 x A and 4 x B with 3 x A received."""
+    a, b = make_product(), make_product()
+    db.add(Supplier(name="Parts Co", type=SupplierType.DISTRIBUTOR, email="parts@example.com"))
+    db.commit()
+    order = purchase.create_purchase_order(
+        db,
+        PurchaseOrderCreate(
+            supplier_id=1, expected_date=datetime.now(timezone.utc),
+            status=PurchaseOrderStatus.CONFIRMED,
+            items=[
+                PurchaseOrderItemCreate(product_id=a.id, quantity=5, unit_price=2.0),
+                PurchaseOrderItemCreate(product_id=b.id, quantity=4, unit_price=3.0),
+            ],
+        ),
+        user_id=1,
+    )
+    line_a = next(item for item in order.items if item.product_id == a.id)
+    purchase.create_purchase_receipt(
+        db,
+        PurchaseReceiptCreate(
+            order_id=order.id, status=ReceiptStatus.RECEIVED,
+            items=[PurchaseReceiptItemCreate(order_item_id=line_a.id, quantity=3, unit_price=2.0)],
+        ),
+        user_id=1,
+    )
+    return order.id, a.id, b.id
+
+def _update(db, order_id, *lines):
+    return purchase.update_purchase_order(
+        db, order_id,
+        PurchaseOrderUpdate(items=[
+            PurchaseOrderItemCreate(product_id=product_id, quantity=quantity, unit_price=2.0)
+            for product_id, quantity in lines
+        ]),
+        user_id=1,
+    )
+
+def test_received_line_cannot_be_removed(db, received_order):
+    order_id, _, b = received_order
+    with pytest.raises(ValueError, match="received against"):
+        _update(db, order_id, (b, 4))
+
+def test_quantity_cannot_drop_below_received(db, received_order):
+    order_id, a, b = received_order
+    with pytest.raises(ValueError, match="already received"):
+        _update(db, order_id, (a, 2), (b, 4))
+
+def test_status_is_rederived_from_the_lines(db, received_order):
+    order_id, a, b = received_order
+
+    order = _update(db, order_id, (a, 3), (b, 4))
+    assert order.status == PurchaseOrderStatus.PARTIALLY_RECEIVED
+
+    order = _update(db, order_id, (a, 3))
+    assert order.status == PurchaseOrderStatus.RECEIVED
+
+def test_line_on_a_draft_receipt_cannot_be_removed(db, received_order):
+    order_id, a, b = received_order
+    line_b = next(
+        item for item in purchase.get_purchase_order(db, order_id).items if item.product_id == b
+    )
+    purchase.create_purchase_receipt(
+        db,
+        PurchaseReceiptCreate(
+            order_id=order_id,
+            items=[PurchaseReceiptItemCreate(order_item_id=line_b.id, quantity=1, unit_price=3.0)],
+        ),
+        user_id=1,
+    )
+    with pytest.raises(ValueError, match=f"Order item {line_b.id}"):
+        _update(db, order_id, (a, 5))
+
+def test_receipt_beyond_the_outstanding_quantity_is_rejected(db, received_order):
+    order_id, a, _ = received_order
+    line_a = next(
+        item for item in purchase.get_purchase_order(db, order_id).items if item.product_id == a
+    )
+    with pytest.raises(ValueError, match="exceeds the outstanding 2"):
+        purchase.create_purchase_receipt(
+            db,
+            PurchaseReceiptCreate(
+                order_id=order_id, status=ReceiptStatus.RECEIVED,
+                items=[PurchaseReceiptItemCreate(order_item_id=line_a.id, quantity=3, unit_price=2.0)],
+            ),
+            user_id=1,
+        )
+
+def _receive_everything(db, lines):
+    """Order ``lines`` products, receive them all in one receipt; (statements, seconds)."""
+    db.execute(insert(Product), [
+        {"name": f"Bulk {lines}-{n}", "sku": f"BULK-{lines}-{n}", "category_id": 1,
+         "unit_price": 2.0, "cost_price": 1.0}
+        for n in range(lines)
+    ])
+    db.commit()
+    product_ids = db.execute(
+        select(Product.id).where(Product.sku.startswith(f"BULK-{lines}-"))
+    ).scalars().all()
+    order = purchase.create_purchase_order(
+        db,
+        PurchaseOrderCreate(
+            supplier_id=1, expected_date=datetime.now(timezone.utc),
+            status=PurchaseOrderStatus.CONFIRMED,
+            items=[PurchaseOrderItemCreate(product_id=id, quantity=3, unit_price=2.0) for id in product_ids],
+        ),
+        user_id=1,
+    )
+    receipt = PurchaseReceiptCreate(
+        order_id=order.id, status=ReceiptStatus.RECEIVED,
+        items=[
+            PurchaseReceiptItemCreate(order_item_id=item.id, quantity=3, unit_price=2.0)
+            for item in order.items
+        ],
+    )
+    statements = []
+    record = lambda *args: statements.append(args[2])
+    event.listen(db.get_bind(), "before_cursor_execute", record)
+    started = time.perf_counter()
+    try:
+        purchase.create_purchase_receipt(db, receipt, user_id=1)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", record)
+    elapsed = time.perf_counter() - started
+
+    assert purchase.get_purchase_order(db, order.id).status == PurchaseOrderStatus.RECEIVED
+    stocked = db.execute(
+        select(func.count(), func.sum(StockAvailability.quantity))
+        .where(StockAvailability.product_id.in_(product_ids))
+    ).one()
+    assert tuple(stocked) == (lines, 3 * lines)
+    return len(statements), elapsed
+
+def test_large_receipt_costs_a_fixed_number_of_statements(db, received_order):
+    small, _ = _receive_everything(db, 20)
+    large, elapsed = _receive_everything(db, 2000)
+
+    # Validation, counters and stock are batched; only the line count grows
+    assert large == small, (small, large)
+    assert elapsed < 2.0, elapsed
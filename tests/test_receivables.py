@@ -0,0 +1,102 @@
+import random
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+import pytest
+from sqlalchemy import event, func, insert, select
+from app.models.sales import Customer, CustomerType, Invoice, Order, PaymentStatus
+from app.services import receivables
+
+AS_OF = date(2026, 6, 30)
+CUSTOMERS = 20
+INVOICES = 3000
+
+def _bucket(due_date):
+    day = datetime.combine(AS_OF, time.min)
+    for name, days in zip(receivables.AGING_COLUMNS, (0, 30, 60, 90)):
+        if due_date >= day - timedelta(days=days):
+            return name
+    return "days_over_90"
+
+@pytest.fixture
+def invoices(db):
+    rng = random.Random(13)
+    db.execute(insert(Customer), [
+        {"name": f"Customer {n}", "type": CustomerType.COMPANY, "email": f"c{n}@example.com"}
+        for n in range(CUSTOMERS)
+    ])
+    db.execute(insert(Order), [
+        {"customer_id": n % CUSTOMERS + 1, "order_number": f"SO-{n}", "total_amount": 100.0,
+         "created_by": 1}
+        for n in range(INVOICES)
+    ])
+    rows = []
+    for n in range(INVOICES):
+        total = round(rng.uniform(10, 500), 2)
+        rows.append({
+            "order_id": n + 1, "invoice_number": f"INV-{n}", "created_by": 1,
+            "invoice_date": datetime.combine(AS_OF, time.min) - timedelta(days=150),
+            "due_date": datetime.combine(AS_OF, time.min)
+            + timedelta(days=rng.randint(-150, 30), hours=rng.randint(0, 23)),
+            "total_amount": total, "tax_amount": 0.0,
+            "amount_paid": rng.choice((0.0, round(total / 2, 2), total)),
+            "payment_status": PaymentStatus.PENDING,
+        })
+    for row in rows:
+        if row["amount_paid"] == row["total_amount"]:
+            row["payment_status"] = PaymentStatus.PAID
+        elif row["amount_paid"]:
+            row["payment_status"] = PaymentStatus.PARTIAL
+    db.execute(insert(Invoice), rows)
+    db.commit()
+    return rows
+
+def test_aging_matches_a_per_invoice_reference(db, invoices):
+    expected = defaultdict(lambda: defaultdict(float))
+    for n, row in enumerate(invoices):
+        outstanding = row["total_amount"] - row["amount_paid"]
+        if row["payment_status"] == PaymentStatus.PAID or outstanding <= 0.005:
+            continue
+        totals = expected[n % CUSTOMERS + 1]
+        totals[_bucket(row["due_date"])] += outstanding
+        totals["total"] += outstanding
+        totals["invoices"] += 1
+
+    statements = []
+    record = lambda *args: statements.append(args[2])
+    event.listen(db.get_bind(), "before_cursor_execute", record)
+    try:
+        aging = receivables.get_aging(db, AS_OF)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", record)
+
+    # One set-based aggregation, not a query per invoice or customer
+    assert len(statements) == 1
+    assert [line["customer_id"] for line in aging] == sorted(expected)
+    for line in aging:
+        for name in receivables.AGING_COLUMNS:
+            assert line[name] == pytest.approx(expected[line["customer_id"]][name]), name
+
+def test_snapshot_and_overdue_flip_agree_with_the_aging(db, invoices):
+    aging = receivables.get_aging(db, AS_OF)
+
+    snapshot = receivables.create_aging_snapshot(db, AS_OF, user_id=1)
+    flipped = receivables.mark_overdue_invoices(db, AS_OF)
+
+    assert {line.customer_id: line.total for line in snapshot.lines} == pytest.approx(
+        {line["customer_id"]: line["total"] for line in aging}
+    )
+    assert receivables.get_latest_aging_snapshot(db).id == snapshot.id
+    day = datetime.combine(AS_OF, time.min)
+    past_due = sum(
+        1 for row in invoices
+        if row["payment_status"] != PaymentStatus.PAID and row["due_date"] < day
+    )
+    overdue = db.execute(
+        select(func.count()).where(Invoice.payment_status == PaymentStatus.OVERDUE)
+    ).scalar_one()
+    assert flipped == overdue == past_due > 0
+    # Aging is unchanged by the flip: OVERDUE invoices stay open
+    assert [
+        {name: pytest.approx(value) for name, value in line.items()}
+        for line in receivables.get_aging(db, AS_OF)
+    ] == aging
@@ -0,0 +1,84 @@
+from datetime import date, datetime, timedelta
+import pytest
+from sqlalchemy import select, update
+from app.models.inventory import Category
+from app.models.reporting import SalesDailyCategory
+from app.models.sales import Customer, CustomerType, Order, OrderStatus
+from app.schemas.inventory import ProductUpdate
+from app.schemas.sales import OrderCreate, OrderItemCreate
+from app.services import inventory, inventory_async, reporting, sales
+
+DAYS = 3
+
+def _category_rollup(db):
+    db.expire_all()
+    return {
+        (row.day, row.category_id): (row.revenue, row.quantity, row.discount, row.orders)
+        for row in db.execute(select(SalesDailyCategory)).scalars()
+    }
+
+@pytest.fixture
+def sold_products(db, make_product):
+    """Two products of one category, sold together and apart over DAYS days."""
+    first, second = make_product(), make_product()
+    customer = Customer(name="Acme", type=CustomerType.COMPANY, email="acme@example.com")
+    db.add(customer)
+    db.commit()
+    start = date.today() - timedelta(days=DAYS - 1)
+    for n in range(DAYS):
+        for products in ((first, second), (first,), (second,)):
+            order = sales.create_order(
+                db,
+                OrderCreate(
+                    customer_id=customer.id, status=OrderStatus.CONFIRMED,
+                    items=[
+                        OrderItemCreate(product_id=p.id, quantity=n + 1, unit_price=10.0)
+                        for p in products
+                    ],
+                ),
+                user_id=1,
+            )
+            db.execute(
+                update(Order).where(Order.id == order.id)
+                .values(order_date=datetime.combine(start + timedelta(days=n), datetime.min.time()))
+            )
+    db.commit()
+    reporting.rebuild_rollups(db, start, date.today())
+    other = Category(name="Other")
+    db.add(other)
+    db.commit()
+    return first, other.id, start
+
+def _rebuilt(db, start):
+    reporting.rebuild_rollups(db, start, date.today())
+    return _category_rollup(db)
+
+def test_category_change_moves_the_rollup_history(db, sold_products):
+    product, new_category_id, start = sold_products
+    old_category_id = product.category_id
+
+    inventory.update_product(db, product.id, ProductUpdate(category_id=new_category_id))
+
+    moved = _category_rollup(db)
+    assert moved == _rebuilt(db, start)
+    # An order holding both products now counts once in each category
+    assert {category_id for _, category_id in moved} == {old_category_id, new_category_id}
+    assert all(totals[3] == 2 for totals in moved.values())
+
+@pytest.mark.anyio
+async def test_async_category_change_moves_the_rollup_history(db, async_db, sold_products):
+    product, new_category_id, start = sold_products
+
+    await inventory_async.update_product(
+        async_db, product.id, ProductUpdate(category_id=new_category_id)
+    )
+
+    assert _category_rollup(db) == _rebuilt(db, start)
+
+def test_other_product_updates_leave_the_rollup_alone(db, sold_products):
+    product, _, _ = sold_products
+    before = _category_rollup(db)
+
+    inventory.update_product(db, product.id, ProductUpdate(name="Renamed"))
+
+    assert _category_rollup(db) == before
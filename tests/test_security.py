@@ -0,0 +1,55 @@
+import asyncio
+import threading
+import time
+import pytest
+from app.core import security
+from app.core.security import PasswordHasher, PasswordHasherBusy
+
+def test_saturated_hasher_rejects_instead_of_queueing():
+    hasher = PasswordHasher(workers=1, queue_depth=1)
+    release = threading.Event()
+    admitted = [hasher.submit(release.wait) for _ in range(2)]
+
+    with pytest.raises(PasswordHasherBusy):
+        hasher.submit(release.wait)
+
+    release.set()
+    for future in admitted:
+        future.result(timeout=5)
+    # Finished jobs give their slots back
+    assert hasher.submit(lambda: "ok").result(timeout=5) == "ok"
+
+@pytest.mark.anyio
+async def test_login_storm_leaves_the_event_loop_responsive():
+    # A slow stand-in for bcrypt; the storm is larger than the pool
+    hasher = PasswordHasher(workers=2, queue_depth=16)
+    lags = []
+
+    async def other_requests():
+        for _ in range(20):
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - started - 0.005)
+
+    logins = [hasher.run(time.sleep, 0.02) for _ in range(18)]
+    started = time.perf_counter()
+    await asyncio.gather(other_requests(), *logins)
+    storm = time.perf_counter() - started
+
+    # Blocking verification on the loop would stall it for the whole storm
+    assert max(lags) < storm / 4, (max(lags), storm)
+
+@pytest.mark.anyio
+async def test_outdated_bcrypt_cost_is_rehashed_on_login(monkeypatch):
+    pytest.importorskip("bcrypt")
+    from passlib.context import CryptContext
+
+    stored = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secret")
+    monkeypatch.setattr(security, "pwd_context", CryptContext(
+        schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=5
+    ))
+
+    valid, new_hash = await security.verify_and_update_password_async("secret", stored)
+
+    assert valid and new_hash is not None and "$05$" in new_hash
+    assert await security.verify_and_update_password_async("secret", new_hash) == (True, None)
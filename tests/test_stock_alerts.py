@@ -0,0 +1,102 @@
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import event, select
+from app.core.config import settings
+from app.models.inventory import StockAlert
+from app.schemas.inventory import StockMovementCreate
+from app.services import inventory, stock_alerts
+
+def test_reopen_is_skipped_while_an_alert_is_open(db, make_product):
+    product = make_product(min_stock_level=10)
+    now = datetime.now(timezone.utc)
+    # A recently resolved alert within the debounce, and one a concurrent
+    # writer has already raised
+    db.add_all([
+        StockAlert(
+            product_id=product.id, location="default", min_stock_level=10, quantity=12,
+            raised_at=now - timedelta(seconds=60), resolved_at=now - timedelta(seconds=5),
+            changed_at=now - timedelta(seconds=5),
+        ),
+        StockAlert(
+            product_id=product.id, location="default", min_stock_level=10, quantity=4,
+            raised_at=now, changed_at=now,
+        ),
+    ])
+    db.commit()
+
+    stock_alerts._raise_alert(db, product.id, "default", 3, 10, now)
+    db.commit()
+
+    open_alerts = db.execute(
+        select(StockAlert.quantity).where(StockAlert.resolved_at.is_(None))
+    ).scalars().all()
+    assert open_alerts == [4]
+
+def test_feed_delivers_once_and_forgets_outside_the_overlap(db, make_product):
+    product = make_product(min_stock_level=10)
+    start = datetime.now(timezone.utc)
+    feed = stock_alerts.AlertFeed(since=start)
+    delivered = []
+    for n in range(40):
+        changed_at = start + timedelta(seconds=10 * (n + 1))
+        db.add(StockAlert(
+            product_id=product.id, location=f"bin-{n}", min_stock_level=10, quantity=1,
+            raised_at=changed_at, changed_at=changed_at,
+        ))
+        db.commit()
+        delivered += [alert.location for alert in feed.poll(db)]
+        # Re-reading the overlap window must not deliver anything again
+        assert feed.poll(db) == []
+        assert len(feed._delivered) <= stock_alerts.STREAM_OVERLAP.total_seconds() / 10
+
+    assert delivered == [f"bin-{n}" for n in range(40)]
+
+def _move(db, product_id, quantity, movement_type):
+    inventory.create_stock_movement(
+        db,
+        StockMovementCreate(product_id=product_id, quantity=quantity, movement_type=movement_type),
+        user_id=1,
+        prevent_negative=False,
+    )
+
+@pytest.mark.parametrize("debounce, alerts", [(300, 1), (0, 3)])
+def test_flapping_stock_is_debounced_into_one_alert(db, make_product, monkeypatch, debounce, alerts):
+    monkeypatch.setattr(settings, "STOCK_ALERT_DEBOUNCE_SECONDS", debounce)
+    product = make_product(min_stock_level=10)
+    _move(db, product.id, 12, "in")
+
+    # Down through the threshold three times, recovering in between
+    for movement_type in ("out", "in", "out", "in", "out"):
+        _move(db, product.id, 5, movement_type)
+
+    rows = db.execute(
+        select(StockAlert.resolved_at).where(StockAlert.product_id == product.id)
+    ).scalars().all()
+    assert len(rows) == alerts
+    assert sum(resolved_at is None for resolved_at in rows) == 1
+
+def test_alerts_add_no_queries_to_writes_that_do_not_cross(db, make_product, monkeypatch):
+    products = {
+        enabled: make_product(min_stock_level=5).id for enabled in (True, False)
+    }
+
+    def post(enabled):
+        monkeypatch.setattr(settings, "STOCK_ALERTS_ENABLED", enabled)
+        _move(db, products[enabled], 100, "in")
+        statements = []
+        record = lambda *args: statements.append(args[2])
+        event.listen(db.get_bind(), "before_cursor_execute", record)
+        started = time.perf_counter()
+        try:
+            for _ in range(100):
+                _move(db, products[enabled], 1, "in")
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", record)
+        return len(statements), time.perf_counter() - started
+
+    on_statements, on_time = post(True)
+    off_statements, off_time = post(False)
+
+    assert on_statements == off_statements
+    assert on_time < off_time * 1.5, (on_time, off_time)
@@ -0,0 +1,179 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import case, func, select
+from app.db.session import SessionLocal
+from app.models.inventory import Stock, StockAvailability, StockMovement
+from app.schemas.inventory import (
+    StockCreate, StockMovementBatchCreate, StockMovementBatchMode, StockMovementCreate,
+    StockUpdate,
+)
+from app.services import inventory, inventory_async
+
+THREADS = 8
+MOVEMENTS_PER_THREAD = 25
+
+def _post_movements(product_id: int, worker: int) -> None:
+    db = SessionLocal()
+    try:
+        for n in range(MOVEMENTS_PER_THREAD):
+            movement_type = "out" if (worker + n) % 3 == 0 else "in"
+            inventory.create_stock_movement(
+                db,
+                StockMovementCreate(
+                    product_id=product_id, quantity=n % 5 + 1,
+                    movement_type=movement_type, location="main",
+                ),
+                user_id=1,
+                prevent_negative=False,
+            )
+    finally:
+        db.close()
+
+def test_concurrent_movements_match_the_ledger(db, make_product):
+    product = make_product()
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        for future in [pool.submit(_post_movements, product.id, w) for w in range(THREADS)]:
+            future.result()
+
+    db.expire_all()
+    ledger = db.execute(
+        select(
+            func.count(),
+            func.sum(case(
+                (StockMovement.movement_type == "in", StockMovement.quantity),
+                else_=-StockMovement.quantity,
+            )),
+        ).where(StockMovement.product_id == product.id)
+    ).one()
+    stock = db.execute(
+        select(Stock.quantity).where(Stock.product_id == product.id, Stock.location == "main")
+    ).scalar_one()
+    available = db.execute(
+        select(StockAvailability.quantity).where(StockAvailability.product_id == product.id)
+    ).scalar_one()
+
+    assert ledger[0] == THREADS * MOVEMENTS_PER_THREAD
+    assert stock == ledger[1]
+    assert available == ledger[1]
+
+def test_duplicate_stock_is_rejected_without_touching_availability(db, make_product):
+    product = make_product()
+    inventory.create_stock(db, StockCreate(product_id=product.id, quantity=5))
+
+    with pytest.raises(ValueError):
+        inventory.create_stock(db, StockCreate(product_id=product.id, quantity=7))
+    db.rollback()
+
+    available = db.execute(
+        select(StockAvailability.quantity).where(StockAvailability.product_id == product.id)
+    ).scalar_one()
+    assert available == 5
+
+def test_moving_stock_onto_an_existing_location_is_rejected(db, make_product):
+    product = make_product()
+    inventory.create_stock(db, StockCreate(product_id=product.id, quantity=5, location="main"))
+    spare = inventory.create_stock(
+        db, StockCreate(product_id=product.id, quantity=3, location="spare")
+    )
+
+    with pytest.raises(ValueError, match="already exists"):
+        inventory.update_stock(db, spare.id, StockUpdate(location="main", quantity=4))
+    db.rollback()
+
+    available = db.execute(
+        select(StockAvailability.quantity).where(StockAvailability.product_id == product.id)
+    ).scalar_one()
+    assert available == 8
+
+@pytest.mark.anyio
+async def test_async_moving_stock_onto_an_existing_location_is_rejected(
+    async_db, make_product
+):
+    product = make_product()
+    await inventory_async.create_stock(
+        async_db, StockCreate(product_id=product.id, quantity=5, location="main")
+    )
+    spare = await inventory_async.create_stock(
+        async_db, StockCreate(product_id=product.id, quantity=3, location="spare")
+    )
+
+    with pytest.raises(ValueError, match="already exists"):
+        await inventory_async.update_stock(async_db, spare.id, StockUpdate(location="main"))
+
+@pytest.mark.parametrize("fields", [
+    {"movement_type": "IN", "quantity": 1},
+    {"movement_type": "in", "quantity": 0},
+    {"movement_type": "out", "quantity": -3},
+])
+def test_invalid_movements_are_rejected_by_the_schema(fields):
+    with pytest.raises(ValidationError):
+        StockMovementCreate(product_id=1, **fields)
+
+def test_movement_for_an_unknown_product_is_rejected(db):
+    with pytest.raises(ValueError, match="not found"):
+        inventory.create_stock_movement(
+            db, StockMovementCreate(product_id=999, quantity=1, movement_type="in"), user_id=1
+        )
+
+def test_batch_reports_invalid_rows_individually(db, make_product):
+    product = make_product()
+    result = inventory.create_stock_movements_batch(
+        db,
+        StockMovementBatchCreate(
+            mode=StockMovementBatchMode.PARTIAL,
+            movements=[
+                {"product_id": product.id, "quantity": 2, "movement_type": "in"},
+                {"product_id": product.id, "quantity": 2, "movement_type": "IN"},
+                {"product_id": product.id, "quantity": -1, "movement_type": "in"},
+            ],
+        ),
+        user_id=1,
+    )
+    assert [row["accepted"] for row in result["results"]] == [True, False, False]
+
+def test_all_or_nothing_batch_leaves_stock_untouched(db, make_product):
+    product = make_product()
+    result = inventory.create_stock_movements_batch(
+        db,
+        StockMovementBatchCreate(movements=[
+            {"product_id": product.id, "quantity": 2, "movement_type": "in"},
+            {"product_id": 999, "quantity": 2, "movement_type": "in"},
+        ]),
+        user_id=1,
+    )
+
+    assert result["accepted"] == 0
+    assert db.execute(select(func.count()).select_from(StockMovement)).scalar_one() == 0
+    assert db.execute(select(func.count()).select_from(Stock)).scalar_one() == 0
+
+def test_batch_outpaces_the_single_row_path(db, make_product):
+    def upload(product_ids):
+        return [
+            {"product_id": product_ids[n % 10], "quantity": n % 4 + 1,
+             "movement_type": "in", "location": "main"}
+            for n in range(400)
+        ]
+
+    single_products = [make_product().id for _ in range(10)]
+    batch_products = [make_product().id for _ in range(10)]
+
+    started = time.perf_counter()
+    for row in upload(single_products):
+        inventory.create_stock_movement(db, StockMovementCreate(**row), user_id=1)
+    single = time.perf_counter() - started
+
+    started = time.perf_counter()
+    result = inventory.create_stock_movements_batch(
+        db, StockMovementBatchCreate(movements=upload(batch_products)), user_id=1
+    )
+    batch = time.perf_counter() - started
+
+    db.expire_all()
+    stock = dict(db.execute(select(Stock.product_id, Stock.quantity)).all())
+    assert result["accepted"] == 400
+    assert [stock[p] for p in batch_products] == [stock[p] for p in single_products]
+    # One commit and a handful of statements instead of several per movement
+    assert batch * 5 < single, (single, batch)